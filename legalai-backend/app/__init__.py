@@ -1,3 +1,4 @@
+import click
 from flask import Flask, jsonify, send_from_directory
 from .config import Config
 from .extensions import db, ma, migrate, limiter
@@ -5,6 +6,8 @@ from .tasks.celery_app import init_celery
 from .utils.errors import register_error_handlers
 from .models.user import User
 from .utils.security import hash_password
+from .services.warmup_service import WarmupService
+from .cli import register_cli
 from dotenv import load_dotenv
 from sqlalchemy.exc import OperationalError, ProgrammingError
 from flask_cors import CORS
@@ -31,7 +34,7 @@ from .api import (
 )
 
 
-def create_app():
+def create_app(warmup: bool = True):
     load_dotenv()
     app = Flask(__name__)
     app.config.from_object(Config)
@@ -120,6 +123,7 @@ def create_app():
     )
 
     register_error_handlers(app)
+    register_cli(app)
 
     @app.get("/api/v1/health")
     def health():
@@ -129,7 +133,22 @@ def create_app():
     def health_root():
         return jsonify({"status": "ok"})
 
+    @app.get("/api/v1/ready")
+    def ready():
+        ok, body = WarmupService.readiness(app)
+        return jsonify(body), 200 if ok else 503
+
+    @app.get("/ready")
+    def ready_root():
+        ok, body = WarmupService.readiness(app)
+        return jsonify(body), 200 if ok else 503
+
     _ensure_superadmin(app)
+
+    # CLI commands (flask db, celery) do not serve traffic; Celery workers
+    # warm up from their own process-init signal instead.
+    if warmup and app.config.get("MODEL_WARMUP_ENABLED", True) and click.get_current_context(silent=True) is None:
+        WarmupService.start(app)
     return app
 
 
@@ -1,4 +1,5 @@
 import hashlib
+import os
 import time
 
 from flask import Blueprint, jsonify, request, g, Response, stream_with_context
@@ -22,6 +23,14 @@ from ._auth_guard import require_auth
 from ..models.rag import KnowledgeSource
 from ..services.storage_service import StorageService
 from ..services.notification_service import NotificationService, ADMIN_NOTIFICATION_TYPES
+from ..services.semantic_cache_service import SemanticCacheService
+from ..services.llm_service import LLMService
+from ..services.provider_health_service import ProviderHealthService
+from ..services.provider_latency_service import ProviderLatencyService
+from ..services.embedding_service import TextEmbeddingService, ColPaliEmbeddingService
+from ..services.reranker_service import RerankerService
+from ..services.qdrant_service import QdrantService
+from ..utils import http_pool, model_host_client
 from ..tasks.ingestion_tasks import ingest_source
 from ..extensions import db
 
@@ -828,27 +837,11 @@ def admin_notifications_stream():
     )
 
 
-@bp.post("/knowledge/upload")
-@require_auth(admin=True)
-def upload_knowledge():
-    if "file" not in request.files:
-        raise BadRequest("Missing file")
-
-    text_model = current_app.config.get("TEXT_EMBEDDING_MODEL")
-    image_model = current_app.config.get("IMAGE_EMBEDDING_MODEL")
-
-    if not text_model or not image_model:
-        current_app.logger.error(
-            "Embedding configuration incomplete: text_model=%s image_model=%s",
-            text_model,
-            image_model,
-        )
-        raise BadRequest(
-            "Embedding configuration is incomplete. Please set TEXT_EMBEDDING_MODEL "
-            "and IMAGE_EMBEDDING_MODEL in environment variables."
-        )
-
-    f = request.files["file"]
+def _knowledge_upload(f) -> tuple[str, str]:
+    """
+    Validate an uploaded knowledge document and hash it.
+    Returns (document type, SHA-256 of the content).
+    """
     if not f.filename:
         raise BadRequest("Missing file name")
 
@@ -888,7 +881,31 @@ def upload_knowledge():
     if total_bytes == 0:
         raise BadRequest("File is empty. Please upload a non-empty document.")
 
-    content_hash = hasher.hexdigest()
+    return ext, hasher.hexdigest()
+
+
+@bp.post("/knowledge/upload")
+@require_auth(admin=True)
+def upload_knowledge():
+    if "file" not in request.files:
+        raise BadRequest("Missing file")
+
+    text_model = current_app.config.get("TEXT_EMBEDDING_MODEL")
+    image_model = current_app.config.get("IMAGE_EMBEDDING_MODEL")
+
+    if not text_model or not image_model:
+        current_app.logger.error(
+            "Embedding configuration incomplete: text_model=%s image_model=%s",
+            text_model,
+            image_model,
+        )
+        raise BadRequest(
+            "Embedding configuration is incomplete. Please set TEXT_EMBEDDING_MODEL "
+            "and IMAGE_EMBEDDING_MODEL in environment variables."
+        )
+
+    f = request.files["file"]
+    ext, content_hash = _knowledge_upload(f)
 
     existing = KnowledgeSource.query.filter_by(content_hash=content_hash).first()
     if existing is not None:
@@ -988,11 +1005,62 @@ def retry_source(sid: int):
     return jsonify({"ok": True})
 
 
+@bp.post("/knowledge/sources/<int:sid>/reingest")
+@require_auth(admin=True)
+def reingest_source(sid: int):
+    """
+    Re-ingest a source, optionally from a new version of its file
+    (multipart "file", same document type). Ingestion is incremental: only
+    chunks whose text changed are embedded again, and page images are
+    reused when the file is unchanged.
+    """
+    src = KnowledgeSource.query.get(sid)
+    if not src:
+        raise NotFound("Knowledge source not found")
+
+    if src.status in ("queued", "processing"):
+        raise Conflict("This source is already queued or being ingested.")
+
+    replaced_path = None
+    f = request.files.get("file")
+    if f is not None:
+        ext, content_hash = _knowledge_upload(f)
+        if ext != src.source_type:
+            raise BadRequest(f"The new file must be of the same type as the source ({src.source_type}).")
+
+        existing = KnowledgeSource.query.filter(
+            KnowledgeSource.content_hash == content_hash,
+            KnowledgeSource.id != src.id,
+        ).first()
+        if existing is not None:
+            raise BadRequest("A document with the same content has already been uploaded.")
+
+        replaced_path = src.file_path
+        src.file_path = StorageService.save_file(f, "knowledge")
+        src.content_hash = content_hash
+    elif src.source_type != "url" and not src.file_path:
+        raise BadRequest("This source has no file to re-ingest.")
+
+    src.status = "queued"
+    src.error_message = None
+    db.session.commit()
+
+    # The previous file is removed once the new version has been ingested.
+    ingest_source.delay(src.id, replaced_path=replaced_path)
+    return jsonify({"ok": True})
+
+
 @bp.delete("/knowledge/sources/<int:sid>")
 @require_auth(admin=True)
 def delete_source(sid):
     KnowledgeSource.query.filter_by(id=sid).delete()
     db.session.commit()
+    try:
+        QdrantService.delete_source_points(sid)
+    except Exception as e:
+        # Retrieval drops hits of deleted sources; `flask rag check-payloads --repair` clears them.
+        current_app.logger.warning("Qdrant delete failed for source=%s err=%s", sid, str(e))
+    SemanticCacheService.invalidate(reason=f"delete source={sid}")
     return jsonify({"ok": True})
 
 
@@ -1090,6 +1158,17 @@ def rag_metrics_summary():
     )
     avg_llm_time = _as_float(avg_llm_time)
 
+    avg_ttft = (
+        db.session.query(func.avg(RAGEvaluationLog.ttft_ms))
+        .filter(
+            RAGEvaluationLog.created_at >= cutoff,
+            RAGEvaluationLog.ttft_ms.isnot(None),
+        )
+        .scalar()
+        or 0
+    )
+    avg_ttft = _as_float(avg_ttft)
+
     total_tokens_used = (
         db.session.query(func.sum(RAGEvaluationLog.total_tokens))
         .filter(
@@ -1135,6 +1214,62 @@ def rag_metrics_summary():
     )
     avg_contexts = _as_float(avg_contexts)
 
+    cache_rows = (
+        db.session.query(
+            RAGEvaluationLog.cache_status,
+            func.count(RAGEvaluationLog.id).label("count"),
+            func.avg(RAGEvaluationLog.total_time_ms).label("avg_total"),
+        )
+        .filter(
+            RAGEvaluationLog.created_at >= cutoff,
+            RAGEvaluationLog.cache_status.in_(("miss", "retrieval_hit", "answer_hit")),
+        )
+        .group_by(RAGEvaluationLog.cache_status)
+        .all()
+    )
+    cache_stats = {r.cache_status: r for r in cache_rows}
+    cache_lookups = sum(r.count for r in cache_rows)
+
+    def _cache_count(status):
+        row = cache_stats.get(status)
+        return int(row.count) if row else 0
+
+    def _cache_avg(status):
+        row = cache_stats.get(status)
+        return round(_as_float(row.avg_total), 0) if row else 0.0
+
+    cache_hits = _cache_count("answer_hit") + _cache_count("retrieval_hit")
+
+    route_rows = (
+        db.session.query(
+            RAGEvaluationLog.route_tier,
+            func.count(RAGEvaluationLog.id).label("count"),
+        )
+        .filter(
+            RAGEvaluationLog.created_at >= cutoff,
+            RAGEvaluationLog.route_tier.isnot(None),
+        )
+        .group_by(RAGEvaluationLog.route_tier)
+        .all()
+    )
+    route_counts = {r.route_tier: int(r.count) for r in route_rows}
+    routed = sum(route_counts.values())
+
+    speculative_rows = (
+        db.session.query(
+            RAGEvaluationLog.speculative_status,
+            func.count(RAGEvaluationLog.id).label("count"),
+        )
+        .filter(
+            RAGEvaluationLog.created_at >= cutoff,
+            RAGEvaluationLog.speculative_status.isnot(None),
+        )
+        .group_by(RAGEvaluationLog.speculative_status)
+        .all()
+    )
+    speculative_counts = {r.speculative_status: int(r.count) for r in speculative_rows}
+    speculative_started = speculative_counts.get("used", 0) + speculative_counts.get("wasted", 0)
+
     return jsonify(
         {
             "period": f"Last {days} days",
@@ -1155,11 +1290,39 @@ def rag_metrics_summary():
                 "avgTotalTimeMs": round(avg_total_time, 0),
                 "avgEmbeddingTimeMs": round(avg_embedding_time, 0),
                 "avgLlmTimeMs": round(avg_llm_time, 0),
+                "avgTtftMs": round(avg_ttft, 0),
             },
             "tokens": {
                 "totalUsed": int(total_tokens_used),
                 "avgPerQuery": round(avg_tokens_per_query, 0),
             },
+            "cache": {
+                "lookups": cache_lookups,
+                "answerHits": _cache_count("answer_hit"),
+                "retrievalHits": _cache_count("retrieval_hit"),
+                "misses": _cache_count("miss"),
+                "hitRate": round(cache_hits / cache_lookups * 100, 2) if cache_lookups else 0.0,
+                "llmCallsSaved": _cache_count("answer_hit"),
+                "avgTotalTimeMsAnswerHit": _cache_avg("answer_hit"),
+                "avgTotalTimeMsMiss": _cache_avg("miss"),
+            },
+            "routing": {
+                "routed": routed,
+                "rules": route_counts.get("rules", 0),
+                "embedding": route_counts.get("embedding", 0),
+                "llm": route_counts.get("llm", 0),
+                "fused": route_counts.get("fused", 0),
+                "classifierCallsSaved": routed - route_counts.get("llm", 0),
+            },
+            "speculation": {
+                "started": speculative_started,
+                "used": speculative_counts.get("used", 0),
+                "wasted": speculative_counts.get("wasted", 0),
+                "skipped": speculative_counts.get("skipped", 0),
+                "wasteRate": round(speculative_counts.get("wasted", 0) / speculative_started * 100, 2)
+                if speculative_started
+                else 0.0,
+            },
         }
     )
 
@@ -1254,6 +1417,10 @@ def rag_metrics_queries():
                 "totalTimeMs": log.total_time_ms,
                 "embeddingTimeMs": log.embedding_time_ms,
                 "llmTimeMs": log.llm_time_ms,
+                "ttftMs": log.ttft_ms,
+                "cacheStatus": log.cache_status,
+                "routeTier": log.route_tier,
+                "speculativeStatus": log.speculative_status,
                 "totalTokens": log.total_tokens,
                 "errorOccurred": log.error_occurred,
                 "errorType": log.error_type,
@@ -1301,6 +1468,10 @@ def rag_metrics_query_detail(query_id: int):
                 "contextsUsed": log.contexts_used,
                 "inDomain": log.in_domain,
                 "decision": log.decision,
+                "cacheStatus": log.cache_status,
+                "cacheSimilarity": log.cache_similarity,
+                "routeTier": log.route_tier,
+                "speculativeStatus": log.speculative_status,
             },
             "sources": {
                 "chunkIds": log.source_chunk_ids or [],
@@ -1309,6 +1480,7 @@ def rag_metrics_query_detail(query_id: int):
             "performance": {
                 "embeddingTimeMs": log.embedding_time_ms,
                 "llmTimeMs": log.llm_time_ms,
+                "ttftMs": log.ttft_ms,
                 "totalTimeMs": log.total_time_ms,
             },
             "tokens": {
@@ -1331,3 +1503,126 @@ def rag_metrics_query_detail(query_id: int):
             "createdAt": log.created_at.isoformat(),
         }
     )
+
+
+@bp.get("/llm/http-metrics")
+@require_auth(admin=True)
+@limiter.limit("60 per minute")
+def llm_http_metrics():
+    """
+    Per-provider HTTP connection metrics for this worker process.
+
+    Shows connection reuse and average connect (TCP + TLS), TTFB and total
+    times for LLM, embedding and transcription calls, plus the chat latency
+    quantiles that drive hedging.
+    """
+    return jsonify(
+        {
+            "pid": os.getpid(),
+            "providers": http_pool.metrics_snapshot(),
+            "chatLatency": ProviderLatencyService.snapshot(),
+        }
+    )
+
+
+@bp.get("/llm/providers")
+@require_auth(admin=True)
+@limiter.limit("60 per minute")
+def llm_provider_health():
+    """
+    Circuit breaker state and health score per LLM provider (shared across
+    workers through Redis), in the order chat fallbacks will currently try them.
+    """
+    primary = current_app.config["CHAT_PROVIDER"]
+    providers = ProviderHealthService.snapshot()
+    return jsonify(
+        {
+            "fallbackOrder": LLMService._provider_fallbacks(primary),
+            "providers": providers,
+        }
+    )
+
+
+@bp.get("/rag/embedding-batching")
+@require_auth(admin=True)
+@limiter.limit("60 per minute")
+def rag_embedding_batching():
+    """
+    Query-time embedding micro-batch metrics: batch size distribution, time
+    callers spent queued and forward-pass time. With a model host the
+    batching happens there, so its metrics are returned instead of this
+    worker's.
+    """
+    if model_host_client.enabled():
+        host = model_host_client.call("metrics")
+        return jsonify(
+            {
+                "pid": host["pid"],
+                "modelHost": True,
+                "enabled": bool(current_app.config.get("EMBEDDING_BATCHING_ENABLED", True)),
+                "text": host["text"],
+                "colpali": host["colpali"],
+                "cache": _embedding_cache_stats(),
+            }
+        )
+    return jsonify(
+        {
+            "pid": os.getpid(),
+            "modelHost": False,
+            "enabled": bool(current_app.config.get("EMBEDDING_BATCHING_ENABLED", True)),
+            "text": TextEmbeddingService._batcher.snapshot() if TextEmbeddingService._batcher else None,
+            "colpali": ColPaliEmbeddingService._batcher.snapshot() if ColPaliEmbeddingService._batcher else None,
+            "cache": _embedding_cache_stats(),
+        }
+    )
+
+
+def _embedding_cache_stats() -> dict:
+    return {
+        "enabled": bool(current_app.config.get("EMBEDDING_CACHE_ENABLED", True)),
+        "text": TextEmbeddingService.cache.snapshot(),
+        "colpali": ColPaliEmbeddingService.cache.snapshot(),
+    }
+
+
+@bp.get("/rag/reranker")
+@require_auth(admin=True)
+@limiter.limit("60 per minute")
+def rag_reranker_stats():
+    """
+    Reranker pair-score cache and adaptive pruning counters for this worker:
+    cache hit rate, share of requests where reranking was skipped or stopped
+    early, and the share of (query, chunk) pairs that never hit the model.
+    """
+    return jsonify(
+        {
+            "pid": os.getpid(),
+            "adaptive": bool(current_app.config.get("RERANKER_ADAPTIVE", False)),
+            "cacheSize": int(current_app.config.get("RERANKER_CACHE_SIZE", 20000)),
+            **RerankerService.stats(),
+        }
+    )
+
+
+@bp.get("/rag/collections")
+@require_auth(admin=True)
+@limiter.limit("60 per minute")
+def rag_collections():
+    """Qdrant collections this worker has verified, with their vector config."""
+    return jsonify({"pid": os.getpid(), **QdrantService.registry_snapshot()})
+
+
+@bp.post("/rag/collections/invalidate")
+@require_auth(admin=True)
+@limiter.limit("10 per minute")
+def rag_collections_invalidate():
+    """
+    Forget verified collections after a rebuild so the next query checks
+    (and if needed recreates) them. Other workers follow through Redis.
+    """
+    data = request.get_json(silent=True) or {}
+    names = data.get("collections")
+    if names is not None and (not isinstance(names, list) or not all(isinstance(n, str) for n in names)):
+        raise BadRequest("collections must be a list of collection names")
+    QdrantService.invalidate_collections(names)
+    return jsonify({"ok": True, "invalidated": names or "all"})
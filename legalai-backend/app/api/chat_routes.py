@@ -1,8 +1,9 @@
-from flask import Blueprint, request, jsonify, g, current_app
+from flask import Blueprint, request, jsonify, g, current_app, Response, stream_with_context
 from werkzeug.exceptions import BadRequest, Forbidden, NotFound
 from ._auth_guard import require_auth, safe_mode_on
 from ..services.rag_service import RAGService
 from ..services.llm_service import LLMService
+from ..services.query_classifier_service import QueryClassifierService
 from ..services import llm_settings_service as llm_settings
 from ..models.chat import ChatMessage, ChatConversation
 from ..models.lawyer import Lawyer
@@ -11,9 +12,12 @@ from ..extensions import limiter
 from ..tasks.evaluation_tasks import log_rag_evaluation_async
 from ..tasks.chat_tasks import process_chat_async
 from ..services.rag_evaluation_service import RAGEvaluationService
+from ..services.semantic_cache_service import SemanticCacheService
 from ..utils.http_cache import etag_response
+from ..exceptions import AppError
 from sqlalchemy import func
 from sqlalchemy.orm import aliased
+import json
 import time
 
 bp = Blueprint("chat", __name__)
@@ -102,17 +106,6 @@ def _recent_conversation_messages(cid: int, limit: int = 10) -> list[dict]:
     rows = list(reversed(rows))
     return [{"role": r.role, "content": r.content} for r in rows]
 
-def _detect_emergency_fast(q: str) -> bool:
-    ql = (q or "").lower()
-    hints = [
-        "kill", "murder", "suicide", "self harm", "self-harm", "i will die",
-        "threaten to kill", "threat to kill", "he will kill me", "she will kill me",
-        "rape", "kidnap", "abduct",
-        "قتل", "خودکشی", "جان سے مار", "مار دوں گا", "مار دوں گی", "ماردے", "مر جاؤں",
-        "زیادتی", "اغوا"
-    ]
-    return any(h in ql for h in hints)
-
 def _log_rag_eval(**kwargs):
     """
     Log RAG evaluation with async by default.
@@ -131,6 +124,262 @@ def _log_rag_eval(**kwargs):
         except Exception as sync_err:
             current_app.logger.warning("Failed to sync log evaluation: %s", str(sync_err))
 
+def _wants_stream(data: dict) -> bool:
+    if data.get("stream") is not None:
+        return bool(data.get("stream"))
+    return "text/event-stream" in (request.headers.get("Accept") or "")
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+def _sse_response(events) -> Response:
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    }
+    return Response(
+        stream_with_context(events),
+        headers=headers,
+        mimetype="text/event-stream",
+    )
+
+def _respond(payload: dict, stream: bool):
+    """
+    Non-generated replies (greeting, emergency, refusal, cached answers) are
+    sent as a single 'done' event when the client asked for a stream.
+    """
+    if stream:
+        return _sse_response(iter([_sse("done", payload)]))
+    return jsonify(payload)
+
+def _retrieve(
+    question: str,
+    *,
+    language: str,
+    province: str | None,
+    want_answer: bool,
+    provider: str | None = None,
+    model: str | None = None,
+    cache_ctx: dict | None = None,
+):
+    """
+    Semantic-cache lookup (unless cache_ctx is given) and hybrid search on a
+    miss. Returns (cache_ctx, retrieval, embedding_time_ms).
+    """
+    if cache_ctx is None:
+        cache_ctx = SemanticCacheService.lookup(
+            question, language=language, province=province, want_answer=want_answer, provider=provider, model=model
+        )
+    if cache_ctx["retrieval"] is not None:
+        return cache_ctx, cache_ctx["retrieval"], cache_ctx["elapsed_ms"]
+    retrieval = RAGService.hybrid_search(question, language=language, query_vector=cache_ctx["vector"])
+    return cache_ctx, retrieval, retrieval["timings"]["retrieval_ms"] + cache_ctx["elapsed_ms"]
+
+def _route_question(
+    question: str,
+    *,
+    language: str,
+    province: str | None,
+    want_answer: bool,
+    speculate: bool,
+    provider_override: str | None,
+    model_override: str | None,
+    api_keys: dict | None,
+):
+    """
+    Classify the question. When the rules tier cannot decide and
+    RAG_SPECULATIVE_RETRIEVAL is on, retrieval starts in the background while
+    the slower tiers run. Returns (route, speculative future or None).
+    """
+    route = QueryClassifierService.quick_route(question)
+    if route is not None:
+        return route, None
+
+    speculative = None
+    if speculate and current_app.config.get("RAG_SPECULATIVE_RETRIEVAL", False):
+        speculative = RAGService.submit_speculative(
+            _retrieve,
+            question,
+            language=language,
+            province=province,
+            want_answer=want_answer,
+            provider=provider_override,
+            model=model_override,
+        )
+    route = QueryClassifierService.classify(
+        question=question,
+        language=language,
+        provider_override=provider_override,
+        model_override=model_override,
+        api_keys=api_keys,
+    )
+    return route, speculative
+
+def _discard_speculative(speculative) -> str | None:
+    """
+    Drop speculative retrieval for a route that needs none. 'wasted' means
+    it had already started; 'skipped' that it was still queued.
+    """
+    if speculative is None:
+        return None
+    if speculative.cancel():
+        return "skipped"
+    current_app.logger.info("Speculative retrieval wasted")
+    return "wasted"
+
+def _speculative_retrieval(
+    speculative,
+    question: str,
+    *,
+    language: str,
+    province: str | None,
+    want_answer: bool,
+    provider: str | None = None,
+    model: str | None = None,
+):
+    """
+    Result of the speculative retrieval, or an inline one if it never left
+    the queue. Returns (cache_ctx, retrieval, embedding_time_ms, status).
+    """
+    if speculative.cancel():
+        retrieved = _retrieve(
+            question, language=language, province=province, want_answer=want_answer, provider=provider, model=model
+        )
+        return (*retrieved, "skipped")
+    return (*speculative.result(), "used")
+
+def _stream_answer(
+    *,
+    question: str,
+    retrieval: dict,
+    cache_ctx: dict,
+    language: str,
+    province: str | None,
+    history: list[dict],
+    conversation_id: int | None,
+    safe_mode: bool,
+    is_new_conversation: bool,
+    topic: str,
+    route: dict,
+    provider_override: str | None,
+    model_override: str | None,
+    api_keys: dict | None,
+    chat_model: str | None,
+    embedding_time_ms: int,
+    request_start_time: float,
+    speculative_status: str | None = None,
+) -> Response:
+    """
+    Stream the legal-awareness answer as SSE: 'meta', then 'token' deltas,
+    then 'done' with the normalized answer. The assistant message is persisted
+    and the evaluation logged (with time-to-first-token) once the stream ends.
+    With fused routing a non-legal ROUTE line ends the stream before any token
+    and 'done' carries the canned reply instead.
+    """
+    user_id = g.user.id
+    contexts_used = retrieval["contexts_used"]
+    decision = "ANSWER_WITH_SOURCES" if retrieval["has_verified_sources"] else "ANSWER_NO_SOURCES"
+    in_domain = True
+    route_out = {} if route.get("tier") == "fused" else None
+
+    def _events():
+        nonlocal decision, in_domain, contexts_used
+        yield _sse("meta", {"conversationId": conversation_id, "contextsUsed": contexts_used})
+
+        llm_start = time.perf_counter()
+        ttft_ms = None
+        parts = []
+        try:
+            tokens, prompt_messages = LLMService.stream_legal_awareness(
+                question=question,
+                contexts=retrieval["contexts_text"],
+                images=retrieval["contexts_images"],
+                language=language,
+                province=province,
+                history=history,
+                provider_override=provider_override,
+                model_override=model_override,
+                api_keys=api_keys,
+                route_out=route_out,
+            )
+            for delta in tokens:
+                if ttft_ms is None:
+                    ttft_ms = int((time.perf_counter() - request_start_time) * 1000)
+                parts.append(delta)
+                yield _sse("token", {"delta": delta})
+        except AppError as e:
+            current_app.logger.warning("Chat stream failed: %s", e.description)
+            yield _sse("error", {"error": e.error, "message": e.description})
+            return
+        except Exception as e:
+            current_app.logger.exception("Chat stream failed: %s", str(e))
+            yield _sse("error", {"error": "stream_failed", "message": "Answer generation failed. Please try again."})
+            return
+
+        answer = LLMService.finalize_answer("".join(parts))
+        llm_time_ms = int((time.perf_counter() - llm_start) * 1000)
+        fused_exit = QueryClassifierService.resolve_fused(route, route_out)
+        if fused_exit:
+            answer = QueryClassifierService.canned_reply(route["category"], language, province)
+            decision, in_domain = QueryClassifierService.decision_for(route["category"])
+            contexts_used = 0
+
+        if conversation_id is not None:
+            ChatMessage.add_and_trim(
+                user_id=user_id,
+                conversation_id=conversation_id,
+                role="assistant",
+                content=answer,
+                max_messages=100,
+                commit=False,
+            )
+            db.session.commit()
+
+        if not fused_exit:
+            SemanticCacheService.store(
+                cache_ctx,
+                retrieval=retrieval,
+                answer=None if history else answer,
+            )
+
+        total_time_ms = int((time.perf_counter() - request_start_time) * 1000)
+        _log_rag_eval(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            language=language,
+            safe_mode=safe_mode,
+            is_new_conversation=is_new_conversation,
+            question=question,
+            answer=answer,
+            threshold=retrieval["threshold_used"],
+            best_distance=retrieval["best_score"],
+            contexts_found=retrieval["contexts_found"],
+            contexts_used=contexts_used,
+            in_domain=in_domain,
+            decision=decision,
+            chunk_ids=retrieval["chunk_ids"],
+            embedding_time_ms=embedding_time_ms,
+            llm_time_ms=llm_time_ms,
+            total_time_ms=total_time_ms,
+            embedding_model=current_app.config.get("TEXT_EMBEDDING_MODEL") or current_app.config["EMBEDDING_MODEL"],
+            embedding_dimension=current_app.config.get("TEXT_EMBEDDING_DIMENSION") or current_app.config.get("EMBEDDING_DIMENSION"),
+            chat_model=chat_model,
+            prompt_messages=prompt_messages,
+            completion_text=answer,
+            cache_status=cache_ctx["status"],
+            cache_similarity=cache_ctx["similarity"],
+            ttft_ms=ttft_ms,
+            route_tier=route.get("tier"),
+            speculative_status=speculative_status,
+        )
+
+        payload = {"answer": answer, "conversationId": conversation_id, "contextsUsed": contexts_used}
+        if not fused_exit:
+            payload["lawyers"] = _suggest_lawyers(question, topic)
+        yield _sse("done", payload)
+
+    return _sse_response(_events())
+
 @bp.post("/transcribe")
 @require_auth()
 @limiter.limit("30 per minute")
@@ -187,6 +436,7 @@ def transcribe_audio():
 def ask():
     data = request.get_json() or {}
     request_start_time = time.perf_counter()
+    stream = _wants_stream(data)
 
     provider_override = (data.get("provider") or "").strip().lower()
     model_override = (data.get("model") or "").strip()
@@ -238,42 +488,68 @@ def ask():
     memory_limit = current_app.config.get("CHAT_MEMORY_LIMIT", 10)
 
     if safe_mode_on():
-        if _detect_emergency_fast(q):
-            route = {"category": "EMERGENCY", "confidence": 1.0, "topic": "emergency"}
-        else:
-            route = LLMService.classify_query(
-                question=q,
-                language=language,
-                provider_override=provider_override or None,
-                model_override=model_override or None,
-                api_keys=api_keys or None,
-            )
+        route, speculative = _route_question(
+            q,
+            language=language,
+            province=province,
+            want_answer=True,
+            speculate=True,
+            provider_override=provider_override or None,
+            model_override=model_override or None,
+            api_keys=api_keys or None,
+        )
 
         category = route.get("category")
         topic = route.get("topic") or "other"
 
         current_app.logger.info(
-            "Chat classify: safe_mode=1 user_id=%s lang=%s category=%s topic=%s conf=%s",
+            "Chat classify: safe_mode=1 user_id=%s lang=%s category=%s topic=%s conf=%s tier=%s ms=%s",
             getattr(g.user, "id", None),
             language,
             category,
             topic,
             route.get("confidence"),
+            route.get("tier"),
+            route.get("ms"),
         )
 
+        speculative_status = None
+        if category != "IN_DOMAIN_LEGAL":
+            speculative_status = _discard_speculative(speculative)
+
         if category == "GREETING_OR_APP_HELP":
-            msg = (
-                "Hello! I can help with legal awareness for women in Pakistan (workplace harassment, domestic violence, family matters, cyber harassment). "
-                "Please describe your situation and I will guide you."
-                if language != "ur"
-                else
-                "السلام علیکم! میں پاکستان میں خواتین کے لیے قانونی آگاہی میں مدد کر سکتی ہوں (کام کی جگہ ہراسانی، گھریلو تشدد، خاندانی معاملات، سائبر ہراسانی)۔ "
-                "براہِ کرم اپنا مسئلہ بتائیں، میں رہنمائی کروں گی۔"
-            )
-            return jsonify({"answer": msg, "conversationId": None, "contextsUsed": 0})
+            msg = QueryClassifierService.canned_reply(category, language, province)
+            if speculative_status is not None:
+                _log_rag_eval(
+                    user_id=g.user.id,
+                    conversation_id=None,
+                    language=language,
+                    safe_mode=True,
+                    is_new_conversation=True,
+                    question=q,
+                    answer=msg,
+                    threshold=None,
+                    best_distance=None,
+                    contexts_found=0,
+                    contexts_used=0,
+                    in_domain=True,
+                    decision="GREETING",
+                    chunk_ids=[],
+                    embedding_time_ms=0,
+                    llm_time_ms=0,
+                    total_time_ms=int((time.perf_counter() - request_start_time) * 1000),
+                    embedding_model=current_app.config.get("TEXT_EMBEDDING_MODEL") or current_app.config["EMBEDDING_MODEL"],
+                    embedding_dimension=current_app.config.get("TEXT_EMBEDDING_DIMENSION") or current_app.config.get("EMBEDDING_DIMENSION"),
+                    chat_model=chat_model_used,
+                    prompt_messages=None,
+                    completion_text=msg,
+                    route_tier=route.get("tier"),
+                    speculative_status=speculative_status,
+                )
+            return _respond({"answer": msg, "conversationId": None, "contextsUsed": 0}, stream)
 
         if category == "EMERGENCY":
-            emergency_msg = LLMService.emergency_response(language=language, province=province)
+            emergency_msg = QueryClassifierService.canned_reply(category, language, province)
             total_time_ms = int((time.perf_counter() - request_start_time) * 1000)
             _log_rag_eval(
                 user_id=g.user.id,
@@ -298,18 +574,14 @@ def ask():
                 chat_model=chat_model_used,
                 prompt_messages=None,
                 completion_text=emergency_msg,
+                route_tier=route.get("tier"),
+                speculative_status=speculative_status,
             )
 
-            return jsonify({"answer": emergency_msg, "conversationId": None, "contextsUsed": 0})
+            return _respond({"answer": emergency_msg, "conversationId": None, "contextsUsed": 0}, stream)
 
         if category in {"OUT_OF_DOMAIN", "PROMPT_INJECTION_OR_MISUSE"}:
-            refusal = (
-                "I am an AI legal lawyer assistant. I can only help you with legal awareness. "
-                "I'm not able to process this query."
-                if language != "ur"
-                else
-                "میں ایک اے آئی لیگل اسسٹنٹ ہوں۔ میں صرف قانونی آگاہی میں مدد کر سکتی ہوں۔ میں اس سوال پر مدد نہیں کر سکتی۔"
-            )
+            refusal = QueryClassifierService.canned_reply(category, language, province)
             total_time_ms = int((time.perf_counter() - request_start_time) * 1000)
             _log_rag_eval(
                 user_id=g.user.id,
@@ -334,12 +606,31 @@ def ask():
                 chat_model=chat_model_used,
                 prompt_messages=None,
                 completion_text=refusal,
+                route_tier=route.get("tier"),
+                speculative_status=speculative_status,
             )
 
-            return jsonify({"answer": refusal, "conversationId": None, "contextsUsed": 0})
+            return _respond({"answer": refusal, "conversationId": None, "contextsUsed": 0}, stream)
 
-        retrieval = RAGService.hybrid_search(q, language=language)
-        embedding_time_ms = retrieval["embedding_time_ms"]
+        if speculative is not None:
+            cache_ctx, retrieval, embedding_time_ms, speculative_status = _speculative_retrieval(
+                speculative,
+                q,
+                language=language,
+                province=province,
+                want_answer=True,
+                provider=provider_override or None,
+                model=model_override or None,
+            )
+        else:
+            cache_ctx, retrieval, embedding_time_ms = _retrieve(
+                q,
+                language=language,
+                province=province,
+                want_answer=True,
+                provider=provider_override or None,
+                model=model_override or None,
+            )
 
         chunk_ids = retrieval["chunk_ids"]
         threshold = retrieval["threshold_used"]
@@ -347,36 +638,70 @@ def ask():
         has_verified_sources = retrieval["has_verified_sources"]
         contexts = retrieval["contexts_text"]
         image_contexts = retrieval["contexts_images"]
+        decision = "ANSWER_WITH_SOURCES" if has_verified_sources else "ANSWER_NO_SOURCES"
 
-        llm_start = time.perf_counter()
-        use_vlm = bool(image_contexts) or bool(current_app.config.get("VLM_ALWAYS", False))
-        if use_vlm:
-            answer, prompt_messages, _ = LLMService.chat_legal_awareness_multimodal(
+        if stream and cache_ctx["answer"] is None:
+            return _stream_answer(
                 question=q,
-                contexts=contexts,
-                images=image_contexts,
+                retrieval=retrieval,
+                cache_ctx=cache_ctx,
                 language=language,
                 province=province,
                 history=[],
+                conversation_id=None,
+                safe_mode=True,
+                is_new_conversation=True,
+                topic=topic,
+                route=route,
                 provider_override=provider_override or None,
                 model_override=model_override or None,
                 api_keys=api_keys or None,
+                chat_model=chat_model_used,
+                embedding_time_ms=embedding_time_ms,
+                request_start_time=request_start_time,
+                speculative_status=speculative_status,
             )
+
+        route_out = {} if route.get("tier") == "fused" else None
+        in_domain = True
+        llm_start = time.perf_counter()
+        if cache_ctx["answer"] is not None:
+            answer, prompt_messages = cache_ctx["answer"], None
         else:
-            answer, prompt_messages, _ = LLMService.chat_legal_awareness(
-                question=q,
-                contexts=contexts,
-                language=language,
-                province=province,
-                history=[],
-                provider_override=provider_override or None,
-                model_override=model_override or None,
-                api_keys=api_keys or None,
-            )
+            use_vlm = bool(image_contexts) or bool(current_app.config.get("VLM_ALWAYS", False))
+            if use_vlm:
+                answer, prompt_messages, _ = LLMService.chat_legal_awareness_multimodal(
+                    question=q,
+                    contexts=contexts,
+                    images=image_contexts,
+                    language=language,
+                    province=province,
+                    history=[],
+                    provider_override=provider_override or None,
+                    model_override=model_override or None,
+                    api_keys=api_keys or None,
+                    route_out=route_out,
+                )
+            else:
+                answer, prompt_messages, _ = LLMService.chat_legal_awareness(
+                    question=q,
+                    contexts=contexts,
+                    language=language,
+                    province=province,
+                    history=[],
+                    provider_override=provider_override or None,
+                    model_override=model_override or None,
+                    api_keys=api_keys or None,
+                    route_out=route_out,
+                )
+            if QueryClassifierService.resolve_fused(route, route_out):
+                answer = QueryClassifierService.canned_reply(route["category"], language, province)
+                decision, in_domain = QueryClassifierService.decision_for(route["category"])
+            else:
+                SemanticCacheService.store(cache_ctx, retrieval=retrieval, answer=answer)
         llm_time_ms = int((time.perf_counter() - llm_start) * 1000)
 
         total_time_ms = int((time.perf_counter() - request_start_time) * 1000)
-        decision = "ANSWER_WITH_SOURCES" if has_verified_sources else "ANSWER_NO_SOURCES"
 
         _log_rag_eval(
             user_id=g.user.id,
@@ -390,7 +715,7 @@ def ask():
             best_distance=best_distance,
             contexts_found=retrieval["contexts_found"],
             contexts_used=retrieval["contexts_used"],
-            in_domain=True,
+            in_domain=in_domain,
             decision=decision,
             chunk_ids=chunk_ids,
             embedding_time_ms=embedding_time_ms,
@@ -401,15 +726,22 @@ def ask():
             chat_model=chat_model_used,
             prompt_messages=prompt_messages,
             completion_text=answer,
+            cache_status=cache_ctx["status"],
+            cache_similarity=cache_ctx["similarity"],
+            route_tier=route.get("tier"),
+            speculative_status=speculative_status,
         )
 
+        if not decision.startswith("ANSWER"):
+            return _respond({"answer": answer, "conversationId": None, "contextsUsed": 0}, stream)
+
         suggestions = _suggest_lawyers(q, topic)
-        return jsonify({
+        return _respond({
             "answer": answer,
             "conversationId": None,
             "contextsUsed": retrieval["contexts_used"],
             "lawyers": suggestions,
-        })
+        }, stream)
 
 
     is_new_conversation = conv_id is None
@@ -437,39 +769,40 @@ def ask():
 
     history = [] if conv_id is None else _recent_conversation_messages(conv_id, limit=memory_limit)
 
-    if _detect_emergency_fast(q):
-        route = {"category": "EMERGENCY", "confidence": 1.0, "topic": "emergency"}
-    else:
-        route = LLMService.classify_query(
-            question=q,
-            language=language,
-            provider_override=provider_override or None,
-            model_override=model_override or None,
-            api_keys=api_keys or None,
-        )
+    async_enabled = bool(current_app.config.get("CHAT_ASYNC_ENABLED", False))
+    route, speculative = _route_question(
+        q,
+        language=language,
+        province=province,
+        want_answer=not history,
+        # The async task retrieves on its own, so there is nothing to overlap.
+        speculate=stream or not async_enabled,
+        provider_override=provider_override or None,
+        model_override=model_override or None,
+        api_keys=api_keys or None,
+    )
 
     category = route.get("category")
     topic = route.get("topic") or "other"
 
     current_app.logger.info(
-        "Chat classify: safe_mode=0 user_id=%s conv_id=%s lang=%s category=%s topic=%s conf=%s",
+        "Chat classify: safe_mode=0 user_id=%s conv_id=%s lang=%s category=%s topic=%s conf=%s tier=%s ms=%s",
         getattr(g.user, "id", None),
         conv_id,
         language,
         category,
         topic,
         route.get("confidence"),
+        route.get("tier"),
+        route.get("ms"),
     )
 
+    speculative_status = None
+    if category != "IN_DOMAIN_LEGAL":
+        speculative_status = _discard_speculative(speculative)
+
     if category == "GREETING_OR_APP_HELP":
-        msg = (
-            "Hello! I can help with legal awareness for women in Pakistan (workplace harassment, domestic violence, family matters, cyber harassment). "
-            "Please describe your situation and I will guide you."
-            if language != "ur"
-            else
-            "السلام علیکم! میں پاکستان میں خواتین کے لیے قانونی آگاہی میں مدد کر سکتی ہوں (کام کی جگہ ہراسانی، گھریلو تشدد، خاندانی معاملات، سائبر ہراسانی)۔ "
-            "براہِ کرم اپنا مسئلہ بتائیں، میں رہنمائی کروں گی۔"
-        )
+        msg = QueryClassifierService.canned_reply(category, language, province)
 
         _ensure_conversation()
         ChatMessage.add_and_trim(
@@ -490,10 +823,38 @@ def ask():
         )
         db.session.commit()
 
-        return jsonify({"answer": msg, "conversationId": conv_id, "contextsUsed": 0})
+        if speculative_status is not None:
+            _log_rag_eval(
+                user_id=g.user.id,
+                conversation_id=conv_id,
+                language=language,
+                safe_mode=False,
+                is_new_conversation=is_new_conversation,
+                question=q,
+                answer=msg,
+                threshold=None,
+                best_distance=None,
+                contexts_found=0,
+                contexts_used=0,
+                in_domain=True,
+                decision="GREETING",
+                chunk_ids=[],
+                embedding_time_ms=0,
+                llm_time_ms=0,
+                total_time_ms=int((time.perf_counter() - request_start_time) * 1000),
+                embedding_model=current_app.config.get("TEXT_EMBEDDING_MODEL") or current_app.config["EMBEDDING_MODEL"],
+                embedding_dimension=current_app.config.get("TEXT_EMBEDDING_DIMENSION") or current_app.config.get("EMBEDDING_DIMENSION"),
+                chat_model=chat_model_used,
+                prompt_messages=None,
+                completion_text=msg,
+                route_tier=route.get("tier"),
+                speculative_status=speculative_status,
+            )
+
+        return _respond({"answer": msg, "conversationId": conv_id, "contextsUsed": 0}, stream)
 
     if category == "EMERGENCY":
-        emergency_msg = LLMService.emergency_response(language=language, province=province)
+        emergency_msg = QueryClassifierService.canned_reply(category, language, province)
 
         _ensure_conversation()
         ChatMessage.add_and_trim(
@@ -538,18 +899,14 @@ def ask():
             chat_model=chat_model_used,
             prompt_messages=None,
             completion_text=emergency_msg,
+            route_tier=route.get("tier"),
+            speculative_status=speculative_status,
         )
 
-        return jsonify({"answer": emergency_msg, "conversationId": conv_id, "contextsUsed": 0})
+        return _respond({"answer": emergency_msg, "conversationId": conv_id, "contextsUsed": 0}, stream)
 
     if category in {"OUT_OF_DOMAIN", "PROMPT_INJECTION_OR_MISUSE"}:
-        refusal = (
-            "I am an AI legal lawyer assistant. I can only help you with legal awareness. "
-            "I'm not able to process this query."
-            if language != "ur"
-            else
-            "میں ایک اے آئی لیگل اسسٹنٹ ہوں۔ میں صرف قانونی آگاہی میں مدد کر سکتی ہوں۔ میں اس سوال پر مدد نہیں کر سکتی۔"
-        )
+        refusal = QueryClassifierService.canned_reply(category, language, province)
 
         _ensure_conversation()
         ChatMessage.add_and_trim(
@@ -594,9 +951,11 @@ def ask():
             chat_model=chat_model_used,
             prompt_messages=None,
             completion_text=refusal,
+            route_tier=route.get("tier"),
+            speculative_status=speculative_status,
         )
 
-        return jsonify({"answer": refusal, "conversationId": conv_id, "contextsUsed": 0})
+        return _respond({"answer": refusal, "conversationId": conv_id, "contextsUsed": 0}, stream)
 
     _ensure_conversation()
     ChatMessage.add_and_trim(
@@ -609,8 +968,27 @@ def ask():
     )
     db.session.commit()
 
-    async_enabled = bool(current_app.config.get("CHAT_ASYNC_ENABLED", False))
-    if async_enabled:
+    if speculative is not None:
+        cache_ctx, retrieval, embedding_time_ms, speculative_status = _speculative_retrieval(
+            speculative,
+            q,
+            language=language,
+            province=province,
+            want_answer=not history,
+            provider=provider_override or None,
+            model=model_override or None,
+        )
+    else:
+        cache_ctx = SemanticCacheService.lookup(
+            q,
+            language=language,
+            province=province,
+            want_answer=not history,
+            provider=provider_override or None,
+            model=model_override or None,
+        )
+
+    if speculative is None and async_enabled and not stream and cache_ctx["answer"] is None:
         try:
             process_chat_async.delay(
                 user_id=g.user.id,
@@ -622,6 +1000,7 @@ def ask():
                 provider=provider_override or None,
                 model=model_override or None,
                 api_keys=api_keys or None,
+                route_tier=route.get("tier"),
             )
             return jsonify({
                 "status": "processing",
@@ -631,8 +1010,10 @@ def ask():
         except Exception as e:
             current_app.logger.warning("Failed to queue async chat: %s", str(e))
 
-    retrieval = RAGService.hybrid_search(q, language=language)
-    embedding_time_ms = retrieval["embedding_time_ms"]
+    if speculative is None:
+        cache_ctx, retrieval, embedding_time_ms = _retrieve(
+            q, language=language, province=province, want_answer=not history, cache_ctx=cache_ctx
+        )
 
     chunk_ids = retrieval["chunk_ids"]
     threshold = retrieval["threshold_used"]
@@ -642,31 +1023,69 @@ def ask():
     image_contexts = retrieval["contexts_images"]
     decision = "ANSWER_WITH_SOURCES" if has_verified_sources else "ANSWER_NO_SOURCES"
 
-    llm_start = time.perf_counter()
-    use_vlm = bool(image_contexts) or bool(current_app.config.get("VLM_ALWAYS", False))
-    if use_vlm:
-        answer, prompt_messages, _ = LLMService.chat_legal_awareness_multimodal(
+    if stream and cache_ctx["answer"] is None:
+        return _stream_answer(
             question=q,
-            contexts=contexts,
-            images=image_contexts,
+            retrieval=retrieval,
+            cache_ctx=cache_ctx,
             language=language,
             province=province,
             history=history,
+            conversation_id=conv_id,
+            safe_mode=False,
+            is_new_conversation=is_new_conversation,
+            topic=topic,
+            route=route,
             provider_override=provider_override or None,
             model_override=model_override or None,
             api_keys=api_keys or None,
+            chat_model=chat_model_used,
+            embedding_time_ms=embedding_time_ms,
+            request_start_time=request_start_time,
+            speculative_status=speculative_status,
         )
+
+    route_out = {} if route.get("tier") == "fused" else None
+    in_domain = True
+    llm_start = time.perf_counter()
+    if cache_ctx["answer"] is not None:
+        answer, prompt_messages = cache_ctx["answer"], None
     else:
-        answer, prompt_messages, _ = LLMService.chat_legal_awareness(
-            question=q,
-            contexts=contexts,
-            language=language,
-            province=province,
-            history=history,
-            provider_override=provider_override or None,
-            model_override=model_override or None,
-            api_keys=api_keys or None,
-        )
+        use_vlm = bool(image_contexts) or bool(current_app.config.get("VLM_ALWAYS", False))
+        if use_vlm:
+            answer, prompt_messages, _ = LLMService.chat_legal_awareness_multimodal(
+                question=q,
+                contexts=contexts,
+                images=image_contexts,
+                language=language,
+                province=province,
+                history=history,
+                provider_override=provider_override or None,
+                model_override=model_override or None,
+                api_keys=api_keys or None,
+                route_out=route_out,
+            )
+        else:
+            answer, prompt_messages, _ = LLMService.chat_legal_awareness(
+                question=q,
+                contexts=contexts,
+                language=language,
+                province=province,
+                history=history,
+                provider_override=provider_override or None,
+                model_override=model_override or None,
+                api_keys=api_keys or None,
+                route_out=route_out,
+            )
+        if QueryClassifierService.resolve_fused(route, route_out):
+            answer = QueryClassifierService.canned_reply(route["category"], language, province)
+            decision, in_domain = QueryClassifierService.decision_for(route["category"])
+        else:
+            SemanticCacheService.store(
+                cache_ctx,
+                retrieval=retrieval,
+                answer=None if history else answer,
+            )
     llm_time_ms = int((time.perf_counter() - llm_start) * 1000)
 
     ChatMessage.add_and_trim(
@@ -693,7 +1112,7 @@ def ask():
         best_distance=best_distance,
         contexts_found=retrieval["contexts_found"],
         contexts_used=retrieval["contexts_used"],
-        in_domain=True,
+        in_domain=in_domain,
         decision=decision,
         chunk_ids=chunk_ids,
         embedding_time_ms=embedding_time_ms,
@@ -704,15 +1123,22 @@ def ask():
         chat_model=chat_model_used,
         prompt_messages=prompt_messages,
         completion_text=answer,
+        cache_status=cache_ctx["status"],
+        cache_similarity=cache_ctx["similarity"],
+        route_tier=route.get("tier"),
+        speculative_status=speculative_status,
     )
 
+    if not decision.startswith("ANSWER"):
+        return _respond({"answer": answer, "conversationId": conv_id, "contextsUsed": 0}, stream)
+
     suggestions = _suggest_lawyers(q, topic)
-    return jsonify({
+    return _respond({
         "answer": answer,
         "conversationId": conv_id,
         "contextsUsed": retrieval["contexts_used"],
         "lawyers": suggestions,
-    })
+    }, stream)
 
 @bp.get("/conversations")
 @require_auth()
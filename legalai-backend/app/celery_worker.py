@@ -13,7 +13,10 @@ from __future__ import annotations
 
 import logging
 
+from celery.signals import worker_init, worker_process_init
+
 from . import create_app
+from .services.warmup_service import WarmupService
 from .tasks.celery_app import celery, init_celery
 
 logger = logging.getLogger(__name__)
@@ -28,4 +31,22 @@ try:
     
 except Exception as e:
     logger.exception("CRITICAL: Failed to initialize Flask app for Celery worker")
-    raise
\ No newline at end of file
+    raise
+
+
+def _warmup_enabled() -> bool:
+    return bool(flask_app.config.get("MODEL_WARMUP_ENABLED", True))
+
+
+@worker_process_init.connect
+def _warmup_child(**kwargs):
+    # Prefork children: each one owns its model copies.
+    if _warmup_enabled():
+        WarmupService.start(flask_app)
+
+
+@worker_init.connect
+def _warmup_worker(sender=None, **kwargs):
+    # Solo/threads pools run tasks in this process; prefork warms its children.
+    if _warmup_enabled() and "prefork" not in str(getattr(sender, "pool_cls", "")).lower():
+        WarmupService.start(flask_app)
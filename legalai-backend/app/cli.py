@@ -0,0 +1,109 @@
+import json
+
+import click
+from flask.cli import AppGroup
+
+rag_cli = AppGroup("rag", help="Retrieval maintenance commands.")
+
+
+@rag_cli.command("check-backend")
+@click.option("--backend", type=click.Choice(["int8", "onnx"]), required=True, help="Backend to compare against fp32 torch.")
+@click.option("--model", "which", type=click.Choice(["embedder", "reranker", "all"]), default="all", show_default=True)
+@click.option("--queries", "queries_path", type=click.Path(exists=True, dir_okay=False), help="JSON list or one query per line.")
+@click.option("--passages", "passage_limit", type=int, default=300, show_default=True, help="Knowledge chunks used as the passage pool.")
+@click.option("--k", type=int, default=5, show_default=True, help="Top-k used for ranking overlap.")
+@click.option("--candidates", type=int, default=20, show_default=True, help="Passages reranked per query.")
+@click.option("--min-overlap", type=float, default=0.9, show_default=True, help="Fail when mean overlap@k is below this.")
+def check_backend(backend, which, queries_path, passage_limit, k, candidates, min_overlap):
+    """Compare rankings of an int8/onnx backend with the fp32 reference."""
+    from .services.backend_check_service import BackendCheckService
+
+    queries = BackendCheckService.load_queries(queries_path)
+    passages = BackendCheckService.load_passages(passage_limit)
+    if not queries or len(passages) < k:
+        raise click.ClickException(f"Need queries and at least {k} knowledge chunks (found {len(passages)}).")
+
+    report = {}
+    if which in {"embedder", "all"}:
+        report["embedder"] = BackendCheckService.check_embedder(backend, queries, passages, k)
+    if which in {"reranker", "all"}:
+        report["reranker"] = BackendCheckService.check_reranker(backend, queries, passages, k, candidates)
+    click.echo(json.dumps(report, indent=2, ensure_ascii=False))
+
+    failed = [name for name, r in report.items() if (r.get("overlapAtK") or 0) < min_overlap]
+    if failed:
+        raise click.ClickException(f"overlap@{k} below {min_overlap} for: {', '.join(failed)}")
+
+
+@rag_cli.command("check-payloads")
+@click.option("--repair", is_flag=True, help="Delete orphan points, reset drifted payloads and re-embed missing rows.")
+@click.option("--source-id", type=int, help="Only check one knowledge source.")
+def check_payloads(repair, source_id):
+    """Compare Qdrant points and payloads with Postgres chunks/pages."""
+    from .services.payload_consistency_service import PayloadConsistencyService
+
+    report = PayloadConsistencyService.check(repair=repair, source_id=source_id)
+    click.echo(json.dumps(report, indent=2))
+
+
+@rag_cli.command("backfill-normalized")
+@click.option("--batch-size", type=int, default=500, show_default=True)
+@click.option("--async", "run_async", is_flag=True, help="Queue the backfill on a Celery worker instead.")
+def backfill_normalized(batch_size, run_async):
+    """Precompute normalized context text for existing chunks."""
+    from .tasks.ingestion_tasks import backfill_normalized_chunks
+
+    if run_async:
+        result = backfill_normalized_chunks.delay(batch_size)
+        click.echo(f"Queued backfill task {result.id}")
+        return
+    click.echo(f"Normalized {backfill_normalized_chunks(batch_size)} chunks")
+
+
+@rag_cli.command("tune-collections")
+@click.option("--dry-run", is_flag=True, help="Only report differences from the configured settings.")
+def tune_collections(dry_run):
+    """Apply QDRANT_HNSW_* / QDRANT_QUANTIZATION and payload indexes to existing collections."""
+    from flask import current_app
+    from .services.qdrant_service import QdrantService
+
+    names = [current_app.config["QDRANT_TEXT_COLLECTION"]]
+    if current_app.config.get("ENABLE_PAGE_RETRIEVAL", True):
+        names.append(current_app.config["QDRANT_PAGE_COLLECTION"])
+    report = [QdrantService.tune_collection(name, apply=not dry_run) for name in names]
+    click.echo(json.dumps(report, indent=2))
+
+
+@rag_cli.command("invalidate-collections")
+@click.argument("names", nargs=-1)
+def invalidate_collections(names):
+    """Make every worker re-verify Qdrant collections (all, or the given NAMES)."""
+    from .services.qdrant_service import QdrantService
+
+    QdrantService.invalidate_collections(list(names) or None)
+    click.echo(f"Invalidated {', '.join(names) or 'all collections'}")
+
+
+@rag_cli.command("bench-qdrant")
+@click.option("--collection", "which", type=click.Choice(["text", "pages"]), default="text", show_default=True)
+@click.option("--queries", type=int, default=50, show_default=True, help="Stored vectors used as queries.")
+@click.option("--rounds", type=int, default=3, show_default=True)
+@click.option("--top-k", type=int, default=12, show_default=True)
+@click.option("--batch-size", type=int, default=8, show_default=True, help="Queries per search_batch request.")
+def bench_qdrant(which, queries, rounds, top_k, batch_size):
+    """Compare REST and gRPC search latency, single and batched."""
+    from flask import current_app
+    from .services.qdrant_benchmark_service import QdrantBenchmarkService
+
+    key = "QDRANT_TEXT_COLLECTION" if which == "text" else "QDRANT_PAGE_COLLECTION"
+    try:
+        report = QdrantBenchmarkService.run(
+            current_app.config[key], queries=queries, rounds=rounds, top_k=top_k, batch_size=batch_size
+        )
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(json.dumps(report, indent=2))
+
+
+def register_cli(app):
+    app.cli.add_command(rag_cli)
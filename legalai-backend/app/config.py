@@ -49,8 +49,19 @@ class Config:
     QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
     QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
     QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "30"))
+    QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "False").lower() == "true"
+    QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
     QDRANT_TEXT_COLLECTION = os.getenv("QDRANT_TEXT_COLLECTION", "legal_text")
     QDRANT_PAGE_COLLECTION = os.getenv("QDRANT_PAGE_COLLECTION", "legal_pages")
+    QDRANT_PAYLOAD_TEXT = os.getenv("QDRANT_PAYLOAD_TEXT", "False").lower() == "true"
+    QDRANT_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+    QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+    QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "int8").lower()
+    QDRANT_QUANTIZATION_ALWAYS_RAM = os.getenv("QDRANT_QUANTIZATION_ALWAYS_RAM", "True").lower() == "true"
+    QDRANT_SEARCH_EF = int(os.getenv("QDRANT_SEARCH_EF", "0"))
+    QDRANT_SEARCH_RESCORE = os.getenv("QDRANT_SEARCH_RESCORE", "True").lower() == "true"
+    QDRANT_SEARCH_OVERSAMPLING = float(os.getenv("QDRANT_SEARCH_OVERSAMPLING", "2.0"))
+    QDRANT_REGISTRY_EPOCH_CHECK_SEC = float(os.getenv("QDRANT_REGISTRY_EPOCH_CHECK_SEC", "30"))
 
     TEXT_EMBEDDING_PROVIDER = os.getenv("TEXT_EMBEDDING_PROVIDER", "local")
     TEXT_EMBEDDING_MODEL = os.getenv("TEXT_EMBEDDING_MODEL", "BAAI/bge-m3")
@@ -67,6 +78,16 @@ class Config:
     RERANKER_DEVICE = os.getenv("RERANKER_DEVICE", "cpu")
     RERANKER_CANDIDATES = int(os.getenv("RERANKER_CANDIDATES", "20"))
     RERANKER_MAX_LENGTH = int(os.getenv("RERANKER_MAX_LENGTH", "512"))
+    RERANKER_MAX_BATCH_TOKENS = int(os.getenv("RERANKER_MAX_BATCH_TOKENS", "8192"))
+    RERANKER_CACHE_SIZE = int(os.getenv("RERANKER_CACHE_SIZE", "20000"))
+    RERANKER_ADAPTIVE = os.getenv("RERANKER_ADAPTIVE", "False").lower() == "true"
+    RERANKER_SKIP_MARGIN = float(os.getenv("RERANKER_SKIP_MARGIN", "0.15"))
+    RERANKER_SKIP_MIN_SCORE = float(os.getenv("RERANKER_SKIP_MIN_SCORE", "0.6"))
+    RERANKER_EARLY_STOP_BATCH = int(os.getenv("RERANKER_EARLY_STOP_BATCH", "5"))
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+    RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "torch")
+    INFERENCE_NUM_THREADS = int(os.getenv("INFERENCE_NUM_THREADS", "0") or 0)
+    ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR")
 
 
     EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai") 
@@ -77,6 +98,28 @@ class Config:
     CHAT_MODEL_GROQ = os.getenv("CHAT_MODEL_GROQ", "llama-3.1-8b-instant")
     CHAT_MODEL_OPENROUTER = os.getenv("CHAT_MODEL_OPENROUTER") or CHAT_MODEL
     CHAT_PROVIDER_FALLBACKS = os.getenv("CHAT_PROVIDER_FALLBACKS", "")
+    LLM_HTTP_POOL_CONNECTIONS = int(os.getenv("LLM_HTTP_POOL_CONNECTIONS", "4"))
+    LLM_HTTP_POOL_MAXSIZE = int(os.getenv("LLM_HTTP_POOL_MAXSIZE", "16"))
+    LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "False").lower() == "true"
+    LLM_HEDGE_DELAY_MS = float(os.getenv("LLM_HEDGE_DELAY_MS", "4000"))
+    LLM_HEDGE_MIN_DELAY_MS = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "1000"))
+    LLM_HEDGE_MAX_DELAY_MS = float(os.getenv("LLM_HEDGE_MAX_DELAY_MS", "15000"))
+    LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    LLM_HEDGE_MAX_PARALLEL = int(os.getenv("LLM_HEDGE_MAX_PARALLEL", "2"))
+    LLM_HEDGE_WORKERS = int(os.getenv("LLM_HEDGE_WORKERS", "8"))
+    LLM_BREAKER_ENABLED = os.getenv("LLM_BREAKER_ENABLED", "True").lower() == "true"
+    LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+    LLM_BREAKER_COOLDOWN_SEC = float(os.getenv("LLM_BREAKER_COOLDOWN_SEC", "30"))
+    LLM_HEALTH_EWMA_ALPHA = float(os.getenv("LLM_HEALTH_EWMA_ALPHA", "0.2"))
+    LLM_HEALTH_MIN_SUCCESS_RATE = float(os.getenv("LLM_HEALTH_MIN_SUCCESS_RATE", "0.7"))
+    LLM_HEALTH_SLOW_MS = float(os.getenv("LLM_HEALTH_SLOW_MS", "15000"))
+    LLM_HEALTH_CACHE_SEC = float(os.getenv("LLM_HEALTH_CACHE_SEC", "1"))
+    QUERY_CLASSIFIER_MODE = os.getenv("QUERY_CLASSIFIER_MODE", "tiered")
+    QUERY_CLASSIFIER_EMBED_ENABLED = os.getenv("QUERY_CLASSIFIER_EMBED_ENABLED", "True").lower() == "true"
+    QUERY_CLASSIFIER_EMBED_THRESHOLD = float(os.getenv("QUERY_CLASSIFIER_EMBED_THRESHOLD", "0.70"))
+    QUERY_CLASSIFIER_EMBED_MARGIN = float(os.getenv("QUERY_CLASSIFIER_EMBED_MARGIN", "0.06"))
+    QUERY_CLASSIFIER_EMBED_K = int(os.getenv("QUERY_CLASSIFIER_EMBED_K", "2"))
     RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
     RAG_TEXT_TOP_K = int(os.getenv("RAG_TEXT_TOP_K", "12"))
     RAG_PAGE_TOP_K = int(os.getenv("RAG_PAGE_TOP_K", "6"))
@@ -85,6 +128,35 @@ class Config:
     RAG_TEXT_SCORE_THRESHOLD = float(os.getenv("RAG_TEXT_SCORE_THRESHOLD", "0.2"))
     RAG_PAGE_SCORE_THRESHOLD = float(os.getenv("RAG_PAGE_SCORE_THRESHOLD", "0.2"))
     ENABLE_PAGE_RETRIEVAL = os.getenv("ENABLE_PAGE_RETRIEVAL", "True").lower() == "true"
+    RAG_RETRIEVAL_WORKERS = int(os.getenv("RAG_RETRIEVAL_WORKERS", "8"))
+    RAG_TEXT_TIMEOUT_SEC = float(os.getenv("RAG_TEXT_TIMEOUT_SEC", "15"))
+    RAG_PAGE_TIMEOUT_SEC = float(os.getenv("RAG_PAGE_TIMEOUT_SEC", "8"))
+    RAG_LEXICAL_ENABLED = os.getenv("RAG_LEXICAL_ENABLED", "True").lower() == "true"
+    RAG_LEXICAL_TOP_K = int(os.getenv("RAG_LEXICAL_TOP_K", "12"))
+    RAG_LEXICAL_TIMEOUT_SEC = float(os.getenv("RAG_LEXICAL_TIMEOUT_SEC", "3"))
+    RAG_LEXICAL_MAX_TERMS = int(os.getenv("RAG_LEXICAL_MAX_TERMS", "16"))
+    RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+    RAG_SPECULATIVE_RETRIEVAL = os.getenv("RAG_SPECULATIVE_RETRIEVAL", "False").lower() == "true"
+    RAG_SPECULATIVE_WORKERS = int(os.getenv("RAG_SPECULATIVE_WORKERS", "4"))
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "True").lower() == "true"
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "5000"))
+    EMBEDDING_CACHE_TTL_SEC = int(os.getenv("EMBEDDING_CACHE_TTL_SEC", "604800"))
+    EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+    EMBEDDING_BATCHING_ENABLED = os.getenv("EMBEDDING_BATCHING_ENABLED", "True").lower() == "true"
+    EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "16"))
+    EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+    MODEL_HOST_SOCKET = os.getenv("MODEL_HOST_SOCKET")
+    MODEL_HOST_TIMEOUT_SEC = float(os.getenv("MODEL_HOST_TIMEOUT_SEC", "60"))
+    MODEL_HOST_PRELOAD = os.getenv("MODEL_HOST_PRELOAD", "True").lower() == "true"
+    MODEL_WARMUP_ENABLED = os.getenv("MODEL_WARMUP_ENABLED", "True").lower() == "true"
+    MODEL_WARMUP_RETRY_SEC = float(os.getenv("MODEL_WARMUP_RETRY_SEC", "30"))
+
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "False").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_RETRIEVAL_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_RETRIEVAL_THRESHOLD", "0.90"))
+    SEMANTIC_CACHE_TTL_SEC = int(os.getenv("SEMANTIC_CACHE_TTL_SEC", "3600"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+    SEMANTIC_CACHE_VERSION_CHECK_SEC = float(os.getenv("SEMANTIC_CACHE_VERSION_CHECK_SEC", "2"))
 
     VLM_ALWAYS = os.getenv("VLM_ALWAYS", "True").lower() == "true"
     VLM_MAX_IMAGES = int(os.getenv("VLM_MAX_IMAGES", "3"))
@@ -94,6 +166,10 @@ class Config:
     MAX_PAGES_PER_DOC = int(os.getenv("MAX_PAGES_PER_DOC", "80"))
     MAX_PAGE_IMAGE_SIDE = int(os.getenv("MAX_PAGE_IMAGE_SIDE", "1600"))
     ENABLE_OCR = os.getenv("ENABLE_OCR", "False").lower() == "true"
+    PDF_PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", "4"))
+    PDF_PAGE_RANGE_SIZE = int(os.getenv("PDF_PAGE_RANGE_SIZE", "4"))
+    PDF_OCR_MIN_TEXT_CHARS = int(os.getenv("PDF_OCR_MIN_TEXT_CHARS", "20"))
+    INGEST_PIPELINE_QUEUE_SIZE = int(os.getenv("INGEST_PIPELINE_QUEUE_SIZE", "4"))
 
     FCM_PROJECT_ID = os.getenv("FCM_PROJECT_ID")
     FCM_SERVICE_ACCOUNT_FILE = os.getenv("FCM_SERVICE_ACCOUNT_FILE")
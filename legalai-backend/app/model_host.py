@@ -0,0 +1,104 @@
+"""
+Model host: one local process that owns the BGE, ColPali and reranker weights.
+
+    MODEL_HOST_SOCKET=/run/legalai/models.sock python -m app.model_host
+
+API and Celery processes started with the same MODEL_HOST_SOCKET send
+embedding and rerank calls here over the Unix socket instead of loading
+their own model copies, so workers can be scaled without multiplying
+memory. Concurrent single-query embeds from all workers meet in this
+process's micro-batchers.
+"""
+import os
+import socketserver
+
+from . import create_app
+from .services.embedding_service import TextEmbeddingService, ColPaliEmbeddingService
+from .services.reranker_service import RerankerService
+from .services.warmup_service import WarmupService
+from .utils.model_host_client import send_message, recv_message
+
+
+def _metrics(_msg):
+    return {
+        "pid": os.getpid(),
+        "text": TextEmbeddingService._batcher.snapshot() if TextEmbeddingService._batcher else None,
+        "colpali": ColPaliEmbeddingService._batcher.snapshot() if ColPaliEmbeddingService._batcher else None,
+    }
+
+
+OPS = {
+    "ping": lambda msg: {"pid": os.getpid()},
+    "metrics": _metrics,
+    "text_embed": lambda msg: TextEmbeddingService.embed(msg["input"]),
+    "text_dimension": lambda msg: TextEmbeddingService.embedding_dimension(),
+    "colpali_embed_texts": lambda msg: ColPaliEmbeddingService.embed_texts(msg["input"]),
+    "colpali_embed_images": lambda msg: ColPaliEmbeddingService.embed_images(msg["paths"]),
+    "colpali_dimension": lambda msg: ColPaliEmbeddingService.embedding_dimension(),
+    "rerank": lambda msg: RerankerService.rerank(msg["query"], msg["passages"]),
+}
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        app = self.server.app
+        with app.app_context():
+            while True:
+                try:
+                    msg = recv_message(self.request)
+                except (OSError, ValueError):
+                    return
+                if msg is None:
+                    return
+
+                op = msg.get("op")
+                try:
+                    if op not in OPS:
+                        raise ValueError(f"Unknown model host op: {op}")
+                    resp = {"ok": True, "result": OPS[op](msg)}
+                except Exception as e:
+                    app.logger.warning("Model host %s failed: %s", op, str(e))
+                    resp = {"ok": False, "error": str(e)}
+
+                try:
+                    send_message(self.request, resp)
+                except OSError:
+                    return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def main():
+    app = create_app(warmup=False)
+    path = app.config.get("MODEL_HOST_SOCKET")
+    if not path:
+        raise SystemExit("MODEL_HOST_SOCKET is not set.")
+    # This process runs the models itself rather than calling the host.
+    # Callers check the embedding cache before they get here.
+    app.config["MODEL_HOST_SOCKET"] = None
+    app.config["EMBEDDING_CACHE_ENABLED"] = False
+
+    if os.path.exists(path):
+        os.unlink(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    server = _Server(path, _Handler)
+    server.app = app
+    os.chmod(path, 0o660)
+
+    if app.config.get("MODEL_HOST_PRELOAD", True):
+        WarmupService.run(app)
+
+    app.logger.info("Model host listening on %s pid=%s", path, os.getpid())
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ class KnowledgeSource(db.Model):
     url = db.Column(db.Text)
     language = db.Column(db.String(10), default="en")
     content_hash = db.Column(db.String(64), unique=True, nullable=True)
+    # Hash of the file the stored pages were rendered from.
+    ingested_hash = db.Column(db.String(64), nullable=True)
     embedding_model = db.Column(db.String(100))
     embedding_dimension = db.Column(db.Integer)
     status = db.Column(db.String(20), default="queued", nullable=False)
@@ -31,6 +33,9 @@ class KnowledgeChunk(db.Model):
     id = db.Column(db.BigInteger, primary_key=True)
     source_id = db.Column(db.BigInteger, db.ForeignKey("knowledge_sources.id", ondelete="CASCADE"))
     chunk_text = db.Column(db.Text, nullable=False)
+    content_hash = db.Column(db.String(64))
+    normalized_text = db.Column(db.Text)
+    normalizer_version = db.Column(db.Integer)
     embedding = db.Column(Vector())
     embedding_model = db.Column(db.String(100))
     embedding_dimension = db.Column(db.Integer)
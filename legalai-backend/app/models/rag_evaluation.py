@@ -52,6 +52,12 @@ class RAGEvaluationLog(db.Model):
     embedding_time_ms = db.Column(db.Integer, nullable=False)
     llm_time_ms = db.Column(db.Integer)
     total_time_ms = db.Column(db.Integer, nullable=False)
+    ttft_ms = db.Column(db.Integer)
+
+    cache_status = db.Column(db.String(20))
+    cache_similarity = db.Column(db.Float)
+    route_tier = db.Column(db.String(20))
+    speculative_status = db.Column(db.String(20))
     
     prompt_tokens = db.Column(db.Integer)
     completion_tokens = db.Column(db.Integer)
@@ -0,0 +1,188 @@
+import json
+import time
+
+from flask import current_app
+
+from ..models.rag import KnowledgeChunk
+from .embedding_service import TextEmbeddingService
+from .reranker_service import RerankerService
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+# Fixed query set for backend comparisons: common chat questions in the
+# languages we serve. Override with --queries for a domain-specific set.
+DEFAULT_QUERIES = [
+    "How do I file for khula in family court?",
+    "What is the punishment for cheque dishonour under section 489-F?",
+    "Can my landlord evict me without a notice period?",
+    "How to register an FIR if police refuse?",
+    "What are my rights if I am arrested without a warrant?",
+    "Inheritance share of a daughter under Muslim law",
+    "How to get bail in a non-bailable offence?",
+    "Employer has not paid my salary for three months, what can I do?",
+    "Procedure for transfer of property through gift (hiba)",
+    "What is the limitation period for filing a civil suit?",
+    "Child custody rights of mother after divorce",
+    "How to file a consumer complaint against a defective product?",
+    "خلع کے لیے عدالت میں درخواست کیسے دیں؟",
+    "پولیس ایف آئی آر درج نہ کرے تو کیا کریں؟",
+    "وراثت میں بیٹی کا کتنا حصہ ہے؟",
+]
+
+
+class BackendCheckService:
+    """
+    Compares an int8 / onnx inference backend against the fp32 torch
+    reference on a fixed query set, using stored knowledge chunks as the
+    passage pool. Reports ranking agreement and latency per backend.
+    """
+
+    @staticmethod
+    def load_queries(path: str | None) -> list[str]:
+        if not path:
+            return list(DEFAULT_QUERIES)
+        with open(path, "r", encoding="utf-8") as fh:
+            raw = fh.read()
+        if path.endswith(".json"):
+            return [str(q) for q in json.loads(raw) if str(q).strip()]
+        return [line.strip() for line in raw.splitlines() if line.strip()]
+
+    @staticmethod
+    def load_passages(limit: int) -> list[str]:
+        rows = (
+            KnowledgeChunk.query.with_entities(KnowledgeChunk.chunk_text)
+            .order_by(KnowledgeChunk.id.asc())
+            .limit(limit)
+            .all()
+        )
+        return [r[0] for r in rows if r[0]]
+
+    @staticmethod
+    def _overlap(ref: list[int], cand: list[int], k: int) -> float:
+        k = min(k, len(ref))
+        if k <= 0:
+            return 1.0
+        return len(set(ref[:k]) & set(cand[:k])) / k
+
+    @staticmethod
+    def _kendall_tau(ref_scores: list[float], cand_scores: list[float]) -> float:
+        n = len(ref_scores)
+        concordant = discordant = 0
+        for i in range(n):
+            for j in range(i + 1, n):
+                a = ref_scores[i] - ref_scores[j]
+                b = cand_scores[i] - cand_scores[j]
+                if a * b > 0:
+                    concordant += 1
+                elif a * b < 0:
+                    discordant += 1
+        total = concordant + discordant
+        return 1.0 if total == 0 else (concordant - discordant) / total
+
+    @staticmethod
+    def _summary(overlaps: list[float], top1: list[bool], taus: list[float]) -> dict:
+        return {
+            "queries": len(overlaps),
+            "overlapAtK": round(sum(overlaps) / len(overlaps), 4) if overlaps else None,
+            "minOverlapAtK": round(min(overlaps), 4) if overlaps else None,
+            "top1Agreement": round(sum(top1) / len(top1), 4) if top1 else None,
+            "kendallTau": round(sum(taus) / len(taus), 4) if taus else None,
+        }
+
+    @staticmethod
+    def _timed_encode(model, texts: list[str]):
+        t0 = time.perf_counter()
+        out = np.asarray(TextEmbeddingService.encode_with(model, texts), dtype=np.float32)
+        return out, (time.perf_counter() - t0) * 1000
+
+    @staticmethod
+    def check_embedder(backend: str, queries: list[str], passages: list[str], k: int) -> dict:
+        model_name = current_app.config.get("TEXT_EMBEDDING_MODEL", "BAAI/bge-m3")
+        device = current_app.config.get("TEXT_EMBEDDING_DEVICE", "cpu")
+
+        results = {}
+        for name in ("torch", backend):
+            model = TextEmbeddingService.build_model(name, model_name, "cpu" if name == "onnx" else device)
+            BackendCheckService._timed_encode(model, queries[:1])  # first call pays graph setup
+            q_vecs, q_ms = BackendCheckService._timed_encode(model, queries)
+            p_vecs, p_ms = BackendCheckService._timed_encode(model, passages)
+            results[name] = {"q": q_vecs, "p": p_vecs, "queryMs": q_ms, "passageMs": p_ms}
+            del model
+
+        ref, cand = results["torch"], results[backend]
+        overlaps, top1, taus = [], [], []
+        for i in range(len(queries)):
+            ref_scores = ref["p"] @ ref["q"][i]
+            cand_scores = cand["p"] @ cand["q"][i]
+            ref_rank = list(np.argsort(-ref_scores))
+            cand_rank = list(np.argsort(-cand_scores))
+            overlaps.append(BackendCheckService._overlap(ref_rank, cand_rank, k))
+            top1.append(bool(ref_rank[0] == cand_rank[0]))
+            head = ref_rank[: max(k * 4, 20)]
+            taus.append(BackendCheckService._kendall_tau(
+                [float(ref_scores[j]) for j in head],
+                [float(cand_scores[j]) for j in head],
+            ))
+
+        cosine = float(np.mean(np.sum(ref["q"] * cand["q"], axis=1)))
+        return {
+            "model": model_name,
+            "backend": backend,
+            **BackendCheckService._summary(overlaps, top1, taus),
+            "meanQueryCosine": round(cosine, 5),
+            "latencyMs": {
+                name: {
+                    "perQuery": round(r["queryMs"] / max(len(queries), 1), 2),
+                    "perPassage": round(r["passageMs"] / max(len(passages), 1), 2),
+                }
+                for name, r in results.items()
+            },
+        }
+
+    @staticmethod
+    def _candidates(queries: list[str], passages: list[str], n: int) -> list[list[int]]:
+        # Candidate lists come from the configured embedder so both reranker
+        # backends see the same inputs, like in RAGService.hybrid_search.
+        q_vecs = np.asarray(TextEmbeddingService.embed(list(queries)), dtype=np.float32)
+        p_vecs = np.asarray(TextEmbeddingService.embed(list(passages)), dtype=np.float32)
+        return [list(np.argsort(-(p_vecs @ q))[:n]) for q in q_vecs]
+
+    @staticmethod
+    def check_reranker(backend: str, queries: list[str], passages: list[str], k: int, candidates: int) -> dict:
+        model_name = current_app.config.get("RERANKER_MODEL", "BAAI/bge-reranker-v2-m3")
+        device = current_app.config.get("RERANKER_DEVICE", "cpu")
+        pools = BackendCheckService._candidates(queries, passages, candidates)
+
+        scores, latency = {}, {}
+        for name in ("torch", backend):
+            run_device = "cpu" if name == "onnx" else device
+            model, tokenizer = RerankerService.build_model(name, model_name, run_device)
+            RerankerService.score_with(model, tokenizer, queries[0], [passages[pools[0][0]]], run_device)
+            t0 = time.perf_counter()
+            scores[name] = [
+                RerankerService.score_with(model, tokenizer, q, [passages[j] for j in pool], run_device)
+                for q, pool in zip(queries, pools)
+            ]
+            latency[name] = {"perQuery": round((time.perf_counter() - t0) * 1000 / max(len(queries), 1), 2)}
+            del model
+
+        overlaps, top1, taus, max_diff = [], [], [], 0.0
+        for ref_scores, cand_scores in zip(scores["torch"], scores[backend]):
+            ref_rank = sorted(range(len(ref_scores)), key=lambda j: ref_scores[j], reverse=True)
+            cand_rank = sorted(range(len(cand_scores)), key=lambda j: cand_scores[j], reverse=True)
+            overlaps.append(BackendCheckService._overlap(ref_rank, cand_rank, k))
+            top1.append(ref_rank[0] == cand_rank[0])
+            taus.append(BackendCheckService._kendall_tau(ref_scores, cand_scores))
+            max_diff = max([max_diff] + [abs(a - b) for a, b in zip(ref_scores, cand_scores)])
+
+        return {
+            "model": model_name,
+            "backend": backend,
+            "candidates": candidates,
+            **BackendCheckService._summary(overlaps, top1, taus),
+            "maxScoreDiff": round(max_diff, 4),
+            "latencyMs": latency,
+        }
@@ -1,18 +1,52 @@
+import os
+import threading
 import time
 from typing import Iterable
 
 from flask import current_app
 
+from ..utils import inference_backend, model_host_client
+from ..utils.embedding_cache import EmbeddingCache
+from ..utils.micro_batcher import MicroBatcher
+
 try:
     import torch
 except Exception:  # pragma: no cover
     torch = None
 
 
+def _batching_enabled() -> bool:
+    return bool(current_app.config.get("EMBEDDING_BATCHING_ENABLED", True))
+
+
+def _new_batcher(name: str, batch_fn) -> MicroBatcher:
+    return MicroBatcher(
+        name,
+        batch_fn,
+        max_batch=int(current_app.config.get("EMBEDDING_BATCH_MAX_SIZE", 16)),
+        max_wait_ms=float(current_app.config.get("EMBEDDING_BATCH_MAX_WAIT_MS", 5)),
+    )
+
+
 class TextEmbeddingService:
     _model = None
     _model_name = None
     _device = None
+    _backend = None
+    _dimension = None
+    _load_lock = threading.Lock()
+    _batcher = None
+    _batcher_lock = threading.Lock()
+    cache = EmbeddingCache("text")
+
+    @staticmethod
+    def batcher() -> MicroBatcher:
+        """Collects concurrent single-query embeds into one encode() call."""
+        if TextEmbeddingService._batcher is None:
+            with TextEmbeddingService._batcher_lock:
+                if TextEmbeddingService._batcher is None:
+                    TextEmbeddingService._batcher = _new_batcher("text", TextEmbeddingService._encode)
+        return TextEmbeddingService._batcher
 
     @staticmethod
     def _load_model():
@@ -24,52 +58,123 @@ class TextEmbeddingService:
         if TextEmbeddingService._model is not None:
             return TextEmbeddingService._model, provider
 
+        # Warmup and the first request can race; load the weights once.
+        with TextEmbeddingService._load_lock:
+            if TextEmbeddingService._model is None:
+                model_name = current_app.config.get("TEXT_EMBEDDING_MODEL", "BAAI/bge-m3")
+                device = current_app.config.get("TEXT_EMBEDDING_DEVICE", "cpu")
+                backend = inference_backend.backend_for("EMBEDDING_BACKEND")
+                TextEmbeddingService._model = TextEmbeddingService.build_model(backend, model_name, device)
+                TextEmbeddingService._model_name = model_name
+                TextEmbeddingService._device = device
+                TextEmbeddingService._backend = backend
+        return TextEmbeddingService._model, provider
+
+    @staticmethod
+    def build_model(backend: str, model_name: str, device: str = "cpu"):
+        """
+        A fresh (uncached) encoder for backend: torch (fp32), int8 (dynamic
+        quantization) or onnx. All expose SentenceTransformer.encode().
+        """
+        inference_backend.apply_torch_threads()
+        if backend == "onnx":
+            return inference_backend.OnnxSentenceEncoder(model_name)
+
         try:
             from sentence_transformers import SentenceTransformer
         except Exception as e:  # pragma: no cover
             raise RuntimeError("sentence-transformers is required for local embeddings.") from e
 
-        model_name = current_app.config.get("TEXT_EMBEDDING_MODEL", "BAAI/bge-m3")
-        device = current_app.config.get("TEXT_EMBEDDING_DEVICE", "cpu")
-        TextEmbeddingService._model = SentenceTransformer(model_name, device=device)
-        TextEmbeddingService._model_name = model_name
-        TextEmbeddingService._device = device
-        return TextEmbeddingService._model, provider
+        model = SentenceTransformer(model_name, device=device)
+        if backend == "int8":
+            model = inference_backend.quantize_int8(model, device)
+        return model
+
+    @staticmethod
+    def _use_model_host() -> bool:
+        provider = current_app.config.get("TEXT_EMBEDDING_PROVIDER", "local")
+        return provider in {"local", "bge", "bge-m3"} and model_host_client.enabled()
 
     @staticmethod
     def embedding_dimension() -> int:
-        model, provider = TextEmbeddingService._load_model()
+        provider = current_app.config.get("TEXT_EMBEDDING_PROVIDER", "local")
         if provider not in {"local", "bge", "bge-m3"}:
             return int(current_app.config.get("TEXT_EMBEDDING_DIMENSION", 0) or 0)
-        return int(model.get_sentence_embedding_dimension())
+        if TextEmbeddingService._dimension:
+            return TextEmbeddingService._dimension
+
+        if TextEmbeddingService._use_model_host():
+            dimension = int(model_host_client.call("text_dimension"))
+        else:
+            model, _ = TextEmbeddingService._load_model()
+            dimension = int(model.get_sentence_embedding_dimension())
+        TextEmbeddingService._dimension = dimension
+        return dimension
+
+    @staticmethod
+    def _cache_model_id() -> str:
+        provider = current_app.config.get("TEXT_EMBEDDING_PROVIDER", "local")
+        if provider not in {"local", "bge", "bge-m3"}:
+            return f"{current_app.config.get('EMBEDDING_PROVIDER')}:{current_app.config.get('EMBEDDING_MODEL')}"
+        model = current_app.config.get("TEXT_EMBEDDING_MODEL", "BAAI/bge-m3")
+        return f"{model}:{current_app.config.get('EMBEDDING_BACKEND', 'torch')}"
 
     @staticmethod
     def embed(text_or_texts: Iterable[str] | str):
-        model, provider = TextEmbeddingService._load_model()
+        # Single query strings go through the cache; batches (ingestion) do not.
+        if isinstance(text_or_texts, list) or not EmbeddingCache.enabled():
+            return TextEmbeddingService._embed(text_or_texts)
+
+        model_id = TextEmbeddingService._cache_model_id()
+        vector = TextEmbeddingService.cache.get(model_id, str(text_or_texts))
+        if vector is None:
+            vector = TextEmbeddingService._embed(text_or_texts)
+            TextEmbeddingService.cache.put(model_id, str(text_or_texts), vector)
+        return vector
+
+    @staticmethod
+    def _embed(text_or_texts: Iterable[str] | str):
         is_batch = isinstance(text_or_texts, list)
+        if TextEmbeddingService._use_model_host():
+            return model_host_client.call("text_embed", input=text_or_texts if is_batch else str(text_or_texts))
+
+        model, provider = TextEmbeddingService._load_model()
         inputs = text_or_texts if is_batch else [text_or_texts]
 
         if provider not in {"local", "bge", "bge-m3"}:
             llm_service = model
             return llm_service.embed(inputs) if is_batch else llm_service.embed(inputs)[0]
 
+        if not is_batch and _batching_enabled():
+            return TextEmbeddingService.batcher().submit(inputs[0])
+        embeddings = TextEmbeddingService._encode(inputs)
+        return embeddings if is_batch else embeddings[0]
+
+    @staticmethod
+    def _encode(inputs: list[str]) -> list[list[float]]:
+        model, _ = TextEmbeddingService._load_model()
         t0 = time.perf_counter()
+        embeddings = TextEmbeddingService.encode_with(model, inputs)
+        elapsed_ms = int((time.perf_counter() - t0) * 1000)
+        current_app.logger.info(
+            "Text embeddings generated model=%s backend=%s items=%s ms=%s",
+            TextEmbeddingService._model_name,
+            TextEmbeddingService._backend,
+            len(inputs),
+            elapsed_ms,
+        )
+        return embeddings.tolist()
+
+    @staticmethod
+    def encode_with(model, inputs: list[str]):
         batch_size = int(current_app.config.get("TEXT_EMBEDDING_BATCH_SIZE", 32))
-        embeddings = model.encode(
+        return model.encode(
             inputs,
             normalize_embeddings=True,
             convert_to_numpy=True,
             batch_size=batch_size,
             show_progress_bar=False,
         )
-        elapsed_ms = int((time.perf_counter() - t0) * 1000)
-        current_app.logger.info(
-            "Text embeddings generated model=%s items=%s ms=%s",
-            TextEmbeddingService._model_name,
-            len(inputs),
-            elapsed_ms,
-        )
-        return embeddings.tolist() if is_batch else embeddings[0].tolist()
 
 
 class ColPaliEmbeddingService:
@@ -77,6 +182,20 @@ class ColPaliEmbeddingService:
     _processor = None
     _model_name = None
     _device = None
+    _dimension = None
+    _load_lock = threading.Lock()
+    _batcher = None
+    _batcher_lock = threading.Lock()
+    cache = EmbeddingCache("colpali")
+
+    @staticmethod
+    def batcher() -> MicroBatcher:
+        """Collects concurrent single-query text embeds into one forward pass."""
+        if ColPaliEmbeddingService._batcher is None:
+            with ColPaliEmbeddingService._batcher_lock:
+                if ColPaliEmbeddingService._batcher is None:
+                    ColPaliEmbeddingService._batcher = _new_batcher("colpali", ColPaliEmbeddingService._encode_texts)
+        return ColPaliEmbeddingService._batcher
 
     @staticmethod
     def _load_model():
@@ -91,33 +210,65 @@ class ColPaliEmbeddingService:
         except Exception as e:  # pragma: no cover
             raise RuntimeError("transformers is required for ColPali embeddings.") from e
 
-        model_name = current_app.config.get("IMAGE_EMBEDDING_MODEL", "vidore/colpali")
-        device = current_app.config.get("IMAGE_EMBEDDING_DEVICE", "cpu")
+        with ColPaliEmbeddingService._load_lock:
+            if ColPaliEmbeddingService._model is not None:
+                return ColPaliEmbeddingService._model, ColPaliEmbeddingService._processor
+
+            model_name = current_app.config.get("IMAGE_EMBEDDING_MODEL", "vidore/colpali")
+            device = current_app.config.get("IMAGE_EMBEDDING_DEVICE", "cpu")
 
-        model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
-        processor = AutoProcessor.from_pretrained(model_name, trust_remote_code=True)
-        model.to(device)
-        model.eval()
+            model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
+            processor = AutoProcessor.from_pretrained(model_name, trust_remote_code=True)
+            model.to(device)
+            model.eval()
 
-        ColPaliEmbeddingService._model = model
-        ColPaliEmbeddingService._processor = processor
-        ColPaliEmbeddingService._model_name = model_name
-        ColPaliEmbeddingService._device = device
+            ColPaliEmbeddingService._model = model
+            ColPaliEmbeddingService._processor = processor
+            ColPaliEmbeddingService._model_name = model_name
+            ColPaliEmbeddingService._device = device
         return model, processor
 
     @staticmethod
     def embedding_dimension() -> int:
-        model, _ = ColPaliEmbeddingService._load_model()
-        if hasattr(model, "config") and hasattr(model.config, "hidden_size"):
-            return int(model.config.hidden_size)
-        return int(current_app.config.get("IMAGE_EMBEDDING_DIMENSION", 0) or 0)
+        if ColPaliEmbeddingService._dimension:
+            return ColPaliEmbeddingService._dimension
+
+        if model_host_client.enabled():
+            dimension = int(model_host_client.call("colpali_dimension"))
+        else:
+            model, _ = ColPaliEmbeddingService._load_model()
+            if hasattr(model, "config") and hasattr(model.config, "hidden_size"):
+                dimension = int(model.config.hidden_size)
+            else:
+                dimension = int(current_app.config.get("IMAGE_EMBEDDING_DIMENSION", 0) or 0)
+        ColPaliEmbeddingService._dimension = dimension or None
+        return dimension
 
     @staticmethod
     def embed_texts(texts: Iterable[str] | str):
-        model, processor = ColPaliEmbeddingService._load_model()
+        if isinstance(texts, list) or not EmbeddingCache.enabled():
+            return ColPaliEmbeddingService._embed_texts(texts)
+
+        model_id = current_app.config.get("IMAGE_EMBEDDING_MODEL", "vidore/colpali")
+        vector = ColPaliEmbeddingService.cache.get(model_id, str(texts))
+        if vector is None:
+            vector = ColPaliEmbeddingService._embed_texts(texts)
+            ColPaliEmbeddingService.cache.put(model_id, str(texts), vector)
+        return vector
+
+    @staticmethod
+    def _embed_texts(texts: Iterable[str] | str):
         is_batch = isinstance(texts, list)
-        inputs = texts if is_batch else [texts]
+        if model_host_client.enabled():
+            return model_host_client.call("colpali_embed_texts", input=texts)
+        if not is_batch and _batching_enabled():
+            return ColPaliEmbeddingService.batcher().submit(texts)
+        feats = ColPaliEmbeddingService._encode_texts(texts if is_batch else [texts])
+        return feats if is_batch else feats[0]
 
+    @staticmethod
+    def _encode_texts(inputs: list[str]) -> list[list[float]]:
+        model, processor = ColPaliEmbeddingService._load_model()
         if torch is None:  # pragma: no cover
             raise RuntimeError("torch is required for ColPali embeddings.")
 
@@ -132,11 +283,15 @@ class ColPaliEmbeddingService:
                 feats = _pool_features(outputs)
 
         feats = torch.nn.functional.normalize(feats, p=2, dim=-1)
-        feats = feats.detach().cpu().tolist()
-        return feats if is_batch else feats[0]
+        return feats.detach().cpu().tolist()
 
     @staticmethod
     def embed_images(images: Iterable):
+        images = list(images)
+        # Paths can be opened by the host; in-memory images are embedded here.
+        if model_host_client.enabled() and all(isinstance(i, (str, os.PathLike)) for i in images):
+            return model_host_client.call("colpali_embed_images", paths=[os.fspath(i) for i in images])
+
         model, processor = ColPaliEmbeddingService._load_model()
         if torch is None:  # pragma: no cover
             raise RuntimeError("torch is required for ColPali embeddings.")
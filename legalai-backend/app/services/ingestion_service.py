@@ -0,0 +1,341 @@
+import hashlib
+import os
+import time
+from types import SimpleNamespace
+
+from flask import current_app
+
+from ..extensions import db
+from ..models.rag import KnowledgeChunk, KnowledgePage
+from ..utils.page_render import iter_pdf_pages, iter_source_pages, pdf_pass_available
+from ..utils.stage_pipeline import StagePipeline
+from ..utils.text_extract import extract_text_from_source, chunk_text, join_pdf_text
+from ..utils.text_normalizer import NORMALIZER_VERSION, normalize_rag_context
+from .embedding_service import TextEmbeddingService, ColPaliEmbeddingService
+from .qdrant_service import QdrantService
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: str | None) -> str | None:
+    if not path or not os.path.isfile(path):
+        return None
+    hasher = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _batched(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class IngestionService:
+    """
+    Streams one knowledge source through the ingestion stages:
+
+        text:  extract+chunk -> embed_text  --\\
+                                               >-> write (DB) -> upsert (Qdrant)
+        pages: render        -> embed_pages --/
+
+    PDFs replace extract and render with a single "pdf" stage that opens
+    each page range once for text, per-page OCR and the page PNG (see
+    iter_pdf_pages), sending pages on as they are rendered and the chunks
+    once the whole text is known.
+
+    Stages are joined by bounded queues (INGEST_PIPELINE_QUEUE_SIZE
+    batches), so the text and page branches run concurrently and the
+    embedders keep working while earlier batches are written. DB writes
+    stay on the calling thread and are committed by the caller.
+
+    Re-ingestion is incremental: chunks whose content_hash (and embedding
+    model) match a stored chunk keep their row and Qdrant point, only new
+    text is embedded, and vanished chunks are deleted. Pages are kept
+    without rendering when the file hash matches src.ingested_hash.
+    """
+
+    @staticmethod
+    def _existing_chunks(source_id: int, model_name: str):
+        """Reusable chunk ids by content hash, ids embedded with another model, and hashes to backfill."""
+        pool, outdated, backfill = {}, [], {}
+        rows = (
+            KnowledgeChunk.query.filter_by(source_id=source_id)
+            .with_entities(KnowledgeChunk.id, KnowledgeChunk.content_hash, KnowledgeChunk.embedding_model)
+            .order_by(KnowledgeChunk.id.asc())
+            .all()
+        )
+        unhashed = [r.id for r in rows if r.content_hash is None and r.embedding_model == model_name]
+        if unhashed:
+            # Chunks ingested before content hashes were stored.
+            for r in (
+                KnowledgeChunk.query.filter(KnowledgeChunk.id.in_(unhashed))
+                .with_entities(KnowledgeChunk.id, KnowledgeChunk.chunk_text)
+                .all()
+            ):
+                backfill[r.id] = chunk_hash(r.chunk_text)
+        for r in rows:
+            if r.embedding_model != model_name:
+                outdated.append(r.id)
+                continue
+            pool.setdefault(r.content_hash or backfill[r.id], []).append(r.id)
+        return pool, outdated, backfill
+
+    @staticmethod
+    def delete_points(source_id: int, *, chunk_ids: list, page_ids: list):
+        for collection, ids in (
+            (current_app.config["QDRANT_TEXT_COLLECTION"], chunk_ids),
+            (current_app.config["QDRANT_PAGE_COLLECTION"], page_ids),
+        ):
+            try:
+                QdrantService.delete_points(collection, ids)
+            except Exception as e:
+                # Leftover points are orphans that `flask rag check-payloads --repair` removes.
+                current_app.logger.warning("Qdrant delete failed for source=%s err=%s", source_id, str(e))
+
+    @staticmethod
+    def discard_upserted(source_id: int, upserted: dict):
+        """Delete the points a run wrote, when its DB rows are rolled back."""
+        IngestionService.delete_points(source_id, chunk_ids=upserted["text"], page_ids=upserted["page"])
+
+    @staticmethod
+    def run(src) -> dict:
+        text_batch_size = int(current_app.config.get("TEXT_EMBEDDING_BATCH_SIZE", 32))
+        page_batch_size = int(current_app.config.get("IMAGE_EMBEDDING_BATCH_SIZE", 8))
+        payload_text = bool(current_app.config.get("QDRANT_PAYLOAD_TEXT", False))
+        text_model_name = current_app.config.get("TEXT_EMBEDDING_MODEL", "BAAI/bge-m3")
+
+        # Stage threads must not touch the ORM instance owned by this session.
+        source = SimpleNamespace(
+            id=src.id,
+            title=src.title,
+            source_type=src.source_type,
+            file_path=src.file_path,
+            url=src.url,
+            language=src.language,
+        )
+        base_payload = {
+            "source_id": source.id,
+            "language": source.language,
+            "title": source.title,
+            "source_type": source.source_type,
+        }
+        state = {
+            "chunks": 0,
+            "added": 0,
+            "kept": [],
+            "pages": [],
+            "text_dim": None,
+            "page_dim": None,
+            "image_embedding_ready": True,
+            "upserted": {"text": [], "page": []},
+        }
+
+        pool, outdated, backfill = IngestionService._existing_chunks(source.id, text_model_name)
+        digest = file_hash(source.file_path)
+        old_pages = KnowledgePage.query.filter_by(source_id=source.id).order_by(KnowledgePage.page_number.asc()).all()
+        reuse_pages = bool(old_pages) and digest is not None and digest == src.ingested_hash
+        if reuse_pages:
+            state["pages"] = [
+                {"page_number": p.page_number, "path": p.image_path, "width": p.width, "height": p.height}
+                for p in old_pages
+            ]
+
+        def _chunk_batches(text):
+            chunks = [c for c in chunk_text(text) if c and len(c.strip()) >= 5]
+            state["chunks"] = len(chunks)
+            changed = []
+            for c in chunks:
+                h = chunk_hash(c)
+                if pool.get(h):
+                    state["kept"].append(pool[h].pop())
+                else:
+                    changed.append((c, h))
+            for batch in _batched(changed, text_batch_size):
+                yield [(c, h, normalize_rag_context(c)) for c, h in batch]
+
+        def _extract():
+            yield from _chunk_batches(extract_text_from_source(source))
+
+        def _pdf_pass():
+            texts, batch = [], []
+            for page in iter_pdf_pages(source.id, source.file_path, render=not reuse_pages):
+                texts.append(page)
+                if "path" in page:
+                    batch.append({k: page[k] for k in ("page_number", "path", "width", "height")})
+                if len(batch) >= page_batch_size:
+                    yield "pages", batch
+                    batch = []
+            if batch:
+                yield "pages", batch
+            for chunks in _chunk_batches(join_pdf_text(texts)):
+                yield "chunks", chunks
+
+        def _embed_text(batch):
+            if state["text_dim"] is None:
+                text_dim = TextEmbeddingService.embedding_dimension()
+                if not text_dim:
+                    raise RuntimeError(
+                        "TEXT_EMBEDDING_DIMENSION is not configured and model dimension could not be inferred."
+                    )
+                QdrantService.ensure_text_collection(text_dim)
+                state["text_dim"] = text_dim
+            texts = [c for c, _, _ in batch]
+            for attempt in range(3):
+                try:
+                    return {"kind": "text", "chunks": batch, "vectors": TextEmbeddingService.embed(texts)}
+                except Exception as e:
+                    if attempt == 2:
+                        raise e
+                    time.sleep(min(2 ** (attempt + 1), 20))
+
+        def _render():
+            if reuse_pages:
+                return iter(())
+            return _batched(iter_source_pages(source.id, source.source_type, source.file_path or ""), page_batch_size)
+
+        def _embed_pages(batch):
+            if state["page_dim"] is None and state["image_embedding_ready"]:
+                try:
+                    page_dim = ColPaliEmbeddingService.embedding_dimension()
+                    if not page_dim:
+                        raise RuntimeError("IMAGE_EMBEDDING_DIMENSION is not configured.")
+                    QdrantService.ensure_page_collection(page_dim)
+                    state["page_dim"] = page_dim
+                except Exception as e:
+                    current_app.logger.warning("ColPali init failed for source=%s err=%s", source.id, str(e))
+                    state["image_embedding_ready"] = False
+
+            vectors = []
+            if state["image_embedding_ready"]:
+                try:
+                    vectors = ColPaliEmbeddingService.embed_images([p["path"] for p in batch])
+                except Exception as e:
+                    current_app.logger.warning("ColPali embed failed for source=%s err=%s", source.id, str(e))
+            return {"kind": "page", "pages": batch, "vectors": vectors}
+
+        def _write(item):
+            if item["kind"] == "text":
+                rows = [
+                    KnowledgeChunk(
+                        source_id=source.id,
+                        chunk_text=chunk,
+                        content_hash=h,
+                        normalized_text=normalized,
+                        normalizer_version=NORMALIZER_VERSION,
+                        embedding_model=text_model_name,
+                        embedding_dimension=state["text_dim"],
+                    )
+                    for chunk, h, normalized in item["chunks"]
+                ]
+                db.session.add_all(rows)
+                db.session.flush()
+                state["added"] += len(rows)
+                payloads = [
+                    {
+                        **base_payload,
+                        "chunk_id": row.id,
+                        **(QdrantService.chunk_text_payload(row) if payload_text else {}),
+                    }
+                    for row in rows
+                ]
+            else:
+                rows = [
+                    KnowledgePage(
+                        source_id=source.id,
+                        page_number=p["page_number"],
+                        image_path=p["path"],
+                        width=p.get("width"),
+                        height=p.get("height"),
+                    )
+                    for p in item["pages"]
+                ]
+                db.session.add_all(rows)
+                db.session.flush()
+                state["pages"].extend(item["pages"])
+                if not item["vectors"]:
+                    return None
+                payloads = [
+                    {
+                        **base_payload,
+                        "page_id": row.id,
+                        "page_number": row.page_number,
+                        **({"image_path": row.image_path} if payload_text else {}),
+                    }
+                    for row in rows
+                ]
+            return {"kind": item["kind"], "ids": [row.id for row in rows], "vectors": item["vectors"], "payloads": payloads}
+
+        def _upsert(item):
+            if item["kind"] == "text":
+                QdrantService.upsert_text_points(ids=item["ids"], vectors=item["vectors"], payloads=item["payloads"])
+            else:
+                QdrantService.upsert_page_points(ids=item["ids"], vectors=item["vectors"], payloads=item["payloads"])
+            state["upserted"][item["kind"]].extend(item["ids"])
+
+        def _batch_items(item):
+            return len(item["ids"] if "ids" in item else item.get("chunks") or item.get("pages") or [])
+
+        pipeline = StagePipeline(
+            f"ingest-{source.id}",
+            queue_size=int(current_app.config.get("INGEST_PIPELINE_QUEUE_SIZE", 4)),
+        )
+        if source.source_type == "pdf" and source.file_path and pdf_pass_available():
+            pipeline.source("pdf", _pdf_pass, outbox=("chunks", "pages"))
+        else:
+            pipeline.source("extract", _extract, outbox="chunks")
+            pipeline.source("render", _render, outbox="pages")
+        pipeline.stage("embed_text", _embed_text, inbox="chunks", outbox="embedded")
+        pipeline.stage("embed_pages", _embed_pages, inbox="pages", outbox="embedded")
+        pipeline.stage("upsert", _upsert, inbox="vectors", count=_batch_items)
+        try:
+            pipeline.run("write", _write, inbox="embedded", outbox="vectors", count=_batch_items)
+        except Exception:
+            IngestionService.discard_upserted(source.id, state["upserted"])
+            raise
+        finally:
+            metrics = pipeline.snapshot()
+            current_app.logger.info("Ingestion pipeline source=%s %s", source.id, metrics)
+
+        # Swap out what the new version no longer has, only after the new
+        # rows and points are in place.
+        stale_chunks = outdated + [i for ids in pool.values() for i in ids]
+        stale_pages = [] if reuse_pages else [p.id for p in old_pages]
+        kept = set(state["kept"])
+        if backfill:
+            db.session.bulk_update_mappings(
+                KnowledgeChunk,
+                [{"id": cid, "content_hash": h} for cid, h in backfill.items() if cid in kept],
+            )
+        if stale_chunks:
+            KnowledgeChunk.query.filter(KnowledgeChunk.id.in_(stale_chunks)).delete(synchronize_session=False)
+        if stale_pages:
+            KnowledgePage.query.filter(KnowledgePage.id.in_(stale_pages)).delete(synchronize_session=False)
+        IngestionService.delete_points(source.id, chunk_ids=stale_chunks, page_ids=stale_pages)
+
+        changes = {
+            "kept": len(kept),
+            "added": state["added"],
+            "removed": len(stale_chunks),
+            "pagesReused": len(state["pages"]) if reuse_pages else 0,
+        }
+        current_app.logger.info("Ingestion changes source=%s %s", source.id, changes)
+        return {
+            "chunks": state["chunks"],
+            "pages": state["pages"],
+            "text_dim": state["text_dim"],
+            "image_embedding_ready": state["image_embedding_ready"],
+            "file_hash": digest,
+            "upserted": state["upserted"],
+            "changes": changes,
+            "metrics": metrics,
+        }
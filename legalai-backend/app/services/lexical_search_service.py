@@ -0,0 +1,91 @@
+import re
+import time
+
+from flask import current_app
+from sqlalchemy import text
+
+from ..extensions import db
+from ..utils.text_normalizer import NORMALIZER_VERSION
+
+# Question words that would match almost every chunk under the 'simple'
+# text search config (which has no stopword list of its own).
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i", "if",
+    "in", "is", "it", "me", "my", "of", "on", "or", "the", "to", "what", "when", "where", "which", "who",
+    "why", "will", "with", "you", "your", "under", "about", "there", "this", "that", "should", "would",
+    "کا", "کی", "کے", "کو", "میں", "سے", "پر", "ہے", "ہیں", "اور", "کیا", "کیسے", "کب", "کون", "یہ", "وہ",
+    "نہ", "بھی", "تو", "ایک", "لیے", "کریں", "دیں",
+}
+
+# Keeps statute references like "489-F" and "2/2021" together.
+TOKEN_PATTERN = re.compile(r"\w+(?:[-/]\w+)*", re.UNICODE)
+
+_SEARCH_SQL = text(
+    """
+    SELECT c.id, c.chunk_text, c.normalized_text, c.normalizer_version,
+           ts_rank_cd(to_tsvector('simple', c.chunk_text), q) AS rank
+    FROM knowledge_chunks c
+    JOIN knowledge_sources s ON s.id = c.source_id,
+         websearch_to_tsquery('simple', :query) q
+    WHERE to_tsvector('simple', c.chunk_text) @@ q
+      AND s.status = 'done'
+      AND (CAST(:language AS VARCHAR) IS NULL OR s.language = :language)
+    ORDER BY rank DESC
+    LIMIT :limit
+    """
+)
+
+
+class LexicalSearchService:
+    """
+    Keyword search over knowledge_chunks.chunk_text with Postgres full-text
+    search ('simple' config, GIN expression index ix_knowledge_chunks_fts).
+
+    Catches what dense search misses: section numbers ("489-F"), statute
+    names and exact Urdu terms. Postgres keeps the index current as chunks
+    are inserted or deleted, so ingestion needs no extra step.
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        if not current_app.config.get("RAG_LEXICAL_ENABLED", True):
+            return False
+        return db.engine.dialect.name == "postgresql"
+
+    @staticmethod
+    def build_query(question: str) -> str | None:
+        """OR of the question's distinct non-stopword terms, for websearch_to_tsquery."""
+        terms = []
+        for token in TOKEN_PATTERN.findall((question or "").casefold()):
+            if token in STOPWORDS or (len(token) < 2 and not token.isdigit()):
+                continue
+            if token not in terms:
+                terms.append(token)
+        max_terms = int(current_app.config.get("RAG_LEXICAL_MAX_TERMS", 16))
+        terms = terms[:max_terms]
+        return " OR ".join(terms) if terms else None
+
+    @staticmethod
+    def search(question: str, language: str | None, top_k: int):
+        timings = {}
+        t0 = time.perf_counter()
+        query = LexicalSearchService.build_query(question)
+        if not query:
+            timings["lexical_ms"] = 0
+            return [], timings
+
+        rows = db.session.execute(
+            _SEARCH_SQL,
+            {"query": query, "language": language or None, "limit": int(top_k)},
+        ).all()
+        results = [
+            {
+                "chunk_id": row.id,
+                "chunk_text": row.chunk_text,
+                "context_text": row.normalized_text if row.normalizer_version == NORMALIZER_VERSION else None,
+                "lexical_score": float(row.rank),
+            }
+            for row in rows
+        ]
+        timings["lexical_ms"] = int((time.perf_counter() - t0) * 1000)
+        return results, timings
@@ -0,0 +1,228 @@
+from flask import current_app
+
+from ..models.rag import KnowledgeSource, KnowledgeChunk, KnowledgePage
+from .embedding_service import TextEmbeddingService, ColPaliEmbeddingService
+from .qdrant_service import QdrantService
+
+
+class PayloadConsistencyService:
+    """
+    Compares the Qdrant text/page collections with Postgres, which stays the
+    source of truth, and optionally repairs the difference:
+
+    - orphans: points whose chunk/page row no longer exists -> deleted
+    - drift: payload chunk_text / image_path / page_number differing from
+      the row (or missing while QDRANT_PAYLOAD_TEXT is on) -> payload reset
+    - missing: rows of "done" sources without a point -> re-embedded
+    """
+
+    @staticmethod
+    def _empty_report() -> dict:
+        return {"points": 0, "orphans": 0, "drift": 0, "missing": 0, "repaired": 0, "errors": 0}
+
+    @staticmethod
+    def _source_payload(src: KnowledgeSource) -> dict:
+        return {
+            "source_id": src.id,
+            "language": src.language,
+            "title": src.title,
+            "source_type": src.source_type,
+        }
+
+    @staticmethod
+    def _done_sources(source_id: int | None) -> dict[int, KnowledgeSource]:
+        query = KnowledgeSource.query.filter(KnowledgeSource.status == "done")
+        if source_id is not None:
+            query = query.filter(KnowledgeSource.id == source_id)
+        return {src.id: src for src in query.all()}
+
+    @staticmethod
+    def check_text(*, repair: bool, source_id: int | None = None, batch_size: int = 256) -> dict:
+        collection = current_app.config["QDRANT_TEXT_COLLECTION"]
+        payload_text = bool(current_app.config.get("QDRANT_PAYLOAD_TEXT", False))
+        report = PayloadConsistencyService._empty_report()
+        seen = set()
+
+        batch = []
+
+        def _flush():
+            ids = [p.id for p in batch]
+            rows = {
+                r.id: r
+                for r in KnowledgeChunk.query.filter(KnowledgeChunk.id.in_(ids))
+                .with_entities(
+                    KnowledgeChunk.id,
+                    KnowledgeChunk.chunk_text,
+                    KnowledgeChunk.normalized_text,
+                    KnowledgeChunk.normalizer_version,
+                )
+                .all()
+            }
+            orphans = []
+            for point in batch:
+                row = rows.get(point.id)
+                if row is None:
+                    orphans.append(point.id)
+                    continue
+                payload = point.payload or {}
+                expected = QdrantService.chunk_text_payload(row)
+                if not payload_text:
+                    expected = {k: v for k, v in expected.items() if k in payload}
+                if any(payload.get(k) != v for k, v in expected.items()):
+                    report["drift"] += 1
+                    if repair:
+                        QdrantService.set_payload(collection, point.id, expected)
+                        report["repaired"] += 1
+            report["orphans"] += len(orphans)
+            if repair and orphans:
+                QdrantService.delete_points(collection, orphans)
+                report["repaired"] += len(orphans)
+            batch.clear()
+
+        for point in QdrantService.scroll_points(collection, source_id=source_id, batch_size=batch_size):
+            report["points"] += 1
+            seen.add(point.id)
+            batch.append(point)
+            if len(batch) >= batch_size:
+                _flush()
+        if batch:
+            _flush()
+
+        sources = PayloadConsistencyService._done_sources(source_id)
+        missing = (
+            KnowledgeChunk.query.filter(KnowledgeChunk.source_id.in_(list(sources)))
+            .with_entities(KnowledgeChunk.id, KnowledgeChunk.source_id)
+            .order_by(KnowledgeChunk.id.asc())
+            .all()
+            if sources
+            else []
+        )
+        missing = [r for r in missing if r.id not in seen]
+        report["missing"] = len(missing)
+
+        if repair and missing:
+            for i in range(0, len(missing), batch_size):
+                rows = (
+                    KnowledgeChunk.query.filter(KnowledgeChunk.id.in_([r.id for r in missing[i:i + batch_size]]))
+                    .with_entities(
+                        KnowledgeChunk.id,
+                        KnowledgeChunk.source_id,
+                        KnowledgeChunk.chunk_text,
+                        KnowledgeChunk.normalized_text,
+                        KnowledgeChunk.normalizer_version,
+                    )
+                    .all()
+                )
+                try:
+                    vectors = TextEmbeddingService.embed([r.chunk_text for r in rows])
+                    QdrantService.upsert_text_points(
+                        ids=[r.id for r in rows],
+                        vectors=vectors,
+                        payloads=[
+                            {
+                                **PayloadConsistencyService._source_payload(sources[r.source_id]),
+                                "chunk_id": r.id,
+                                **(QdrantService.chunk_text_payload(r) if payload_text else {}),
+                            }
+                            for r in rows
+                        ],
+                    )
+                    report["repaired"] += len(rows)
+                except Exception as e:
+                    report["errors"] += 1
+                    current_app.logger.warning("Re-embedding %s missing chunks failed: %s", len(rows), str(e))
+        return report
+
+    @staticmethod
+    def check_pages(*, repair: bool, source_id: int | None = None, batch_size: int = 256) -> dict:
+        collection = current_app.config["QDRANT_PAGE_COLLECTION"]
+        payload_text = bool(current_app.config.get("QDRANT_PAYLOAD_TEXT", False))
+        report = PayloadConsistencyService._empty_report()
+        seen = set()
+
+        batch = []
+
+        def _flush():
+            ids = [p.id for p in batch]
+            rows = {
+                r.id: r
+                for r in KnowledgePage.query.filter(KnowledgePage.id.in_(ids))
+                .with_entities(KnowledgePage.id, KnowledgePage.image_path, KnowledgePage.page_number)
+                .all()
+            }
+            orphans = []
+            for point in batch:
+                row = rows.get(point.id)
+                if row is None:
+                    orphans.append(point.id)
+                    continue
+                payload = point.payload or {}
+                expected = {"page_number": row.page_number}
+                if payload_text or "image_path" in payload:
+                    expected["image_path"] = row.image_path
+                if any(payload.get(k) != v for k, v in expected.items()):
+                    report["drift"] += 1
+                    if repair:
+                        QdrantService.set_payload(collection, point.id, expected)
+                        report["repaired"] += 1
+            report["orphans"] += len(orphans)
+            if repair and orphans:
+                QdrantService.delete_points(collection, orphans)
+                report["repaired"] += len(orphans)
+            batch.clear()
+
+        for point in QdrantService.scroll_points(collection, source_id=source_id, batch_size=batch_size):
+            report["points"] += 1
+            seen.add(point.id)
+            batch.append(point)
+            if len(batch) >= batch_size:
+                _flush()
+        if batch:
+            _flush()
+
+        sources = PayloadConsistencyService._done_sources(source_id)
+        missing = (
+            KnowledgePage.query.filter(KnowledgePage.source_id.in_(list(sources)))
+            .with_entities(KnowledgePage.id, KnowledgePage.source_id, KnowledgePage.image_path, KnowledgePage.page_number)
+            .order_by(KnowledgePage.id.asc())
+            .all()
+            if sources
+            else []
+        )
+        missing = [r for r in missing if r.id not in seen]
+        report["missing"] = len(missing)
+
+        # Pages whose ColPali embedding failed at ingest have no point by
+        # design; a repair retries them.
+        page_batch = int(current_app.config.get("IMAGE_EMBEDDING_BATCH_SIZE", 8))
+        if repair and missing:
+            for i in range(0, len(missing), page_batch):
+                rows = missing[i:i + page_batch]
+                try:
+                    vectors = ColPaliEmbeddingService.embed_images([r.image_path for r in rows])
+                    QdrantService.upsert_page_points(
+                        ids=[r.id for r in rows],
+                        vectors=vectors,
+                        payloads=[
+                            {
+                                **PayloadConsistencyService._source_payload(sources[r.source_id]),
+                                "page_id": r.id,
+                                "page_number": r.page_number,
+                                **({"image_path": r.image_path} if payload_text else {}),
+                            }
+                            for r in rows
+                        ],
+                    )
+                    report["repaired"] += len(rows)
+                except Exception as e:
+                    report["errors"] += 1
+                    current_app.logger.warning("Re-embedding %s missing pages failed: %s", len(rows), str(e))
+        return report
+
+    @staticmethod
+    def check(*, repair: bool = False, source_id: int | None = None) -> dict:
+        report = {"text": PayloadConsistencyService.check_text(repair=repair, source_id=source_id)}
+        if current_app.config.get("ENABLE_PAGE_RETRIEVAL", True):
+            report["pages"] = PayloadConsistencyService.check_pages(repair=repair, source_id=source_id)
+        current_app.logger.info("Qdrant consistency check repair=%s source=%s %s", repair, source_id, report)
+        return report
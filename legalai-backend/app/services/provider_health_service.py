@@ -0,0 +1,308 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from ..utils.redis_client import get_redis
+
+KNOWN_PROVIDERS = ["openai", "openrouter", "groq", "deepseek", "grok", "anthropic"]
+
+# KEYS[1]=health hash, KEYS[2]=probe lock
+# ARGV: ok (1/0), latency_ms (-1 if unknown), now, alpha, failure_threshold, error, ttl
+_RECORD_SCRIPT = """
+local h = KEYS[1]
+local ok = tonumber(ARGV[1])
+local lat = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local alpha = tonumber(ARGV[4])
+local threshold = tonumber(ARGV[5])
+
+local rate = tonumber(redis.call('HGET', h, 'success_rate') or '1')
+rate = rate + alpha * (ok - rate)
+redis.call('HSET', h, 'success_rate', rate, 'updated_at', now)
+if lat >= 0 then
+  local prev = tonumber(redis.call('HGET', h, 'latency_ms') or ARGV[2])
+  redis.call('HSET', h, 'latency_ms', prev + alpha * (lat - prev))
+end
+redis.call('EXPIRE', h, tonumber(ARGV[7]))
+
+local state = redis.call('HGET', h, 'state') or 'closed'
+if state == 'half_open' then
+  redis.call('DEL', KEYS[2])
+end
+if ok == 1 then
+  redis.call('HSET', h, 'failures', 0, 'state', 'closed')
+  return 'closed'
+end
+local failures = redis.call('HINCRBY', h, 'failures', 1)
+redis.call('HSET', h, 'last_error', ARGV[6])
+if state == 'half_open' or (state == 'closed' and failures >= threshold) then
+  redis.call('HSET', h, 'state', 'open', 'opened_at', now)
+  return 'open'
+end
+return state
+"""
+
+
+class ProviderHealthService:
+    """
+    Circuit breaker and health score per LLM provider.
+
+    State lives in Redis so gunicorn and Celery workers share it; without
+    Redis each process keeps its own copy. A breaker opens after
+    LLM_BREAKER_FAILURE_THRESHOLD consecutive 429/5xx/network failures,
+    lets a single probe through after LLM_BREAKER_COOLDOWN_SEC (half-open)
+    and closes again on the first success.
+    """
+
+    KEY_PREFIX = "legalai:llm:health:"
+    PROBE_PREFIX = "legalai:llm:probe:"
+    KEY_TTL_SEC = 86400
+
+    _local: dict[str, dict] = {}
+    _local_probes: dict[str, float] = {}
+    _lock = threading.Lock()
+    _snapshot = None
+    _snapshot_at = 0.0
+    _script = None
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(current_app.config.get("LLM_BREAKER_ENABLED", True))
+
+    @staticmethod
+    def _default_state() -> dict:
+        return {
+            "state": "closed",
+            "failures": 0,
+            "success_rate": 1.0,
+            "latency_ms": None,
+            "opened_at": None,
+            "last_error": None,
+            "updated_at": None,
+        }
+
+    @staticmethod
+    def _parse(raw: dict) -> dict:
+        state = ProviderHealthService._default_state()
+        if not raw:
+            return state
+        raw = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in raw.items()
+        }
+        state["state"] = raw.get("state") or "closed"
+        state["failures"] = int(raw.get("failures") or 0)
+        state["success_rate"] = float(raw.get("success_rate") or 1.0)
+        state["latency_ms"] = float(raw["latency_ms"]) if raw.get("latency_ms") else None
+        state["opened_at"] = float(raw["opened_at"]) if raw.get("opened_at") else None
+        state["last_error"] = raw.get("last_error") or None
+        state["updated_at"] = float(raw["updated_at"]) if raw.get("updated_at") else None
+        return state
+
+    @staticmethod
+    def states(providers: list[str] | None = None, *, fresh: bool = False) -> dict[str, dict]:
+        """
+        Health state for each provider. Redis reads are cached for
+        LLM_HEALTH_CACHE_SEC so ordering does not cost a round trip per call.
+        """
+        providers = providers or KNOWN_PROVIDERS
+        ttl = float(current_app.config.get("LLM_HEALTH_CACHE_SEC", 1))
+        now = time.monotonic()
+        cached = ProviderHealthService._snapshot
+        if (
+            not fresh
+            and cached is not None
+            and now - ProviderHealthService._snapshot_at < ttl
+            and all(p in cached for p in providers)
+        ):
+            return {p: cached[p] for p in providers}
+
+        client = get_redis()
+        result = None
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for p in providers:
+                    pipe.hgetall(f"{ProviderHealthService.KEY_PREFIX}{p}")
+                result = {p: ProviderHealthService._parse(raw) for p, raw in zip(providers, pipe.execute())}
+            except Exception as e:
+                current_app.logger.debug("Provider health read failed: %s", str(e))
+                result = None
+        if result is None:
+            with ProviderHealthService._lock:
+                result = {
+                    p: dict(ProviderHealthService._local.get(p) or ProviderHealthService._default_state())
+                    for p in providers
+                }
+
+        ProviderHealthService._snapshot = {**(cached or {}), **result}
+        ProviderHealthService._snapshot_at = now
+        return result
+
+    @staticmethod
+    def allow(provider: str) -> bool:
+        """
+        Whether a request may be sent to provider now. For an open breaker
+        past its cooldown, only the caller that wins the probe lock is allowed.
+        """
+        if not ProviderHealthService.enabled():
+            return True
+        state = ProviderHealthService.states([provider])[provider]
+        if state["state"] == "closed":
+            return True
+
+        cooldown = float(current_app.config.get("LLM_BREAKER_COOLDOWN_SEC", 30))
+        if state["state"] == "open" and time.time() - (state["opened_at"] or 0) < cooldown:
+            return False
+
+        client = get_redis()
+        if client is not None:
+            try:
+                acquired = client.set(
+                    f"{ProviderHealthService.PROBE_PREFIX}{provider}", "1", nx=True, ex=max(int(cooldown), 1)
+                )
+                if acquired:
+                    client.hset(f"{ProviderHealthService.KEY_PREFIX}{provider}", "state", "half_open")
+                    ProviderHealthService._snapshot = None
+                    current_app.logger.info("LLM breaker half-open probe provider=%s", provider)
+                return bool(acquired)
+            except Exception as e:
+                current_app.logger.debug("Provider probe lock failed: %s", str(e))
+
+        with ProviderHealthService._lock:
+            probe_at = ProviderHealthService._local_probes.get(provider)
+            if probe_at is not None and time.time() - probe_at < cooldown:
+                return False
+            ProviderHealthService._local_probes[provider] = time.time()
+            local = ProviderHealthService._local.setdefault(provider, ProviderHealthService._default_state())
+            local["state"] = "half_open"
+        ProviderHealthService._snapshot = None
+        return True
+
+    @staticmethod
+    def record(provider: str, *, ok: bool, latency_ms: float | None = None, error: str | None = None):
+        alpha = float(current_app.config.get("LLM_HEALTH_EWMA_ALPHA", 0.2))
+        threshold = int(current_app.config.get("LLM_BREAKER_FAILURE_THRESHOLD", 5))
+        now = time.time()
+        previous = (ProviderHealthService._snapshot or {}).get(provider, {}).get("state")
+
+        new_state = None
+        client = get_redis()
+        if client is not None:
+            try:
+                if ProviderHealthService._script is None:
+                    ProviderHealthService._script = client.register_script(_RECORD_SCRIPT)
+                new_state = ProviderHealthService._script(
+                    keys=[
+                        f"{ProviderHealthService.KEY_PREFIX}{provider}",
+                        f"{ProviderHealthService.PROBE_PREFIX}{provider}",
+                    ],
+                    args=[
+                        1 if ok else 0,
+                        -1 if latency_ms is None else round(latency_ms, 1),
+                        now,
+                        alpha,
+                        threshold,
+                        (error or "")[:200],
+                        ProviderHealthService.KEY_TTL_SEC,
+                    ],
+                )
+                if isinstance(new_state, bytes):
+                    new_state = new_state.decode()
+            except Exception as e:
+                current_app.logger.debug("Provider health write failed: %s", str(e))
+                new_state = None
+
+        if new_state is None:
+            new_state = ProviderHealthService._record_local(
+                provider, ok=ok, latency_ms=latency_ms, error=error, now=now, alpha=alpha, threshold=threshold
+            )
+
+        if new_state != previous:
+            ProviderHealthService._snapshot = None
+            if new_state == "open":
+                current_app.logger.warning("LLM breaker opened provider=%s error=%s", provider, error)
+            elif previous in {"open", "half_open"} and new_state == "closed":
+                current_app.logger.info("LLM breaker closed provider=%s", provider)
+
+    @staticmethod
+    def _record_local(provider, *, ok, latency_ms, error, now, alpha, threshold) -> str:
+        with ProviderHealthService._lock:
+            s = ProviderHealthService._local.setdefault(provider, ProviderHealthService._default_state())
+            s["success_rate"] += alpha * ((1.0 if ok else 0.0) - s["success_rate"])
+            if latency_ms is not None:
+                prev = s["latency_ms"] if s["latency_ms"] is not None else latency_ms
+                s["latency_ms"] = prev + alpha * (latency_ms - prev)
+            s["updated_at"] = now
+            if s["state"] == "half_open":
+                ProviderHealthService._local_probes.pop(provider, None)
+            if ok:
+                s["failures"] = 0
+                s["state"] = "closed"
+                return s["state"]
+            s["failures"] += 1
+            s["last_error"] = error
+            if s["state"] == "half_open" or (s["state"] == "closed" and s["failures"] >= threshold):
+                s["state"] = "open"
+                s["opened_at"] = now
+            return s["state"]
+
+    @staticmethod
+    def order(providers: list[str]) -> list[str]:
+        """
+        Healthy providers keep their configured order. Degraded ones (low
+        success rate or slow) move behind them, best success rate then
+        lowest latency first; providers with an open breaker go last.
+        """
+        if not ProviderHealthService.enabled() or len(providers) < 2:
+            return providers
+        try:
+            states = ProviderHealthService.states(providers)
+        except Exception as e:
+            current_app.logger.debug("Provider health ordering skipped: %s", str(e))
+            return providers
+
+        min_rate = float(current_app.config.get("LLM_HEALTH_MIN_SUCCESS_RATE", 0.7))
+        slow_ms = float(current_app.config.get("LLM_HEALTH_SLOW_MS", 15000))
+        cooldown = float(current_app.config.get("LLM_BREAKER_COOLDOWN_SEC", 30))
+        now = time.time()
+
+        def _key(item):
+            idx, p = item
+            s = states[p]
+            if s["state"] == "open" and now - (s["opened_at"] or 0) < cooldown:
+                return (2, 0.0, 0.0, idx)
+            latency = s["latency_ms"] or 0.0
+            if s["success_rate"] < min_rate or latency > slow_ms:
+                return (1, -s["success_rate"], latency, idx)
+            return (0, 0.0, 0.0, idx)
+
+        return [p for _, p in sorted(enumerate(providers), key=_key)]
+
+    @staticmethod
+    def _iso(ts: float | None) -> str | None:
+        return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat() if ts else None
+
+    @staticmethod
+    def snapshot() -> list[dict]:
+        cooldown = float(current_app.config.get("LLM_BREAKER_COOLDOWN_SEC", 30))
+        now = time.time()
+        out = []
+        for provider, s in ProviderHealthService.states(KNOWN_PROVIDERS, fresh=True).items():
+            retry_in = None
+            if s["state"] == "open" and s["opened_at"]:
+                retry_in = max(0, int(cooldown - (now - s["opened_at"])))
+            out.append({
+                "provider": provider,
+                "state": s["state"],
+                "consecutiveFailures": s["failures"],
+                "successRate": round(s["success_rate"], 3),
+                "latencyMs": round(s["latency_ms"], 0) if s["latency_ms"] is not None else None,
+                "openedAt": ProviderHealthService._iso(s["opened_at"]),
+                "retryInSec": retry_in,
+                "lastError": s["last_error"],
+                "updatedAt": ProviderHealthService._iso(s["updated_at"]),
+            })
+        return out
@@ -0,0 +1,82 @@
+import bisect
+import threading
+
+
+class ProviderLatencyService:
+    """
+    Per-provider chat latency histograms (per process).
+
+    Buckets are log-spaced from 50 ms to ~2 min. Counts are halved once a
+    histogram holds WINDOW observations, so quantiles follow
+    recent behaviour instead of the whole process lifetime.
+    """
+
+    BUCKETS_MS = [
+        50, 75, 100, 150, 200, 300, 400, 500, 650, 800, 1000, 1250, 1500, 2000,
+        2500, 3000, 4000, 5000, 6500, 8000, 10000, 12500, 15000, 20000, 25000,
+        30000, 40000, 60000, 90000, 120000,
+    ]
+    WINDOW = 500
+
+    _histograms: dict[str, list[float]] = {}
+    _counters: dict[str, dict] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def observe(provider: str, elapsed_ms: float):
+        idx = bisect.bisect_left(ProviderLatencyService.BUCKETS_MS, elapsed_ms)
+        with ProviderLatencyService._lock:
+            hist = ProviderLatencyService._histograms.setdefault(
+                provider, [0.0] * (len(ProviderLatencyService.BUCKETS_MS) + 1)
+            )
+            hist[idx] += 1
+            if sum(hist) >= ProviderLatencyService.WINDOW:
+                for i in range(len(hist)):
+                    hist[i] /= 2
+
+    @staticmethod
+    def count(provider: str) -> float:
+        with ProviderLatencyService._lock:
+            return sum(ProviderLatencyService._histograms.get(provider) or [])
+
+    @staticmethod
+    def quantile(provider: str, q: float) -> float | None:
+        """
+        Upper bucket bound at quantile q, or None with no observations.
+        """
+        with ProviderLatencyService._lock:
+            hist = list(ProviderLatencyService._histograms.get(provider) or [])
+        total = sum(hist)
+        if not total:
+            return None
+        target = total * q
+        running = 0.0
+        for idx, count in enumerate(hist):
+            running += count
+            if running >= target:
+                if idx < len(ProviderLatencyService.BUCKETS_MS):
+                    return float(ProviderLatencyService.BUCKETS_MS[idx])
+                break
+        return float(ProviderLatencyService.BUCKETS_MS[-1])
+
+    @staticmethod
+    def incr(provider: str, name: str, amount: int = 1):
+        with ProviderLatencyService._lock:
+            counters = ProviderLatencyService._counters.setdefault(provider, {})
+            counters[name] = counters.get(name, 0) + amount
+
+    @staticmethod
+    def snapshot() -> dict:
+        with ProviderLatencyService._lock:
+            providers = set(ProviderLatencyService._histograms) | set(ProviderLatencyService._counters)
+            counters = {p: dict(c) for p, c in ProviderLatencyService._counters.items()}
+        return {
+            p: {
+                "samples": int(ProviderLatencyService.count(p)),
+                "p50Ms": ProviderLatencyService.quantile(p, 0.5),
+                "p95Ms": ProviderLatencyService.quantile(p, 0.95),
+                "hedgesFired": counters.get(p, {}).get("hedges_fired", 0),
+                "hedgeWins": counters.get(p, {}).get("hedge_wins", 0),
+            }
+            for p in sorted(providers)
+        }
@@ -0,0 +1,95 @@
+import time
+
+from .qdrant_service import QdrantService
+
+
+class QdrantBenchmarkService:
+    """
+    Compares REST and gRPC search latency against a live collection. Stored
+    point vectors serve as the queries, so no embedding model is loaded and
+    the numbers reflect the collection's real size and settings.
+    """
+
+    @staticmethod
+    def sample_vectors(collection: str, n: int) -> list[list[float]]:
+        client = QdrantService._client_instance()
+        points, _ = client.scroll(
+            collection_name=collection,
+            limit=int(n),
+            with_payload=False,
+            with_vectors=True,
+        )
+        return [list(p.vector) for p in points if p.vector]
+
+    @staticmethod
+    def _summary(samples_ms: list[float]) -> dict:
+        if not samples_ms:
+            return {"count": 0, "meanMs": None, "p50Ms": None, "p95Ms": None}
+        ordered = sorted(samples_ms)
+        return {
+            "count": len(ordered),
+            "meanMs": round(sum(ordered) / len(ordered), 2),
+            "p50Ms": round(ordered[len(ordered) // 2], 2),
+            "p95Ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        }
+
+    @staticmethod
+    def _bench_transport(client, collection: str, vectors, *, rounds: int, top_k: int, batch_size: int) -> dict:
+        params = QdrantService._search_params(None)
+        # First call opens the connection / HTTP2 channel.
+        client.search(collection_name=collection, query_vector=vectors[0], limit=top_k, search_params=params)
+
+        single = []
+        for _ in range(rounds):
+            for vector in vectors:
+                t0 = time.perf_counter()
+                client.search(
+                    collection_name=collection,
+                    query_vector=vector,
+                    limit=top_k,
+                    with_payload=True,
+                    search_params=params,
+                )
+                single.append((time.perf_counter() - t0) * 1000)
+
+        batched = []
+        for _ in range(rounds):
+            for i in range(0, len(vectors), batch_size):
+                chunk = vectors[i:i + batch_size]
+                t0 = time.perf_counter()
+                QdrantService.search_batch(collection, query_vectors=chunk, top_k=top_k, client=client)
+                batched.append((time.perf_counter() - t0) * 1000 / len(chunk))
+
+        return {
+            "single": QdrantBenchmarkService._summary(single),
+            "batchedPerQuery": QdrantBenchmarkService._summary(batched),
+        }
+
+    @staticmethod
+    def run(collection: str, *, queries: int, rounds: int, top_k: int, batch_size: int) -> dict:
+        vectors = QdrantBenchmarkService.sample_vectors(collection, queries)
+        if not vectors:
+            raise RuntimeError(f"Collection {collection} has no points to sample query vectors from.")
+        info = QdrantService._client_instance().get_collection(collection)
+
+        report = {
+            "collection": collection,
+            "points": info.points_count,
+            "dimension": len(vectors[0]),
+            "queries": len(vectors),
+            "rounds": rounds,
+            "topK": top_k,
+            "batchSize": batch_size,
+            "transports": {},
+        }
+        for name, prefer_grpc in (("rest", False), ("grpc", True)):
+            client = QdrantService.build_client(prefer_grpc)
+            try:
+                report["transports"][name] = QdrantBenchmarkService._bench_transport(
+                    client, collection, vectors, rounds=rounds, top_k=top_k, batch_size=batch_size
+                )
+            except Exception as e:
+                report["transports"][name] = {"error": str(e)}
+            finally:
+                client.close()
+        return report
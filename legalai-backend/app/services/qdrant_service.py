@@ -1,8 +1,12 @@
 import os
+import threading
+import time
 from typing import Iterable, Optional
 
 from flask import current_app
 
+from ..utils.redis_client import get_redis
+
 try:
     from qdrant_client import QdrantClient
     from qdrant_client.http import models as qdrant_models
@@ -14,43 +18,265 @@ except Exception:  # pragma: no cover - optional dependency
 class QdrantService:
     _client = None
 
+    # Every search filters by language and every re-ingest deletes by source_id.
+    PAYLOAD_INDEXES = {"language": "keyword", "source_id": "integer"}
+
+    # Bump when provisioning changes (new payload index, vector params) so
+    # registered collections are verified again.
+    COLLECTION_SCHEMA_VERSION = 1
+    REGISTRY_EPOCH_KEY = "legalai:qdrant:collections_epoch"
+
+    # Collections verified by this process: name -> stored vector config.
+    _registry: dict[str, dict] = {}
+    _registry_lock = threading.Lock()
+    _registry_epoch = None
+    _epoch_checked_at = 0.0
+
     @staticmethod
     def _client_instance() -> "QdrantClient":
-        if QdrantClient is None:
-            raise RuntimeError("qdrant-client is not installed. Add it to requirements.txt.")
-
         if QdrantService._client is not None:
             return QdrantService._client
 
+        QdrantService._client = QdrantService.build_client(
+            bool(current_app.config.get("QDRANT_PREFER_GRPC", False))
+        )
+        return QdrantService._client
+
+    @staticmethod
+    def build_client(prefer_grpc: bool) -> "QdrantClient":
+        """
+        REST or gRPC client for the configured server. gRPC sends vectors as
+        packed floats instead of JSON lists and multiplexes the concurrent
+        retrieval branches over one HTTP/2 channel.
+        """
+        if QdrantClient is None:
+            raise RuntimeError("qdrant-client is not installed. Add it to requirements.txt.")
+
         url = current_app.config.get("QDRANT_URL")
         api_key = current_app.config.get("QDRANT_API_KEY")
         timeout = current_app.config.get("QDRANT_TIMEOUT", 30)
+        transport = {
+            "prefer_grpc": prefer_grpc,
+            "grpc_port": int(current_app.config.get("QDRANT_GRPC_PORT", 6334)),
+        }
 
         if url:
-            QdrantService._client = QdrantClient(url=url, api_key=api_key, timeout=timeout)
-        else:
-            host = current_app.config.get("QDRANT_HOST", "localhost")
-            port = int(current_app.config.get("QDRANT_PORT", 6333))
-            QdrantService._client = QdrantClient(host=host, port=port, api_key=api_key, timeout=timeout)
+            return QdrantClient(url=url, api_key=api_key, timeout=timeout, **transport)
+        host = current_app.config.get("QDRANT_HOST", "localhost")
+        port = int(current_app.config.get("QDRANT_PORT", 6333))
+        return QdrantClient(host=host, port=port, api_key=api_key, timeout=timeout, **transport)
 
-        return QdrantService._client
+    @staticmethod
+    def _hnsw_config():
+        return qdrant_models.HnswConfigDiff(
+            m=int(current_app.config.get("QDRANT_HNSW_M", 16)),
+            ef_construct=int(current_app.config.get("QDRANT_HNSW_EF_CONSTRUCT", 100)),
+        )
 
     @staticmethod
-    def _ensure_collection(name: str, vector_size: int):
+    def _quantization_config():
+        if str(current_app.config.get("QDRANT_QUANTIZATION", "int8")).lower() != "int8":
+            return None
+        return qdrant_models.ScalarQuantization(
+            scalar=qdrant_models.ScalarQuantizationConfig(
+                type=qdrant_models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=bool(current_app.config.get("QDRANT_QUANTIZATION_ALWAYS_RAM", True)),
+            )
+        )
+
+    @staticmethod
+    def _ensure_payload_indexes(name: str, existing: dict | None = None) -> list[str]:
         client = QdrantService._client_instance()
+        created = []
+        for field, schema in QdrantService.PAYLOAD_INDEXES.items():
+            if existing is not None and field in existing:
+                continue
+            client.create_payload_index(
+                collection_name=name,
+                field_name=field,
+                field_schema=qdrant_models.PayloadSchemaType(schema),
+            )
+            created.append(field)
+        return created
+
+    @staticmethod
+    def _shared_epoch():
+        client = get_redis()
+        if client is None:
+            return None
         try:
-            client.get_collection(name)
+            return int(client.get(QdrantService.REGISTRY_EPOCH_KEY) or 0)
+        except Exception as e:
+            current_app.logger.debug("Qdrant registry epoch read failed: %s", str(e))
+            return None
+
+    @staticmethod
+    def _sync_epoch():
+        """
+        Drop the registry when another process called invalidate_collections.
+        Redis is read at most every QDRANT_REGISTRY_EPOCH_CHECK_SEC.
+        """
+        interval = float(current_app.config.get("QDRANT_REGISTRY_EPOCH_CHECK_SEC", 30))
+        now = time.monotonic()
+        if now - QdrantService._epoch_checked_at < interval:
+            return
+        QdrantService._epoch_checked_at = now
+        epoch = QdrantService._shared_epoch()
+        if epoch is None:
             return
+        if QdrantService._registry_epoch is not None and epoch != QdrantService._registry_epoch:
+            current_app.logger.info("Qdrant collection registry invalidated (epoch %s)", epoch)
+            with QdrantService._registry_lock:
+                QdrantService._registry.clear()
+        QdrantService._registry_epoch = epoch
+
+    @staticmethod
+    def _vector_config(info) -> dict:
+        params = info.config.params.vectors
+        if isinstance(params, dict):  # named vectors; not created by this service
+            return {"size": None, "distance": None}
+        return {"size": int(params.size), "distance": str(getattr(params.distance, "value", params.distance))}
+
+    @staticmethod
+    def _ensure_collection(name: str, vector_size: int) -> dict:
+        """
+        Verify (or create) a collection once per process and remember its
+        vector config, so searches skip the get_collection round trip.
+        """
+        QdrantService._sync_epoch()
+        entry = QdrantService._registry.get(name)
+        if entry is None or entry["schemaVersion"] != QdrantService.COLLECTION_SCHEMA_VERSION:
+            with QdrantService._registry_lock:
+                entry = QdrantService._registry.get(name)
+                if entry is None or entry["schemaVersion"] != QdrantService.COLLECTION_SCHEMA_VERSION:
+                    entry = QdrantService._verify_collection(name, vector_size)
+                    QdrantService._registry[name] = entry
+        if entry["size"] not in (None, int(vector_size)):
+            raise RuntimeError(
+                f"Qdrant collection {name} has vector size {entry['size']}, expected {vector_size}."
+            )
+        return entry
+
+    @staticmethod
+    def _verify_collection(name: str, vector_size: int) -> dict:
+        client = QdrantService._client_instance()
+        try:
+            info = client.get_collection(name)
         except Exception:
-            pass
-
-        client.create_collection(
-            collection_name=name,
-            vectors_config=qdrant_models.VectorParams(
-                size=int(vector_size),
-                distance=qdrant_models.Distance.COSINE,
-            ),
-        )
+            info = None
+
+        if info is None:
+            client.create_collection(
+                collection_name=name,
+                vectors_config=qdrant_models.VectorParams(
+                    size=int(vector_size),
+                    distance=qdrant_models.Distance.COSINE,
+                ),
+                hnsw_config=QdrantService._hnsw_config(),
+                quantization_config=QdrantService._quantization_config(),
+            )
+            QdrantService._ensure_payload_indexes(name)
+            vector_config = {"size": int(vector_size), "distance": "Cosine"}
+        else:
+            # Payload indexes are cheap to add in place; HNSW/quantization
+            # changes rebuild the index and are left to `flask rag tune-collections`.
+            QdrantService._ensure_payload_indexes(name, dict(info.payload_schema or {}))
+            vector_config = QdrantService._vector_config(info)
+        return {
+            **vector_config,
+            "schemaVersion": QdrantService.COLLECTION_SCHEMA_VERSION,
+            "verifiedAt": time.time(),
+        }
+
+    @staticmethod
+    def invalidate_collections(names: Iterable[str] | None = None, *, broadcast: bool = True) -> None:
+        """
+        Forget verified collections so the next use checks Qdrant again, e.g.
+        after an admin drops or rebuilds one. With broadcast, other workers
+        follow within QDRANT_REGISTRY_EPOCH_CHECK_SEC through a Redis epoch.
+        """
+        with QdrantService._registry_lock:
+            if names is None:
+                QdrantService._registry.clear()
+            else:
+                for name in names:
+                    QdrantService._registry.pop(name, None)
+        if not broadcast:
+            return
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            # Our own bump must not clear the registry again on the next sync.
+            QdrantService._registry_epoch = int(client.incr(QdrantService.REGISTRY_EPOCH_KEY))
+        except Exception as e:
+            current_app.logger.warning("Qdrant registry epoch bump failed: %s", str(e))
+
+    @staticmethod
+    def registry_snapshot() -> dict:
+        with QdrantService._registry_lock:
+            collections = {name: dict(entry) for name, entry in QdrantService._registry.items()}
+        return {
+            "schemaVersion": QdrantService.COLLECTION_SCHEMA_VERSION,
+            "epoch": QdrantService._registry_epoch,
+            "collections": collections,
+        }
+
+    @staticmethod
+    def tune_collection(name: str, *, apply: bool) -> dict:
+        """
+        Bring an existing collection to the configured HNSW, quantization and
+        payload index settings. Returns what differs; changes only with apply.
+        Qdrant rebuilds the HNSW graph / quantized vectors in the background.
+        """
+        client = QdrantService._client_instance()
+        info = client.get_collection(name)
+        hnsw = QdrantService._hnsw_config()
+        quantization = QdrantService._quantization_config()
+
+        current_hnsw = info.config.hnsw_config
+        current_quant = info.config.quantization_config
+        payload_schema = dict(info.payload_schema or {})
+        changes = {
+            "hnsw": (current_hnsw.m, current_hnsw.ef_construct) != (hnsw.m, hnsw.ef_construct),
+            "quantization": (current_quant is None) != (quantization is None),
+            "payloadIndexes": [f for f in QdrantService.PAYLOAD_INDEXES if f not in payload_schema],
+        }
+        if apply:
+            if changes["hnsw"] or changes["quantization"]:
+                client.update_collection(
+                    collection_name=name,
+                    hnsw_config=hnsw if changes["hnsw"] else None,
+                    quantization_config=(
+                        (quantization or qdrant_models.Disabled.DISABLED) if changes["quantization"] else None
+                    ),
+                )
+            QdrantService._ensure_payload_indexes(name, payload_schema)
+            QdrantService.invalidate_collections([name])
+        return {
+            "collection": name,
+            "points": info.points_count,
+            "hnsw": {"m": current_hnsw.m, "efConstruct": current_hnsw.ef_construct, "target": [hnsw.m, hnsw.ef_construct]},
+            "quantization": "int8" if current_quant is not None else "none",
+            "changes": changes,
+            "applied": apply,
+        }
+
+    @staticmethod
+    def _search_params(hnsw_ef: Optional[int]):
+        ef = int(hnsw_ef if hnsw_ef is not None else current_app.config.get("QDRANT_SEARCH_EF", 0) or 0)
+        quantization = None
+        if str(current_app.config.get("QDRANT_QUANTIZATION", "int8")).lower() == "int8":
+            # Search the int8 vectors, then rescore the oversampled top hits
+            # with the original float vectors.
+            quantization = qdrant_models.QuantizationSearchParams(
+                rescore=bool(current_app.config.get("QDRANT_SEARCH_RESCORE", True)),
+                oversampling=float(current_app.config.get("QDRANT_SEARCH_OVERSAMPLING", 2.0)),
+            )
+        if not ef and quantization is None:
+            return None
+        return qdrant_models.SearchParams(hnsw_ef=ef or None, quantization=quantization)
 
     @staticmethod
     def ensure_text_collection(vector_size: int):
@@ -89,7 +315,13 @@ class QdrantService:
         client.upsert(collection_name=current_app.config["QDRANT_PAGE_COLLECTION"], points=points)
 
     @staticmethod
-    def search_text(*, query_vector: list[float], top_k: int, language: Optional[str] = None):
+    def search_text(
+        *,
+        query_vector: list[float],
+        top_k: int,
+        language: Optional[str] = None,
+        hnsw_ef: Optional[int] = None,
+    ):
         client = QdrantService._client_instance()
         flt = QdrantService._language_filter(language)
         return client.search(
@@ -98,10 +330,45 @@ class QdrantService:
             limit=int(top_k),
             with_payload=True,
             query_filter=flt,
+            search_params=QdrantService._search_params(hnsw_ef),
         )
 
     @staticmethod
-    def search_pages(*, query_vector: list[float], top_k: int, language: Optional[str] = None):
+    def search_batch(
+        collection: str,
+        *,
+        query_vectors: list[list[float]],
+        top_k: int,
+        language: Optional[str] = None,
+        hnsw_ef: Optional[int] = None,
+        client=None,
+    ):
+        """Several query vectors against one collection in a single request; one hit list per vector."""
+        client = client or QdrantService._client_instance()
+        flt = QdrantService._language_filter(language)
+        params = QdrantService._search_params(hnsw_ef)
+        requests = [
+            qdrant_models.SearchRequest(
+                vector=list(vector),
+                limit=int(top_k),
+                with_payload=True,
+                filter=flt,
+                params=params,
+            )
+            for vector in query_vectors
+        ]
+        if not requests:
+            return []
+        return client.search_batch(collection_name=collection, requests=requests)
+
+    @staticmethod
+    def search_pages(
+        *,
+        query_vector: list[float],
+        top_k: int,
+        language: Optional[str] = None,
+        hnsw_ef: Optional[int] = None,
+    ):
         client = QdrantService._client_instance()
         flt = QdrantService._language_filter(language)
         return client.search(
@@ -110,6 +377,7 @@ class QdrantService:
             limit=int(top_k),
             with_payload=True,
             query_filter=flt,
+            search_params=QdrantService._search_params(hnsw_ef),
         )
 
     @staticmethod
@@ -128,6 +396,53 @@ class QdrantService:
         client.delete(collection_name=current_app.config["QDRANT_TEXT_COLLECTION"], points_selector=selector)
         client.delete(collection_name=current_app.config["QDRANT_PAGE_COLLECTION"], points_selector=selector)
 
+    @staticmethod
+    def chunk_text_payload(row) -> dict:
+        """Payload fields that let retrieval skip Postgres (QDRANT_PAYLOAD_TEXT)."""
+        return {
+            "chunk_text": row.chunk_text,
+            "normalized_text": row.normalized_text,
+            "normalizer_version": row.normalizer_version,
+        }
+
+    @staticmethod
+    def scroll_points(collection_name: str, *, source_id: Optional[int] = None, batch_size: int = 256):
+        """Yield the points of a collection (optionally one source's) with payloads, no vectors."""
+        client = QdrantService._client_instance()
+        flt = None
+        if source_id is not None:
+            flt = qdrant_models.Filter(
+                must=[qdrant_models.FieldCondition(key="source_id", match=qdrant_models.MatchValue(value=source_id))]
+            )
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                scroll_filter=flt,
+                limit=int(batch_size),
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            yield from points
+            if offset is None:
+                return
+
+    @staticmethod
+    def set_payload(collection_name: str, point_id: int, payload: dict):
+        client = QdrantService._client_instance()
+        client.set_payload(collection_name=collection_name, payload=payload, points=[point_id])
+
+    @staticmethod
+    def delete_points(collection_name: str, ids: list[int]):
+        if not ids:
+            return
+        client = QdrantService._client_instance()
+        client.delete(
+            collection_name=collection_name,
+            points_selector=qdrant_models.PointIdsList(points=list(ids)),
+        )
+
     @staticmethod
     def _language_filter(language: Optional[str]):
         if not language:
@@ -54,6 +54,12 @@ class RAGEvaluationService:
         prompt_messages: Optional[List[Dict]] = None,
         completion_text: Optional[str] = None,
         
+        cache_status: Optional[str] = None,
+        cache_similarity: Optional[float] = None,
+        ttft_ms: Optional[int] = None,
+        route_tier: Optional[str] = None,
+        speculative_status: Optional[str] = None,
+        
         error_occurred: bool = False,
         error_type: Optional[str] = None,
         error_message: Optional[str] = None,
@@ -159,6 +165,12 @@ class RAGEvaluationService:
                 embedding_time_ms=embedding_time_ms,
                 llm_time_ms=llm_time_ms,
                 total_time_ms=total_time_ms,
+                ttft_ms=ttft_ms,
+                
+                cache_status=cache_status,
+                cache_similarity=cache_similarity,
+                route_tier=route_tier,
+                speculative_status=speculative_status,
                 
                 prompt_tokens=prompt_tokens,
                 completion_tokens=completion_tokens,
@@ -182,7 +194,7 @@ class RAGEvaluationService:
             current_app.logger.info(
                 "RAG evaluation logged: id=%s user=%s decision=%s in_domain=%s "
                 "contexts=%s/%s distance=%.4f threshold=%.4f fallback=%s "
-                "time=%sms tokens=%s",
+                "time=%sms tokens=%s cache=%s",
                 eval_log.id,
                 user_id,
                 decision,
@@ -194,6 +206,7 @@ class RAGEvaluationService:
                 used_fallback,
                 total_time_ms,
                 total_tokens if total_tokens else "N/A",
+                cache_status or "N/A",
             )
             
             return eval_log.id
@@ -1,94 +1,345 @@
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from types import SimpleNamespace
+
 from flask import current_app
 
 from ..extensions import db
-from ..models.rag import KnowledgeChunk, KnowledgePage
+from ..models.rag import KnowledgeChunk, KnowledgePage, KnowledgeSource
 from .embedding_service import TextEmbeddingService, ColPaliEmbeddingService
+from .lexical_search_service import LexicalSearchService
 from .qdrant_service import QdrantService
 from .reranker_service import RerankerService
-from ..utils.text_normalizer import normalize_rag_context
+from ..utils.text_normalizer import NORMALIZER_VERSION, normalize_rag_context
 
 
 class RAGService:
     _page_retrieval_disabled = False
+    _executor = None
+    _executor_lock = threading.Lock()
+    _speculative_executor = None
+
     @staticmethod
-    def hybrid_search(question: str, language: str | None = None) -> dict:
-        t0 = time.perf_counter()
-        text_top_k = int(current_app.config.get("RAG_TEXT_TOP_K", 12))
-        page_top_k = int(current_app.config.get("RAG_PAGE_TOP_K", 6))
-        context_text_k = int(current_app.config.get("RAG_CONTEXT_TEXT_K", 5))
-        context_image_k = int(current_app.config.get("RAG_CONTEXT_IMAGE_K", 3))
-        rerank_candidates = int(current_app.config.get("RERANKER_CANDIDATES", max(text_top_k, context_text_k)))
+    def _get_executor() -> ThreadPoolExecutor:
+        if RAGService._executor is None:
+            with RAGService._executor_lock:
+                if RAGService._executor is None:
+                    workers = int(current_app.config.get("RAG_RETRIEVAL_WORKERS", 8))
+                    RAGService._executor = ThreadPoolExecutor(
+                        max_workers=max(1, workers),
+                        thread_name_prefix="rag-retrieval",
+                    )
+        return RAGService._executor
 
-        text_hits = []
-        page_hits = []
+    @staticmethod
+    def _get_speculative_executor() -> ThreadPoolExecutor:
+        if RAGService._speculative_executor is None:
+            with RAGService._executor_lock:
+                if RAGService._speculative_executor is None:
+                    workers = int(current_app.config.get("RAG_SPECULATIVE_WORKERS", 4))
+                    RAGService._speculative_executor = ThreadPoolExecutor(
+                        max_workers=max(1, workers),
+                        thread_name_prefix="rag-speculative",
+                    )
+        return RAGService._speculative_executor
 
-        embedding_start = time.perf_counter()
-        try:
-            text_dim = TextEmbeddingService.embedding_dimension()
-            if not text_dim:
-                raise RuntimeError("TEXT_EMBEDDING_DIMENSION is not configured.")
-            if text_dim:
-                QdrantService.ensure_text_collection(text_dim)
-            text_vec = TextEmbeddingService.embed(question)
-            text_hits = QdrantService.search_text(
-                query_vector=text_vec,
-                top_k=text_top_k,
-                language=language,
-            )
-        except Exception as e:
-            current_app.logger.warning("Text retrieval failed: %s", str(e))
+    @staticmethod
+    def _in_app_context(executor: ThreadPoolExecutor, fn, *args, **kwargs):
+        app = current_app._get_current_object()
 
+        def _run():
+            with app.app_context():
+                return fn(*args, **kwargs)
+
+        return executor.submit(_run)
+
+    @staticmethod
+    def _submit(fn, *args, **kwargs):
+        """
+        Run fn on the shared bounded executor inside its own app context
+        (and therefore its own DB session).
+        """
+        return RAGService._in_app_context(RAGService._get_executor(), fn, *args, **kwargs)
+
+    @staticmethod
+    def submit_speculative(fn, *args, **kwargs):
+        """
+        Start retrieval work before the caller knows it is needed. Uses its
+        own pool because hybrid_search waits on the retrieval pool, and
+        sharing one bounded pool could deadlock under load.
+        """
+        return RAGService._in_app_context(RAGService._get_speculative_executor(), fn, *args, **kwargs)
+
+    @staticmethod
+    def _await_branch(future, *, name: str, timeout: float, status: dict):
         try:
-            if current_app.config.get("ENABLE_PAGE_RETRIEVAL", True) and not RAGService._page_retrieval_disabled:
-                page_dim = ColPaliEmbeddingService.embedding_dimension()
-                if not page_dim:
-                    raise RuntimeError("IMAGE_EMBEDDING_DIMENSION is not configured.")
-                if page_dim:
-                    QdrantService.ensure_page_collection(page_dim)
-                page_vec = ColPaliEmbeddingService.embed_texts(question)
-                page_hits = QdrantService.search_pages(
-                    query_vector=page_vec,
-                    top_k=page_top_k,
-                    language=language,
-                )
+            result = future.result(timeout=timeout)
+            status[name] = "ok"
+            return result
+        except FutureTimeoutError:
+            future.cancel()
+            status[name] = "timeout"
+            current_app.logger.warning("%s retrieval timed out after %.1fs", name.capitalize(), timeout)
         except Exception as e:
-            current_app.logger.warning("Page retrieval failed: %s", str(e))
-            if "config.json" in str(e) or "not appear to have a file named" in str(e):
-                RAGService._page_retrieval_disabled = True
-                current_app.config["ENABLE_PAGE_RETRIEVAL"] = False
-                current_app.logger.warning("Page retrieval disabled due to model load failure.")
+            status[name] = "error"
+            current_app.logger.warning("%s retrieval failed: %s", name.capitalize(), str(e))
+        return None
+
+    @staticmethod
+    def _text_branch(
+        question: str,
+        language: str | None,
+        top_k: int,
+        query_vector: list[float] | None,
+        search_ef: int | None = None,
+    ):
+        timings = {}
+        t0 = time.perf_counter()
+        text_dim = TextEmbeddingService.embedding_dimension()
+        if not text_dim:
+            raise RuntimeError("TEXT_EMBEDDING_DIMENSION is not configured.")
+        QdrantService.ensure_text_collection(text_dim)
+        text_vec = query_vector if query_vector is not None else TextEmbeddingService.embed(question)
+        timings["text_embed_ms"] = int((time.perf_counter() - t0) * 1000)
 
-        embedding_time_ms = int((time.perf_counter() - embedding_start) * 1000)
+        t1 = time.perf_counter()
+        hits = QdrantService.search_text(
+            query_vector=text_vec,
+            top_k=top_k,
+            language=language,
+            hnsw_ef=search_ef,
+        )
+        timings["text_search_ms"] = int((time.perf_counter() - t1) * 1000)
 
-        text_ids = [h.id for h in text_hits]
+        t2 = time.perf_counter()
+        # Chunk text stored in the payload (QDRANT_PAYLOAD_TEXT) saves the
+        # Postgres round trip; older points without it, and points of
+        # deleted sources, go through the chunk lookup below.
         chunk_map = {}
+        if current_app.config.get("QDRANT_PAYLOAD_TEXT", False):
+            payload_hits = [h for h in hits if (h.payload or {}).get("chunk_text")]
+            live = RAGService._live_source_ids(h.payload.get("source_id") for h in payload_hits)
+            for h in payload_hits:
+                payload = h.payload
+                if payload.get("source_id") in live:
+                    chunk_map[h.id] = (
+                        payload["chunk_text"],
+                        RAGService.stored_context(payload.get("normalized_text"), payload.get("normalizer_version")),
+                    )
+        timings["text_payload_hits"] = len(chunk_map)
+        text_ids = [h.id for h in hits if h.id not in chunk_map]
         if text_ids:
             rows = (
                 KnowledgeChunk.query
                 .filter(KnowledgeChunk.id.in_(text_ids))
-                .with_entities(KnowledgeChunk.id, KnowledgeChunk.chunk_text)
+                .with_entities(
+                    KnowledgeChunk.id,
+                    KnowledgeChunk.chunk_text,
+                    KnowledgeChunk.normalized_text,
+                    KnowledgeChunk.normalizer_version,
+                )
                 .all()
             )
-            chunk_map = {r.id: r.chunk_text for r in rows}
+            chunk_map.update({
+                r.id: (r.chunk_text, RAGService.stored_context(r.normalized_text, r.normalizer_version))
+                for r in rows
+            })
 
-        text_results = []
-        for hit in text_hits:
-            text = chunk_map.get(hit.id)
+        results = []
+        for hit in hits:
+            text, context = chunk_map.get(hit.id, (None, None))
             if text:
-                text_results.append({
+                results.append({
                     "chunk_id": hit.id,
                     "chunk_text": text,
+                    "context_text": context,
                     "score": float(hit.score),
                 })
+        timings["text_hydrate_ms"] = int((time.perf_counter() - t2) * 1000)
+        timings["text_ms"] = int((time.perf_counter() - t0) * 1000)
+        return results, timings
+
+    @staticmethod
+    def _live_source_ids(source_ids) -> set:
+        """The given source ids that still exist, so payload hits of deleted sources are dropped."""
+        ids = {int(s) for s in source_ids if s is not None}
+        if not ids:
+            return set()
+        rows = KnowledgeSource.query.filter(KnowledgeSource.id.in_(ids)).with_entities(KnowledgeSource.id).all()
+        return {r.id for r in rows}
+
+    @staticmethod
+    def stored_context(normalized_text: str | None, version: int | None) -> str | None:
+        """Ingest-time normalized text, if it was produced by the current normalizer."""
+        if normalized_text is None or version != NORMALIZER_VERSION:
+            return None
+        return normalized_text
+
+    @staticmethod
+    def _page_branch(question: str, language: str | None, top_k: int, search_ef: int | None = None):
+        timings = {}
+        t0 = time.perf_counter()
+        try:
+            page_dim = ColPaliEmbeddingService.embedding_dimension()
+            if not page_dim:
+                raise RuntimeError("IMAGE_EMBEDDING_DIMENSION is not configured.")
+            QdrantService.ensure_page_collection(page_dim)
+            page_vec = ColPaliEmbeddingService.embed_texts(question)
+        except Exception as e:
+            if "config.json" in str(e) or "not appear to have a file named" in str(e):
+                RAGService._page_retrieval_disabled = True
+                current_app.config["ENABLE_PAGE_RETRIEVAL"] = False
+                current_app.logger.warning("Page retrieval disabled due to model load failure.")
+            raise
+        timings["page_embed_ms"] = int((time.perf_counter() - t0) * 1000)
+
+        t1 = time.perf_counter()
+        hits = QdrantService.search_pages(
+            query_vector=page_vec,
+            top_k=top_k,
+            language=language,
+            hnsw_ef=search_ef,
+        )
+        timings["page_search_ms"] = int((time.perf_counter() - t1) * 1000)
+
+        t2 = time.perf_counter()
+        page_map = {}
+        if current_app.config.get("QDRANT_PAYLOAD_TEXT", False):
+            payload_hits = [h for h in hits if (h.payload or {}).get("image_path")]
+            live = RAGService._live_source_ids(h.payload.get("source_id") for h in payload_hits)
+            page_map = {
+                h.id: SimpleNamespace(image_path=h.payload["image_path"], page_number=h.payload.get("page_number"))
+                for h in payload_hits
+                if h.payload.get("source_id") in live
+            }
+        page_ids = [h.id for h in hits if h.id not in page_map]
+        if page_ids:
+            rows = (
+                KnowledgePage.query
+                .filter(KnowledgePage.id.in_(page_ids))
+                .with_entities(KnowledgePage.id, KnowledgePage.image_path, KnowledgePage.page_number)
+                .all()
+            )
+            page_map.update({r.id: r for r in rows})
+
+        results = []
+        for hit in hits:
+            row = page_map.get(hit.id)
+            if row:
+                results.append({
+                    "page_id": hit.id,
+                    "image_path": row.image_path,
+                    "page_number": row.page_number,
+                    "score": float(hit.score),
+                })
+        timings["page_hydrate_ms"] = int((time.perf_counter() - t2) * 1000)
+        timings["page_ms"] = int((time.perf_counter() - t0) * 1000)
+        return results, timings
+
+    @staticmethod
+    def _rrf_fuse(dense: list[dict], lexical: list[dict], k: int) -> list[dict]:
+        """
+        Reciprocal rank fusion of the dense and keyword chunk lists. Each
+        chunk keeps its vector "score" (None if only keyword search found it)
+        and gains "rrf_score"; the result is ordered by rrf_score.
+        """
+        fused = {}
+        for rank, item in enumerate(dense, start=1):
+            fused[item["chunk_id"]] = {**item, "rrf_score": 1.0 / (k + rank)}
+        for rank, item in enumerate(lexical, start=1):
+            entry = fused.get(item["chunk_id"])
+            if entry is None:
+                entry = fused[item["chunk_id"]] = {**item, "score": None, "rrf_score": 0.0}
+            else:
+                entry["lexical_score"] = item["lexical_score"]
+            entry["rrf_score"] += 1.0 / (k + rank)
+        return sorted(fused.values(), key=lambda r: r["rrf_score"], reverse=True)
+
+    @staticmethod
+    def hybrid_search(
+        question: str,
+        language: str | None = None,
+        query_vector: list[float] | None = None,
+        search_ef: int | None = None,
+    ) -> dict:
+        """
+        Text, keyword and page retrieval run concurrently on a bounded
+        executor; each branch has its own timeout so a slow ColPali path
+        cannot hold up text. Dense and keyword chunk hits are merged with
+        reciprocal rank fusion before reranking.
+
+        search_ef overrides QDRANT_SEARCH_EF (HNSW candidate list size) for
+        this request, trading latency for recall.
+        """
+        t0 = time.perf_counter()
+        text_top_k = int(current_app.config.get("RAG_TEXT_TOP_K", 12))
+        page_top_k = int(current_app.config.get("RAG_PAGE_TOP_K", 6))
+        context_text_k = int(current_app.config.get("RAG_CONTEXT_TEXT_K", 5))
+        context_image_k = int(current_app.config.get("RAG_CONTEXT_IMAGE_K", 3))
+        rerank_candidates = int(current_app.config.get("RERANKER_CANDIDATES", max(text_top_k, context_text_k)))
+        text_timeout = float(current_app.config.get("RAG_TEXT_TIMEOUT_SEC", 15))
+        page_timeout = float(current_app.config.get("RAG_PAGE_TIMEOUT_SEC", 8))
+        lexical_timeout = float(current_app.config.get("RAG_LEXICAL_TIMEOUT_SEC", 3))
+
+        timings = {}
+        branch_status = {"text": "ok", "lexical": "disabled", "page": "disabled"}
+
+        text_future = RAGService._submit(
+            RAGService._text_branch, question, language, text_top_k, query_vector, search_ef
+        )
+        lexical_future = None
+        if LexicalSearchService.enabled():
+            lexical_top_k = int(current_app.config.get("RAG_LEXICAL_TOP_K", 12))
+            lexical_future = RAGService._submit(LexicalSearchService.search, question, language, lexical_top_k)
+        page_future = None
+        if current_app.config.get("ENABLE_PAGE_RETRIEVAL", True) and not RAGService._page_retrieval_disabled:
+            page_future = RAGService._submit(RAGService._page_branch, question, language, page_top_k, search_ef)
+
+        text_results = []
+        page_results = []
+        result = RAGService._await_branch(text_future, name="text", timeout=text_timeout, status=branch_status)
+        if result:
+            text_results, text_timings = result
+            timings.update(text_timings)
+
+        if lexical_future is not None:
+            remaining = lexical_timeout - (time.perf_counter() - t0)
+            result = RAGService._await_branch(
+                lexical_future, name="lexical", timeout=max(remaining, 0.0), status=branch_status
+            )
+            if result:
+                lexical_results, lexical_timings = result
+                timings.update(lexical_timings)
+                timings["lexical_hits"] = len(lexical_results)
+                if lexical_results:
+                    rrf_k = int(current_app.config.get("RAG_RRF_K", 60))
+                    text_results = RAGService._rrf_fuse(text_results, lexical_results, rrf_k)
+
+        if page_future is not None:
+            # Both branches started together, so the page branch only gets what is left of its own budget.
+            remaining = page_timeout - (time.perf_counter() - t0)
+            result = RAGService._await_branch(
+                page_future, name="page", timeout=max(remaining, 0.0), status=branch_status
+            )
+            if result:
+                page_results, page_timings = result
+                timings.update(page_timings)
+
+        timings["retrieval_ms"] = int((time.perf_counter() - t0) * 1000)
 
         reranked = text_results
+        rerank_start = time.perf_counter()
         if text_results:
             try:
                 candidates = text_results[:rerank_candidates]
                 ranked = RerankerService.rerank(
                     question,
                     [c["chunk_text"] for c in candidates],
+                    keys=[c["chunk_id"] for c in candidates],
+                    vector_scores=[c["score"] for c in candidates],
+                    priority=[c.get("rrf_score", c["score"]) for c in candidates],
+                    top_k=context_text_k,
                 )
                 reranked = [
                     {
@@ -99,36 +350,21 @@ class RAGService:
                 ]
             except Exception as e:
                 current_app.logger.warning("Reranker failed: %s", str(e))
+        timings["rerank_ms"] = int((time.perf_counter() - rerank_start) * 1000)
 
-        contexts_text = [normalize_rag_context(r["chunk_text"]) for r in reranked[:context_text_k]]
+        # Chunks without a current ingest-time normalization (see
+        # backfill_normalized_chunks) are normalized here.
+        contexts_text = [
+            r["context_text"] if r.get("context_text") is not None else normalize_rag_context(r["chunk_text"])
+            for r in reranked[:context_text_k]
+        ]
         chunk_ids = [r["chunk_id"] for r in reranked[:context_text_k]]
 
-        page_ids = [h.id for h in page_hits]
-        page_map = {}
-        if page_ids:
-            rows = (
-                KnowledgePage.query
-                .filter(KnowledgePage.id.in_(page_ids))
-                .with_entities(KnowledgePage.id, KnowledgePage.image_path, KnowledgePage.page_number)
-                .all()
-            )
-            page_map = {r.id: r for r in rows}
-
-        page_results = []
-        for hit in page_hits:
-            row = page_map.get(hit.id)
-            if row:
-                page_results.append({
-                    "page_id": hit.id,
-                    "image_path": row.image_path,
-                    "page_number": row.page_number,
-                    "score": float(hit.score),
-                })
-
         contexts_images = page_results[:context_image_k]
         page_ids_used = [p["page_id"] for p in contexts_images]
 
-        best_text_score = max([r["score"] for r in text_results], default=None)
+        # Keyword-only hits have no vector score and do not count towards the threshold.
+        best_text_score = max([r["score"] for r in text_results if r["score"] is not None], default=None)
         best_page_score = max([r["score"] for r in page_results], default=None)
 
         text_threshold = float(current_app.config.get("RAG_TEXT_SCORE_THRESHOLD", 0.2))
@@ -145,10 +381,20 @@ class RAGService:
         threshold_used = page_threshold if (best_page_score or 0) >= (best_text_score or 0) else text_threshold
 
         elapsed_ms = int((time.perf_counter() - t0) * 1000)
+        timings["total_ms"] = elapsed_ms
         current_app.logger.info(
-            "RAG hybrid search complete text_hits=%s page_hits=%s ms=%s",
+            "RAG hybrid search complete text_hits=%s lexical_hits=%s page_hits=%s text=%s/%sms lexical=%s/%sms "
+            "page=%s/%sms rerank_ms=%s ms=%s",
             len(text_results),
+            timings.get("lexical_hits", 0),
             len(page_results),
+            branch_status["text"],
+            timings.get("text_ms", 0),
+            branch_status["lexical"],
+            timings.get("lexical_ms", 0),
+            branch_status["page"],
+            timings.get("page_ms", 0),
+            timings["rerank_ms"],
             elapsed_ms,
         )
 
@@ -164,5 +410,6 @@ class RAGService:
             "has_verified_sources": has_verified_sources,
             "contexts_found": len(text_results) + len(page_results),
             "contexts_used": (len(contexts_text) + len(contexts_images)) if has_verified_sources else 0,
-            "embedding_time_ms": embedding_time_ms,
+            "timings": timings,
+            "branch_status": branch_status,
         }
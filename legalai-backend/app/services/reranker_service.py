@@ -1,7 +1,13 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
 from typing import Iterable
 
 from flask import current_app
 
+from ..utils import inference_backend, model_host_client
+
 try:
     import torch
 except Exception:  # pragma: no cover
@@ -13,12 +19,44 @@ class RerankerService:
     _tokenizer = None
     _model_name = None
     _device = None
+    _backend = None
+    _load_lock = threading.Lock()
+
+    # (query hash, model, backend, chunk id) -> cross-encoder score
+    _score_cache: "OrderedDict[tuple, float]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    _stats = {"requests": 0, "pairs": 0, "cache_hits": 0, "scored": 0, "skipped": 0, "early_stopped": 0}
 
     @staticmethod
     def _load_model():
         if RerankerService._model is not None:
             return RerankerService._model, RerankerService._tokenizer
 
+        with RerankerService._load_lock:
+            if RerankerService._model is not None:
+                return RerankerService._model, RerankerService._tokenizer
+
+            model_name = current_app.config.get("RERANKER_MODEL", "BAAI/bge-reranker-v2-m3")
+            device = current_app.config.get("RERANKER_DEVICE", "cpu")
+            backend = inference_backend.backend_for("RERANKER_BACKEND")
+            if backend == "onnx":
+                device = "cpu"
+
+            model, tokenizer = RerankerService.build_model(backend, model_name, device)
+
+            RerankerService._model = model
+            RerankerService._tokenizer = tokenizer
+            RerankerService._model_name = model_name
+            RerankerService._device = device
+            RerankerService._backend = backend
+        return model, tokenizer
+
+    @staticmethod
+    def build_model(backend: str, model_name: str, device: str = "cpu"):
+        """
+        A fresh (uncached) (model, tokenizer) pair for backend: torch (fp32),
+        int8 (dynamic quantization) or onnx (ONNX Runtime, CPU).
+        """
         if torch is None:  # pragma: no cover
             raise RuntimeError("torch is required for reranker.")
 
@@ -27,44 +65,248 @@ class RerankerService:
         except Exception as e:  # pragma: no cover
             raise RuntimeError("transformers is required for reranker.") from e
 
-        model_name = current_app.config.get("RERANKER_MODEL", "BAAI/bge-reranker-v2-m3")
-        device = current_app.config.get("RERANKER_DEVICE", "cpu")
-
+        inference_backend.apply_torch_threads()
         tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+        if backend == "onnx":
+            return inference_backend.load_onnx("ORTModelForSequenceClassification", model_name), tokenizer
+
         model = AutoModelForSequenceClassification.from_pretrained(model_name, trust_remote_code=True)
         model.to(device)
         model.eval()
-
-        RerankerService._model = model
-        RerankerService._tokenizer = tokenizer
-        RerankerService._model_name = model_name
-        RerankerService._device = device
+        if backend == "int8":
+            model = inference_backend.quantize_int8(model, device)
         return model, tokenizer
 
     @staticmethod
-    def rerank(query: str, passages: Iterable[str]):
+    def _score(query: str, passages: list[str]) -> list[float]:
+        if model_host_client.enabled():
+            ranked = model_host_client.call("rerank", query=query, passages=passages)
+            scores = [0.0] * len(passages)
+            for idx, score in ranked:
+                scores[int(idx)] = float(score)
+            return scores
+
+        model, tokenizer = RerankerService._load_model()
+        return RerankerService.score_with(model, tokenizer, query, passages, RerankerService._device)
+
+    @staticmethod
+    def _query_hash(query: str) -> str:
+        folded = re.sub(r"\s+", " ", query or "").strip().casefold().rstrip(" ?.!؟۔")
+        return hashlib.sha256(folded.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _cache_get(keys: list) -> dict[int, float]:
+        hits = {}
+        with RerankerService._cache_lock:
+            for i, key in enumerate(keys):
+                score = RerankerService._score_cache.get(key)
+                if score is not None:
+                    RerankerService._score_cache.move_to_end(key)
+                    hits[i] = score
+        return hits
+
+    @staticmethod
+    def _cache_put(items: list[tuple[tuple, float]]):
+        max_size = int(current_app.config.get("RERANKER_CACHE_SIZE", 20000))
+        with RerankerService._cache_lock:
+            for key, score in items:
+                RerankerService._score_cache[key] = score
+                RerankerService._score_cache.move_to_end(key)
+            while len(RerankerService._score_cache) > max_size:
+                RerankerService._score_cache.popitem(last=False)
+
+    @staticmethod
+    def _clear_winner(vector_scores: list[float | None] | None) -> bool:
+        dense = [s for s in vector_scores or [] if s is not None]
+        if len(dense) < 2:
+            return False
+        top, second = sorted(dense, reverse=True)[:2]
+        margin = float(current_app.config.get("RERANKER_SKIP_MARGIN", 0.15))
+        min_score = float(current_app.config.get("RERANKER_SKIP_MIN_SCORE", 0.6))
+        return top >= min_score and top - second >= margin
+
+    @staticmethod
+    def _top_set(scores: dict[int, float], top_k: int) -> frozenset:
+        return frozenset(sorted(scores, key=scores.get, reverse=True)[:top_k])
+
+    @staticmethod
+    def _record(pairs: int, cache_hits: int, scored: int, skipped: bool, early_stopped: bool) -> dict:
+        with RerankerService._cache_lock:
+            s = RerankerService._stats
+            s["requests"] += 1
+            s["pairs"] += pairs
+            s["cache_hits"] += cache_hits
+            s["scored"] += scored
+            s["skipped"] += int(skipped)
+            s["early_stopped"] += int(early_stopped)
+            return dict(s)
+
+    @staticmethod
+    def stats() -> dict:
+        with RerankerService._cache_lock:
+            s = dict(RerankerService._stats)
+            size = len(RerankerService._score_cache)
+        requests = s["requests"] or 1
+        pairs = s["pairs"] or 1
+        return {
+            "requests": s["requests"],
+            "pairs": s["pairs"],
+            "cacheHits": s["cache_hits"],
+            "scored": s["scored"],
+            "skipped": s["skipped"],
+            "earlyStopped": s["early_stopped"],
+            "cacheHitRate": round(s["cache_hits"] / pairs, 4),
+            "skipRate": round(s["skipped"] / requests, 4),
+            "earlyStopRate": round(s["early_stopped"] / requests, 4),
+            "pairsSavedRate": round(1 - s["scored"] / pairs, 4) if s["pairs"] else 0.0,
+            "cacheEntries": size,
+        }
+
+    @staticmethod
+    def rerank(
+        query: str,
+        passages: Iterable[str],
+        *,
+        keys: list | None = None,
+        vector_scores: list[float | None] | None = None,
+        priority: list[float] | None = None,
+        top_k: int | None = None,
+    ):
+        """
+        Rank passages for query as [(index, score), ...], best first.
+
+        With keys (chunk ids) scores are cached per (normalized query, chunk).
+        With RERANKER_ADAPTIVE and vector_scores (None for candidates found
+        only by keyword search), reranking is skipped when the dense scores
+        have a clear winner, and candidates are scored in priority order
+        (default: vector score) in RERANKER_EARLY_STOP_BATCH steps until the
+        top_k set stops changing. Skipped and unscored candidates keep the
+        priority order, with a None score.
+        """
         passages = list(passages or [])
         if not passages:
             return []
+        if priority is None and vector_scores is not None:
+            priority = [s if s is not None else float("-inf") for s in vector_scores]
 
-        model, tokenizer = RerankerService._load_model()
+        adaptive = bool(current_app.config.get("RERANKER_ADAPTIVE", False)) and vector_scores is not None
+        if adaptive and RerankerService._clear_winner(vector_scores):
+            totals = RerankerService._record(len(passages), 0, 0, skipped=True, early_stopped=False)
+            RerankerService._log(len(passages), 0, 0, "skipped", totals)
+            order = sorted(range(len(passages)), key=lambda i: priority[i], reverse=True)
+            return [(i, None) for i in order]
+
+        use_cache = keys is not None and int(current_app.config.get("RERANKER_CACHE_SIZE", 20000)) > 0
+        cache_keys = []
+        scores = {}
+        if use_cache:
+            qhash = RerankerService._query_hash(query)
+            model = current_app.config.get("RERANKER_MODEL", "BAAI/bge-reranker-v2-m3")
+            backend = current_app.config.get("RERANKER_BACKEND", "torch")
+            cache_keys = [(qhash, model, backend, key) for key in keys]
+            scores = RerankerService._cache_get(cache_keys)
+        cache_hits = len(scores)
+
+        order = list(range(len(passages)))
+        if priority is not None:
+            order.sort(key=lambda i: priority[i], reverse=True)
+        pending = [i for i in order if i not in scores]
+
+        top_k = top_k or len(passages)
+        step = int(current_app.config.get("RERANKER_EARLY_STOP_BATCH", 5)) if adaptive else 0
+        step = step if step > 0 else len(pending) or 1
+        previous = RerankerService._top_set(scores, top_k) if len(scores) >= top_k else None
+        scored = 0
+        early_stopped = False
+        while pending:
+            batch, pending = pending[:step], pending[step:]
+            batch_scores = RerankerService._score(query, [passages[i] for i in batch])
+            scored += len(batch)
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+            if use_cache:
+                RerankerService._cache_put([(cache_keys[i], scores[i]) for i in batch])
+
+            current = RerankerService._top_set(scores, top_k)
+            if pending and current == previous:
+                early_stopped = True
+                break
+            previous = current
+
+        totals = RerankerService._record(len(passages), cache_hits, scored, skipped=False, early_stopped=early_stopped)
+        RerankerService._log(len(passages), cache_hits, scored, "early_stop" if early_stopped else "full", totals)
 
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        ranked += [(i, None) for i in pending]
+        return ranked
+
+    @staticmethod
+    def _log(pairs: int, cache_hits: int, scored: int, mode: str, totals: dict):
+        requests = totals["requests"] or 1
+        total_pairs = totals["pairs"] or 1
+        current_app.logger.info(
+            "Rerank pairs=%s cached=%s scored=%s mode=%s hit_rate=%.3f skip_rate=%.3f early_stop_rate=%.3f",
+            pairs,
+            cache_hits,
+            scored,
+            mode,
+            totals["cache_hits"] / total_pairs,
+            totals["skipped"] / requests,
+            totals["early_stopped"] / requests,
+        )
+
+    @staticmethod
+    def score_with(model, tokenizer, query: str, passages: list[str], device: str = "cpu") -> list[float]:
+        """
+        Cross-encoder scores for (query, passage) pairs, in passage order.
+
+        Pairs are tokenized unpadded, sorted by token length and run in
+        buckets of at most RERANKER_MAX_BATCH_TOKENS padded tokens, so one
+        long chunk only pads the pairs of similar length next to it.
+        """
         pairs = [(query, p) for p in passages]
         encoded = tokenizer(
             pairs,
-            padding=True,
             truncation=True,
-            return_tensors="pt",
             max_length=int(current_app.config.get("RERANKER_MAX_LENGTH", 512)),
         )
-        encoded = {k: v.to(RerankerService._device) for k, v in encoded.items()}
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+        max_tokens = int(current_app.config.get("RERANKER_MAX_BATCH_TOKENS", 8192))
 
-        with torch.no_grad():
-            outputs = model(**encoded)
-            scores = outputs.logits.squeeze(-1).detach().cpu().tolist()
-            if isinstance(scores, float):
-                scores = [scores]
+        scores = [0.0] * len(pairs)
+        for bucket in RerankerService._length_buckets(lengths, max_tokens):
+            batch = tokenizer.pad(
+                {k: [v[i] for i in bucket] for k, v in encoded.items()},
+                padding=True,
+                return_tensors="pt",
+            )
+            batch = {k: v.to(device) for k, v in batch.items()}
 
-        ranked = list(zip(range(len(passages)), scores))
-        ranked.sort(key=lambda x: x[1], reverse=True)
-        return ranked
+            with torch.no_grad():
+                outputs = model(**batch)
+                logits = outputs.logits.reshape(len(bucket), -1)[:, 0].detach().cpu().tolist()
+            for i, score in zip(bucket, logits):
+                scores[i] = float(score)
+        return scores
+
+    @staticmethod
+    def _length_buckets(lengths: list[int], max_tokens: int) -> list[list[int]]:
+        """
+        Indices grouped shortest first so that each bucket's padded size
+        (longest member x members) stays within max_tokens. A non-positive
+        max_tokens keeps everything in one batch.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        if max_tokens <= 0:
+            return [order] if order else []
+
+        buckets, current = [], []
+        for i in order:
+            # Sorted ascending, so the newcomer is the bucket's longest member.
+            if current and lengths[i] * (len(current) + 1) > max_tokens:
+                buckets.append(current)
+                current = []
+            current.append(i)
+        if current:
+            buckets.append(current)
+        return buckets
@@ -0,0 +1,273 @@
+import copy
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+from .embedding_service import TextEmbeddingService
+from ..utils.redis_client import get_redis
+
+
+class SemanticCacheService:
+    """
+    In-process semantic cache for chat retrieval results and final answers.
+
+    Entries are bucketed by language + province and matched by cosine
+    similarity of the normalized question embedding. Retrieval results are
+    shared across chat models; a cached answer is only served to requests
+    for the provider/model that generated it. The knowledge-base
+    version lives in Redis so an ingest in a Celery worker invalidates the
+    caches held by every web worker.
+    """
+
+    VERSION_KEY = "legalai:rag:kb_version"
+
+    _entries: "OrderedDict[str, dict]" = OrderedDict()
+    _lock = threading.Lock()
+    _kb_version = None
+    _version_checked_at = 0.0
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(current_app.config.get("SEMANTIC_CACHE_ENABLED", False)) and np is not None
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        return re.sub(r"\s+", " ", question or "").strip()
+
+    @staticmethod
+    def _bucket(language: str | None, province: str | None) -> str:
+        return f"{(language or 'en').lower()}|{(province or '').strip().lower()}"
+
+    @staticmethod
+    def _answer_scope(provider: str | None, model: str | None) -> str:
+        provider = provider or current_app.config.get("CHAT_PROVIDER") or ""
+        model = model or current_app.config.get("CHAT_MODEL") or ""
+        return f"{provider.strip().lower()}|{model.strip()}"
+
+    @staticmethod
+    def _exact_key(bucket: str, scope: str, normalized: str) -> str:
+        folded = normalized.casefold().rstrip(" ?.!؟۔")
+        return hashlib.sha256(f"{bucket}|{scope}|{folded}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _remote_version():
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            raw = client.get(SemanticCacheService.VERSION_KEY)
+        except Exception as e:
+            current_app.logger.debug("Semantic cache version read failed: %s", str(e))
+            return None
+        return int(raw) if raw is not None else 0
+
+    @staticmethod
+    def _sync_version():
+        interval = float(current_app.config.get("SEMANTIC_CACHE_VERSION_CHECK_SEC", 2))
+        now = time.monotonic()
+        if now - SemanticCacheService._version_checked_at < interval:
+            return
+        SemanticCacheService._version_checked_at = now
+
+        version = SemanticCacheService._remote_version()
+        if version is None:
+            return
+        with SemanticCacheService._lock:
+            if SemanticCacheService._kb_version != version:
+                if SemanticCacheService._kb_version is not None:
+                    current_app.logger.info(
+                        "Semantic cache cleared kb_version=%s->%s entries=%s",
+                        SemanticCacheService._kb_version,
+                        version,
+                        len(SemanticCacheService._entries),
+                    )
+                SemanticCacheService._entries.clear()
+                SemanticCacheService._kb_version = version
+
+    @staticmethod
+    def _expire_locked(now: float):
+        expired = [k for k, e in SemanticCacheService._entries.items() if e["expires_at"] <= now]
+        for k in expired:
+            SemanticCacheService._entries.pop(k, None)
+
+    @staticmethod
+    def _to_vector(vec):
+        arr = np.asarray(vec, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(arr))
+        return arr / norm if norm > 0 else arr
+
+    @staticmethod
+    def lookup(
+        question: str,
+        *,
+        language: str | None = None,
+        province: str | None = None,
+        want_answer: bool = True,
+        provider: str | None = None,
+        model: str | None = None,
+    ) -> dict:
+        """
+        Look up a cached retrieval/answer for a question. provider/model
+        are the request's chat overrides (None = configured defaults).
+
+        Returns a context dict that must be passed back to store():
+          - status: "disabled" | "miss" | "retrieval_hit" | "answer_hit"
+          - similarity: best cosine similarity found (or None)
+          - retrieval / answer: cached values on hit
+          - vector: question embedding computed for the lookup (reusable by hybrid_search)
+        """
+        t0 = time.perf_counter()
+        normalized = SemanticCacheService.normalize_question(question)
+        bucket = SemanticCacheService._bucket(language, province)
+        scope = SemanticCacheService._answer_scope(provider, model)
+        ctx = {
+            "status": "disabled",
+            "similarity": None,
+            "retrieval": None,
+            "answer": None,
+            "vector": None,
+            "bucket": bucket,
+            "scope": scope,
+            "normalized": normalized,
+            "key": SemanticCacheService._exact_key(bucket, scope, normalized),
+            "elapsed_ms": 0,
+        }
+        if not SemanticCacheService.enabled() or not normalized:
+            return ctx
+
+        ctx["status"] = "miss"
+        try:
+            SemanticCacheService._sync_version()
+        except Exception as e:
+            current_app.logger.debug("Semantic cache version sync failed: %s", str(e))
+
+        answer_threshold = float(current_app.config.get("SEMANTIC_CACHE_THRESHOLD", 0.95))
+        retrieval_threshold = float(current_app.config.get("SEMANTIC_CACHE_RETRIEVAL_THRESHOLD", 0.90))
+        now = time.time()
+
+        with SemanticCacheService._lock:
+            SemanticCacheService._expire_locked(now)
+            exact = SemanticCacheService._entries.get(ctx["key"])
+            if exact is not None:
+                SemanticCacheService._entries.move_to_end(ctx["key"])
+                exact = dict(exact)
+
+        if exact is not None:
+            SemanticCacheService._fill_hit(ctx, exact, 1.0, want_answer, answer_threshold)
+            ctx["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+            return ctx
+
+        try:
+            vec = SemanticCacheService._to_vector(TextEmbeddingService.embed(normalized))
+        except Exception as e:
+            current_app.logger.warning("Semantic cache embedding failed: %s", str(e))
+            ctx["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+            return ctx
+        ctx["vector"] = vec.tolist()
+
+        with SemanticCacheService._lock:
+            candidates = [
+                (k, e) for k, e in SemanticCacheService._entries.items()
+                if e["bucket"] == bucket and e["vector"].shape == vec.shape
+            ]
+            best_key, best_entry, best_sim = None, None, None
+            if candidates:
+                matrix = np.stack([e["vector"] for _, e in candidates])
+                sims = matrix @ vec
+                idx = int(np.argmax(sims))
+                # A same-model entry close enough to answer beats a slightly closer one from another model.
+                scoped = [i for i, (_, e) in enumerate(candidates) if e.get("scope") == scope and e.get("answer")]
+                if want_answer and scoped:
+                    best_scoped = max(scoped, key=lambda i: sims[i])
+                    if sims[best_scoped] >= answer_threshold:
+                        idx = best_scoped
+                best_key, best_entry = candidates[idx]
+                best_sim = float(sims[idx])
+                if best_sim >= retrieval_threshold:
+                    SemanticCacheService._entries.move_to_end(best_key)
+                    best_entry = dict(best_entry)
+
+        ctx["similarity"] = best_sim
+        if best_entry is not None and best_sim is not None and best_sim >= retrieval_threshold:
+            SemanticCacheService._fill_hit(ctx, best_entry, best_sim, want_answer, answer_threshold)
+
+        ctx["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+        return ctx
+
+    @staticmethod
+    def _fill_hit(ctx: dict, entry: dict, similarity: float, want_answer: bool, answer_threshold: float):
+        ctx["similarity"] = similarity
+        ctx["retrieval"] = copy.deepcopy(entry["retrieval"])
+        ctx["status"] = "retrieval_hit"
+        if (
+            want_answer
+            and entry.get("answer")
+            and entry.get("scope") == ctx.get("scope")
+            and similarity >= answer_threshold
+        ):
+            ctx["answer"] = entry["answer"]
+            ctx["status"] = "answer_hit"
+
+    @staticmethod
+    def store(ctx: dict, *, retrieval: dict, answer: str | None = None):
+        """
+        Store retrieval (and optionally the final answer) for the question in ctx.
+        Answers should only be stored when they did not depend on chat history.
+        """
+        if not ctx or ctx.get("status") == "disabled" or not SemanticCacheService.enabled():
+            return
+
+        ttl = int(current_app.config.get("SEMANTIC_CACHE_TTL_SEC", 3600))
+        max_entries = int(current_app.config.get("SEMANTIC_CACHE_MAX_ENTRIES", 1000))
+        now = time.time()
+        key = ctx["key"]
+
+        with SemanticCacheService._lock:
+            existing = SemanticCacheService._entries.get(key)
+            vector = existing["vector"] if existing is not None else None
+            if vector is None and ctx.get("vector") is not None:
+                vector = SemanticCacheService._to_vector(ctx["vector"])
+            if vector is None:
+                return
+
+            entry = {
+                "bucket": ctx["bucket"],
+                "scope": ctx.get("scope"),
+                "vector": vector,
+                "retrieval": copy.deepcopy(retrieval),
+                "answer": answer if answer is not None else (existing or {}).get("answer"),
+                "expires_at": now + ttl,
+            }
+            SemanticCacheService._entries[key] = entry
+            SemanticCacheService._entries.move_to_end(key)
+
+            SemanticCacheService._expire_locked(now)
+            while len(SemanticCacheService._entries) > max_entries:
+                SemanticCacheService._entries.popitem(last=False)
+
+    @staticmethod
+    def invalidate(reason: str = "knowledge_base_changed"):
+        """
+        Drop all cached entries in this process and bump the shared
+        knowledge-base version so other processes drop theirs too.
+        """
+        with SemanticCacheService._lock:
+            SemanticCacheService._entries.clear()
+            SemanticCacheService._version_checked_at = 0.0
+
+        client = get_redis()
+        if client is not None:
+            try:
+                SemanticCacheService._kb_version = int(client.incr(SemanticCacheService.VERSION_KEY))
+            except Exception as e:
+                current_app.logger.warning("Semantic cache invalidation failed: %s", str(e))
+        current_app.logger.info("Semantic cache invalidated reason=%s", reason)
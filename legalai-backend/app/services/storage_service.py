@@ -121,6 +121,24 @@ class StorageService:
 
         return path
 
+    @staticmethod
+    def delete_file(abs_path: str | None) -> bool:
+        """
+        Best-effort removal of a stored file; paths outside STORAGE_BASE are left alone.
+        """
+        if not abs_path:
+            return False
+        base = os.path.realpath(current_app.config["STORAGE_BASE"])
+        path = os.path.realpath(abs_path)
+        if os.path.commonpath([base, path]) != base or not os.path.isfile(path):
+            return False
+        try:
+            os.remove(path)
+            return True
+        except OSError as e:
+            current_app.logger.warning("Could not delete stored file %s: %s", abs_path, str(e))
+            return False
+
     @staticmethod
     def public_path(abs_path: str) -> str:
         """
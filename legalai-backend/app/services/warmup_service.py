@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+
+from flask import current_app
+
+from .embedding_service import TextEmbeddingService, ColPaliEmbeddingService
+from .reranker_service import RerankerService
+
+
+class WarmupService:
+    """
+    Loads the configured models at process start and runs one dummy forward
+    pass each, so the first chat request does not pay for lazy loading.
+
+    State is per process: a worker forked from a warmed-up parent (gunicorn
+    --preload) warms up again on its first readiness check. Only the text
+    embedder is required for readiness; a failed ColPali or reranker warmup
+    reports "degraded" because retrieval works without them.
+    """
+
+    _status: dict[str, dict] = {}
+    _pid = None
+    _running = False
+    _finished_at = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _warm_text():
+        TextEmbeddingService.embedding_dimension()
+        provider = current_app.config.get("TEXT_EMBEDDING_PROVIDER", "local")
+        # Remote embedding providers are only warmed up for their dimension.
+        if provider in {"local", "bge", "bge-m3"}:
+            TextEmbeddingService.embed(["warmup"])
+
+    @staticmethod
+    def _warm_colpali():
+        ColPaliEmbeddingService.embedding_dimension()
+        ColPaliEmbeddingService.embed_texts(["warmup"])
+
+    @staticmethod
+    def _warm_reranker():
+        RerankerService.rerank("warmup", ["warmup"])
+
+    @staticmethod
+    def _components(app) -> list[tuple[str, bool, object]]:
+        components = [("text", True, WarmupService._warm_text)]
+        if app.config.get("ENABLE_PAGE_RETRIEVAL", True):
+            components.append(("colpali", False, WarmupService._warm_colpali))
+        components.append(("reranker", False, WarmupService._warm_reranker))
+        return components
+
+    @staticmethod
+    def _begin(app) -> bool:
+        with WarmupService._lock:
+            if WarmupService._running and WarmupService._pid == os.getpid():
+                return False
+            WarmupService._pid = os.getpid()
+            WarmupService._running = True
+            WarmupService._finished_at = None
+            WarmupService._status = {
+                name: {"state": "pending", "required": required}
+                for name, required, _ in WarmupService._components(app)
+            }
+        return True
+
+    @staticmethod
+    def start(app) -> bool:
+        """
+        Warm up in a background thread. Returns False if a warmup is already
+        running in this process.
+        """
+        if not WarmupService._begin(app):
+            return False
+        threading.Thread(
+            target=WarmupService._run,
+            args=(app,),
+            name="model-warmup",
+            daemon=True,
+        ).start()
+        return True
+
+    @staticmethod
+    def run(app):
+        """Warm up synchronously (model host, scripts)."""
+        if WarmupService._begin(app):
+            WarmupService._run(app)
+
+    @staticmethod
+    def _run(app):
+        t0 = time.perf_counter()
+        with app.app_context():
+            try:
+                for name, _, warm in WarmupService._components(app):
+                    status = WarmupService._status[name]
+                    status["state"] = "loading"
+                    started = time.perf_counter()
+                    try:
+                        warm()
+                        status["state"] = "ready"
+                    except Exception as e:
+                        status["state"] = "failed"
+                        status["error"] = str(e)[:300]
+                        app.logger.warning("Model warmup failed component=%s error=%s", name, str(e))
+                    status["ms"] = int((time.perf_counter() - started) * 1000)
+            finally:
+                WarmupService._finished_at = time.time()
+                WarmupService._running = False
+            app.logger.info(
+                "Model warmup finished pid=%s ms=%s %s",
+                os.getpid(),
+                int((time.perf_counter() - t0) * 1000),
+                " ".join(f"{name}={s['state']}" for name, s in WarmupService._status.items()),
+            )
+
+    @staticmethod
+    def readiness(app) -> tuple[bool, dict]:
+        """
+        (ready, body) for the readiness probe. Starts warmup if this process
+        has not run one, and retries it after MODEL_WARMUP_RETRY_SEC when a
+        required model failed.
+        """
+        if not app.config.get("MODEL_WARMUP_ENABLED", True):
+            return True, {"status": "ready", "pid": os.getpid(), "components": {}}
+
+        if WarmupService._pid != os.getpid():
+            WarmupService.start(app)
+
+        components = {name: dict(s) for name, s in WarmupService._status.items()}
+        body = {"pid": os.getpid(), "components": components}
+        if WarmupService._running or WarmupService._finished_at is None:
+            return False, {"status": "warming", **body}
+
+        if any(s["required"] and s["state"] != "ready" for s in components.values()):
+            retry_sec = float(app.config.get("MODEL_WARMUP_RETRY_SEC", 30))
+            if time.time() - WarmupService._finished_at >= retry_sec:
+                WarmupService.start(app)
+            return False, {"status": "failed", **body}
+
+        if any(s["state"] != "ready" for s in components.values()):
+            return True, {"status": "degraded", **body}
+        return True, {"status": "ready", **body}
+
+
+def _reset_after_fork():
+    # A fork taken while the parent was mid-load (gunicorn --preload) would
+    # leave these locks held forever in the child.
+    WarmupService._lock = threading.Lock()
+    WarmupService._running = False
+    TextEmbeddingService._load_lock = threading.Lock()
+    ColPaliEmbeddingService._load_lock = threading.Lock()
+    RerankerService._load_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
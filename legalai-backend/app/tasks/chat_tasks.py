@@ -5,7 +5,9 @@ from .celery_app import celery
 from ..models.chat import ChatMessage
 from ..services.rag_service import RAGService
 from ..services.llm_service import LLMService
+from ..services.query_classifier_service import QueryClassifierService
 from ..services.rag_evaluation_service import RAGEvaluationService
+from ..services.semantic_cache_service import SemanticCacheService
 
 
 def _recent_conversation_messages(conversation_id: int, user_id: int, limit: int = 10) -> list[dict]:
@@ -43,17 +45,34 @@ def process_chat_async(
     provider: str | None = None,
     model: str | None = None,
     api_keys: dict | None = None,
+    route_tier: str | None = None,
 ):
     """
     Background chat generation to avoid request timeouts.
     Writes assistant message to DB when done (or error message on failure).
+    route_tier is the classifier tier from the request; "fused" means the
+    answer prompt still has to classify the question.
     """
     t0 = time.perf_counter()
     try:
         history = _recent_conversation_messages(conversation_id, user_id, limit=memory_limit)
 
-        retrieval = RAGService.hybrid_search(question, language=language)
-        embedding_time_ms = retrieval["embedding_time_ms"]
+        # The route stores the user's question before queueing, so it is the last history item.
+        prior_history = history[:-1] if history and history[-1]["role"] == "user" else history
+        cache_ctx = SemanticCacheService.lookup(
+            question,
+            language=language,
+            province=province,
+            want_answer=not prior_history,
+            provider=provider,
+            model=model,
+        )
+        if cache_ctx["retrieval"] is not None:
+            retrieval = cache_ctx["retrieval"]
+            embedding_time_ms = cache_ctx["elapsed_ms"]
+        else:
+            retrieval = RAGService.hybrid_search(question, language=language, query_vector=cache_ctx["vector"])
+            embedding_time_ms = retrieval["timings"]["retrieval_ms"] + cache_ctx["elapsed_ms"]
 
         chunk_ids = retrieval["chunk_ids"]
         threshold = retrieval["threshold_used"]
@@ -63,31 +82,48 @@ def process_chat_async(
         image_contexts = retrieval["contexts_images"]
         decision = "ANSWER_WITH_SOURCES" if has_verified_sources else "ANSWER_NO_SOURCES"
 
+        route = {"tier": route_tier}
+        route_out = {} if route_tier == "fused" else None
+        in_domain = True
         llm_start = time.perf_counter()
-        use_vlm = bool(image_contexts) or bool(current_app.config.get("VLM_ALWAYS", False))
-        if use_vlm:
-            answer, prompt_messages, _ = LLMService.chat_legal_awareness_multimodal(
-                question=question,
-                contexts=contexts,
-                images=image_contexts,
-                language=language,
-                province=province,
-                history=history,
-                provider_override=provider,
-                model_override=model,
-                api_keys=api_keys,
-            )
+        if cache_ctx["answer"] is not None:
+            answer, prompt_messages = cache_ctx["answer"], None
         else:
-            answer, prompt_messages, _ = LLMService.chat_legal_awareness(
-                question=question,
-                contexts=contexts,
-                language=language,
-                province=province,
-                history=history,
-                provider_override=provider,
-                model_override=model,
-                api_keys=api_keys,
-            )
+            use_vlm = bool(image_contexts) or bool(current_app.config.get("VLM_ALWAYS", False))
+            if use_vlm:
+                answer, prompt_messages, _ = LLMService.chat_legal_awareness_multimodal(
+                    question=question,
+                    contexts=contexts,
+                    images=image_contexts,
+                    language=language,
+                    province=province,
+                    history=history,
+                    provider_override=provider,
+                    model_override=model,
+                    api_keys=api_keys,
+                    route_out=route_out,
+                )
+            else:
+                answer, prompt_messages, _ = LLMService.chat_legal_awareness(
+                    question=question,
+                    contexts=contexts,
+                    language=language,
+                    province=province,
+                    history=history,
+                    provider_override=provider,
+                    model_override=model,
+                    api_keys=api_keys,
+                    route_out=route_out,
+                )
+            if QueryClassifierService.resolve_fused(route, route_out):
+                answer = QueryClassifierService.canned_reply(route["category"], language, province)
+                decision, in_domain = QueryClassifierService.decision_for(route["category"])
+            else:
+                SemanticCacheService.store(
+                    cache_ctx,
+                    retrieval=retrieval,
+                    answer=None if prior_history else answer,
+                )
         llm_time_ms = int((time.perf_counter() - llm_start) * 1000)
 
         ChatMessage.add_and_trim(
@@ -112,7 +148,7 @@ def process_chat_async(
             best_distance=best_distance,
             contexts_found=retrieval["contexts_found"],
             contexts_used=retrieval["contexts_used"],
-            in_domain=True,
+            in_domain=in_domain,
             decision=decision,
             chunk_ids=chunk_ids,
             embedding_time_ms=embedding_time_ms,
@@ -123,6 +159,9 @@ def process_chat_async(
             chat_model=model or current_app.config.get("CHAT_MODEL"),
             prompt_messages=prompt_messages,
             completion_text=answer,
+            cache_status=cache_ctx["status"],
+            cache_similarity=cache_ctx["similarity"],
+            route_tier=route_tier,
         )
     except Exception as e:
         current_app.logger.exception("Async chat task failed: %s", str(e))
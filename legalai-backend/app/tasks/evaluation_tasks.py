@@ -14,7 +14,7 @@ def _get_app():
     global _flask_app
     if _flask_app is None:
         from .. import create_app
-        _flask_app = create_app()
+        _flask_app = create_app(warmup=False)
     return _flask_app
 
 
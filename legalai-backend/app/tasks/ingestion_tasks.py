@@ -1,11 +1,13 @@
-import time
 from .celery_app import celery
 from ..extensions import db
-from ..models.rag import KnowledgeSource, KnowledgeChunk, KnowledgePage
-from ..services.embedding_service import TextEmbeddingService, ColPaliEmbeddingService
+from ..models.rag import KnowledgeSource, KnowledgeChunk
+from ..services.embedding_service import TextEmbeddingService
+from ..services.ingestion_service import IngestionService
 from ..services.qdrant_service import QdrantService
-from ..utils.text_extract import extract_text_from_source, chunk_text, ocr_images_to_text
-from ..utils.page_render import render_source_pages
+from ..services.semantic_cache_service import SemanticCacheService
+from ..services.storage_service import StorageService
+from ..utils.text_extract import chunk_text, ocr_images_to_text
+from ..utils.text_normalizer import NORMALIZER_VERSION, normalize_rag_context
 from flask import current_app
 
 _TASK_APP = None
@@ -30,145 +32,43 @@ def _get_task_app():
     except Exception:
         from .. import create_app
 
-        _TASK_APP = create_app()
+        _TASK_APP = create_app(warmup=False)
         return _TASK_APP
-def _retry_sleep(attempt: int):
-    time.sleep(min(2 ** attempt, 20))
 
 
 @celery.task
-def ingest_source(source_id: int):
+def ingest_source(source_id: int, replaced_path: str | None = None):
+    """
+    replaced_path is the file a re-ingest replaced; it is deleted once the
+    new version is ingested successfully.
+    """
     app = _get_task_app()
     with app.app_context():
-        src = KnowledgeSource.query.get(source_id)
-        if not src:
+        # Claim the source atomically: a second task for it (watchdog, auto-retry,
+        # re-ingest) must not build the same chunk pool and insert duplicates.
+        claimed = (
+            KnowledgeSource.query
+            .filter(KnowledgeSource.id == source_id, KnowledgeSource.status != "processing")
+            .update({"status": "processing", "error_message": None}, synchronize_session=False)
+        )
+        db.session.commit()
+        if not claimed:
+            current_app.logger.info("Ingestion skipped source=%s: missing or already processing", source_id)
             return
+        src = KnowledgeSource.query.get(source_id)
 
+        upserted = None
         try:
             src.retry_count = (src.retry_count or 0) + 1
-            src.status = "processing"
-            src.error_message = None
-            db.session.commit()
-
-            KnowledgeChunk.query.filter_by(source_id=src.id).delete()
-            KnowledgePage.query.filter_by(source_id=src.id).delete()
             db.session.commit()
 
-            try:
-                QdrantService.delete_source_points(src.id)
-            except Exception as e:
-                current_app.logger.warning("Qdrant delete failed for source=%s err=%s", src.id, str(e))
-
-            text = extract_text_from_source(src)
-            chunks = chunk_text(text)
-            chunks = [c for c in chunks if c and len(c.strip()) >= 5]
-
-            text_batch_size = int(current_app.config.get("TEXT_EMBEDDING_BATCH_SIZE", 32))
+            result = IngestionService.run(src)
+            upserted = result["upserted"]
+            chunks = result["chunks"]
+            pages = result["pages"]
+            image_embedding_ready = result["image_embedding_ready"]
             text_model_name = current_app.config.get("TEXT_EMBEDDING_MODEL", "BAAI/bge-m3")
-            text_dim = TextEmbeddingService.embedding_dimension()
-
-            if chunks and not text_dim:
-                raise RuntimeError("TEXT_EMBEDDING_DIMENSION is not configured and model dimension could not be inferred.")
-
-            if chunks and text_dim:
-                QdrantService.ensure_text_collection(text_dim)
-
-            for i in range(0, len(chunks), text_batch_size):
-                batch = chunks[i:i + text_batch_size]
-                rows = [
-                    KnowledgeChunk(
-                        source_id=src.id,
-                        chunk_text=ch,
-                        embedding_model=text_model_name,
-                        embedding_dimension=text_dim,
-                    )
-                    for ch in batch
-                ]
-                db.session.add_all(rows)
-                db.session.flush()
-
-                for attempt in range(3):
-                    try:
-                        embs = TextEmbeddingService.embed(batch)
-                        break
-                    except Exception as e:
-                        if attempt == 2:
-                            raise e
-                        _retry_sleep(attempt + 1)
-
-                payloads = [
-                    {
-                        "source_id": src.id,
-                        "chunk_id": row.id,
-                        "language": src.language,
-                        "title": src.title,
-                        "source_type": src.source_type,
-                    }
-                    for row in rows
-                ]
-                QdrantService.upsert_text_points(
-                    ids=[row.id for row in rows],
-                    vectors=embs,
-                    payloads=payloads,
-                )
-
-            pages = render_source_pages(src.id, src.source_type, src.file_path or "")
-            page_dim = None
-            image_embedding_ready = True
-            if pages:
-                try:
-                    page_dim = ColPaliEmbeddingService.embedding_dimension()
-                    if not page_dim:
-                        raise RuntimeError("IMAGE_EMBEDDING_DIMENSION is not configured.")
-                except Exception as e:
-                    current_app.logger.warning("ColPali init failed for source=%s err=%s", src.id, str(e))
-                    image_embedding_ready = False
-
-            if pages and page_dim:
-                QdrantService.ensure_page_collection(page_dim)
-
-            page_batch = int(current_app.config.get("IMAGE_EMBEDDING_BATCH_SIZE", 8))
-            if pages:
-                for i in range(0, len(pages), page_batch):
-                    batch = pages[i:i + page_batch]
-                    rows = [
-                        KnowledgePage(
-                            source_id=src.id,
-                            page_number=p["page_number"],
-                            image_path=p["path"],
-                            width=p.get("width"),
-                            height=p.get("height"),
-                        )
-                        for p in batch
-                    ]
-                    db.session.add_all(rows)
-                    db.session.flush()
-
-                    page_vectors = []
-                    if image_embedding_ready and page_dim:
-                        try:
-                            page_vectors = ColPaliEmbeddingService.embed_images([p["path"] for p in batch])
-                        except Exception as e:
-                            current_app.logger.warning("ColPali embed failed for source=%s err=%s", src.id, str(e))
-                            page_vectors = []
-
-                    payloads = [
-                        {
-                            "source_id": src.id,
-                            "page_id": row.id,
-                            "page_number": row.page_number,
-                            "language": src.language,
-                            "title": src.title,
-                            "source_type": src.source_type,
-                        }
-                        for row in rows
-                    ]
-                    if page_vectors:
-                        QdrantService.upsert_page_points(
-                            ids=[row.id for row in rows],
-                            vectors=page_vectors,
-                            payloads=payloads,
-                        )
+            text_dim = result["text_dim"] or TextEmbeddingService.embedding_dimension()
 
             if not chunks and pages:
                 ocr_text = ocr_images_to_text([p["path"] for p in pages], force=not image_embedding_ready)
@@ -176,6 +76,7 @@ def ingest_source(source_id: int):
                     chunks = chunk_text(ocr_text)
 
             db.session.commit()
+            upserted = None
 
             if not chunks and not pages:
                 src.status = "invalid"
@@ -187,10 +88,19 @@ def ingest_source(source_id: int):
             src.error_message = None
             src.embedding_model = text_model_name
             src.embedding_dimension = text_dim
+            src.ingested_hash = result["file_hash"]
             db.session.commit()
 
+            SemanticCacheService.invalidate(reason=f"ingest source={src.id}")
+            if replaced_path and not KnowledgeSource.query.filter_by(file_path=replaced_path).first():
+                StorageService.delete_file(replaced_path)
+            return {"changes": result["changes"], **result["metrics"]}
+
         except Exception as e:
             db.session.rollback()
+            if upserted is not None:
+                # The run's rows were rolled back; so must be the points it wrote.
+                IngestionService.discard_upserted(src.id, upserted)
             src.status = "failed"
             src.error_message = str(e)
             db.session.commit()
@@ -199,7 +109,54 @@ def ingest_source(source_id: int):
                 src.status = "queued"
                 db.session.commit()
                 delay = min(2 ** (src.retry_count or 1), 60)
-                ingest_source.apply_async((src.id,), countdown=delay)
+                ingest_source.apply_async((src.id,), {"replaced_path": replaced_path}, countdown=delay)
+
+@celery.task
+def backfill_normalized_chunks(batch_size: int = 500):
+    """
+    Store normalize_rag_context output for chunks ingested before it was
+    precomputed, or with an older NORMALIZER_VERSION. Walks the table by id
+    so each run is resumable; returns the number of chunks updated.
+    """
+    app = _get_task_app()
+    with app.app_context():
+        payload_text = bool(current_app.config.get("QDRANT_PAYLOAD_TEXT", False))
+        collection = current_app.config["QDRANT_TEXT_COLLECTION"]
+        updated = 0
+        last_id = 0
+        while True:
+            rows = (
+                KnowledgeChunk.query
+                .filter(KnowledgeChunk.id > last_id)
+                .filter(
+                    (KnowledgeChunk.normalizer_version.is_(None))
+                    | (KnowledgeChunk.normalizer_version != NORMALIZER_VERSION)
+                )
+                .order_by(KnowledgeChunk.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            for row in rows:
+                row.normalized_text = normalize_rag_context(row.chunk_text)
+                row.normalizer_version = NORMALIZER_VERSION
+            # Read before commit expires the rows (one SELECT per row after).
+            payloads = [(row.id, QdrantService.chunk_text_payload(row) if payload_text else None) for row in rows]
+            db.session.commit()
+            last_id = payloads[-1][0]
+            updated += len(payloads)
+
+            if payload_text:
+                for chunk_id, payload in payloads:
+                    try:
+                        QdrantService.set_payload(collection, chunk_id, payload)
+                    except Exception as e:
+                        current_app.logger.warning("Qdrant payload update failed chunk=%s err=%s", chunk_id, str(e))
+
+        current_app.logger.info("Normalized text backfill done chunks=%s version=%s", updated, NORMALIZER_VERSION)
+        return updated
+
 
 @celery.task
 def retry_stale_knowledge_sources():
@@ -0,0 +1,112 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+from .redis_client import get_redis
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+
+class EmbeddingCache:
+    """
+    Two-level cache of query embeddings: an in-process LRU in front of
+    Redis, so a question embedded by one worker (or by the request before a
+    retry) is not embedded again by another.
+
+    Keys are the model id plus a hash of the whitespace-normalized text.
+    Redis holds raw float16/float32 bytes (EMBEDDING_CACHE_DTYPE) instead
+    of JSON lists; the dtype is part of the key so a change never decodes
+    old bytes with the wrong width.
+    """
+
+    PREFIX = "legalai:emb"
+
+    def __init__(self, name: str):
+        self.name = name
+        self._entries: "OrderedDict[str, list[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(current_app.config.get("EMBEDDING_CACHE_ENABLED", True)) and np is not None
+
+    @staticmethod
+    def _dtype() -> str:
+        dtype = str(current_app.config.get("EMBEDDING_CACHE_DTYPE", "float16")).lower()
+        return dtype if dtype in {"float16", "float32"} else "float32"
+
+    def key(self, model_id: str, text: str) -> str:
+        normalized = re.sub(r"\s+", " ", text or "").strip()
+        digest = hashlib.sha256(f"{model_id}|{normalized}".encode("utf-8")).hexdigest()
+        return f"{self.PREFIX}:{self.name}:{self._dtype()}:{digest}"
+
+    def _count(self, field: str):
+        with self._lock:
+            self._stats[field] += 1
+
+    def _remember(self, key: str, vector: list[float]):
+        max_entries = int(current_app.config.get("EMBEDDING_CACHE_SIZE", 5000))
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, model_id: str, text: str) -> list[float] | None:
+        key = self.key(model_id, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._stats["local_hits"] += 1
+                return list(vector)
+
+        client = get_redis()
+        raw = None
+        if client is not None:
+            try:
+                raw = client.get(key)
+            except Exception as e:
+                current_app.logger.debug("Embedding cache read failed: %s", str(e))
+        if raw is None:
+            self._count("misses")
+            return None
+
+        vector = np.frombuffer(raw, dtype=self._dtype()).astype(np.float32).tolist()
+        self._remember(key, vector)
+        self._count("redis_hits")
+        return list(vector)
+
+    def put(self, model_id: str, text: str, vector) -> None:
+        key = self.key(model_id, text)
+        vector = [float(v) for v in vector]
+        self._remember(key, vector)
+
+        client = get_redis()
+        if client is None:
+            return
+        ttl = int(current_app.config.get("EMBEDDING_CACHE_TTL_SEC", 604800))
+        try:
+            client.set(key, np.asarray(vector, dtype=self._dtype()).tobytes(), ex=ttl if ttl > 0 else None)
+        except Exception as e:
+            current_app.logger.debug("Embedding cache write failed: %s", str(e))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        return {
+            "entries": entries,
+            "localHits": stats["local_hits"],
+            "redisHits": stats["redis_hits"],
+            "misses": stats["misses"],
+            "hitRate": round((stats["local_hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0,
+        }
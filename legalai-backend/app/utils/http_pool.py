@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_pid = None
+_lock = threading.Lock()
+
+_metrics: dict[str, dict] = {}
+_metrics_lock = threading.Lock()
+
+_local = threading.local()
+
+
+def _add_connect_time(t0: float) -> None:
+    _local.connects = getattr(_local, "connects", 0) + 1
+    _local.connect_ms = getattr(_local, "connect_ms", 0.0) + (time.perf_counter() - t0) * 1000
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(t0)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # Includes the TLS handshake.
+        t0 = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(t0)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def _build_session() -> requests.Session:
+    pool_connections = int(current_app.config.get("LLM_HTTP_POOL_CONNECTIONS", 4))
+    pool_maxsize = int(current_app.config.get("LLM_HTTP_POOL_MAXSIZE", 16))
+
+    adapter = _TimedAdapter(
+        pool_connections=max(1, pool_connections),
+        pool_maxsize=max(1, pool_maxsize),
+        max_retries=0,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(provider: str) -> requests.Session:
+    """
+    Return the keep-alive session for a provider, creating it on first use.
+
+    Sessions are per process: after a fork (gunicorn/Celery prefork) the
+    inherited sessions are dropped so sockets are never shared between
+    processes.
+    """
+    global _sessions_pid
+    pid = os.getpid()
+    session = _sessions.get(provider) if _sessions_pid == pid else None
+    if session is not None:
+        return session
+
+    with _lock:
+        if _sessions_pid != pid:
+            _sessions.clear()
+            _sessions_pid = pid
+        session = _sessions.get(provider)
+        if session is None:
+            session = _build_session()
+            _sessions[provider] = session
+    return session
+
+
+def _record(provider: str, *, ok: bool, connects: int, connect_ms: float, ttfb_ms: float | None, total_ms: float) -> None:
+    with _metrics_lock:
+        m = _metrics.setdefault(
+            provider,
+            {
+                "requests": 0,
+                "errors": 0,
+                "new_connections": 0,
+                "reused_connections": 0,
+                "connect_ms": 0.0,
+                "ttfb_ms": 0.0,
+                "ttfb_count": 0,
+                "total_ms": 0.0,
+            },
+        )
+        m["requests"] += 1
+        if not ok:
+            m["errors"] += 1
+        if connects:
+            m["new_connections"] += connects
+            m["connect_ms"] += connect_ms
+        else:
+            m["reused_connections"] += 1
+        if ttfb_ms is not None:
+            m["ttfb_ms"] += ttfb_ms
+            m["ttfb_count"] += 1
+        m["total_ms"] += total_ms
+
+
+def post(provider: str, url: str, **kwargs) -> requests.Response:
+    """
+    requests.post through the provider's pooled session, recording connect
+    (TCP + TLS), time-to-first-byte and total time.
+
+    For stream=True calls the total is measured up to the response headers;
+    reading the body happens later in the caller.
+    """
+    _local.connects = 0
+    _local.connect_ms = 0.0
+    t0 = time.perf_counter()
+    try:
+        resp = get_session(provider).post(url, **kwargs)
+    except Exception:
+        _record(
+            provider,
+            ok=False,
+            connects=_local.connects,
+            connect_ms=_local.connect_ms,
+            ttfb_ms=None,
+            total_ms=(time.perf_counter() - t0) * 1000,
+        )
+        raise
+
+    _record(
+        provider,
+        ok=resp.ok,
+        connects=_local.connects,
+        connect_ms=_local.connect_ms,
+        ttfb_ms=resp.elapsed.total_seconds() * 1000,
+        total_ms=(time.perf_counter() - t0) * 1000,
+    )
+    return resp
+
+
+def metrics_snapshot() -> dict:
+    """Per-provider HTTP timing for this process."""
+    with _metrics_lock:
+        items = {p: dict(m) for p, m in _metrics.items()}
+
+    snapshot = {}
+    for provider, m in sorted(items.items()):
+        requests_count = m["requests"] or 1
+        snapshot[provider] = {
+            "requests": m["requests"],
+            "errors": m["errors"],
+            "newConnections": m["new_connections"],
+            "reusedConnections": m["reused_connections"],
+            "reuseRate": round(m["reused_connections"] / requests_count * 100, 2),
+            "avgConnectMs": round(m["connect_ms"] / m["new_connections"], 1) if m["new_connections"] else 0.0,
+            "avgTtfbMs": round(m["ttfb_ms"] / m["ttfb_count"], 1) if m["ttfb_count"] else 0.0,
+            "avgTotalMs": round(m["total_ms"] / requests_count, 1),
+        }
+    return snapshot
@@ -0,0 +1,128 @@
+import os
+import re
+
+from flask import current_app
+
+try:
+    import torch
+except Exception:  # pragma: no cover
+    torch = None
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+BACKENDS = {"torch", "int8", "onnx"}
+
+
+def backend_for(key: str) -> str:
+    """Configured backend (EMBEDDING_BACKEND / RERANKER_BACKEND), default torch."""
+    backend = (current_app.config.get(key) or "torch").strip().lower()
+    if backend not in BACKENDS:
+        raise RuntimeError(f"{key} must be one of {', '.join(sorted(BACKENDS))}, got {backend!r}.")
+    return backend
+
+
+def num_threads() -> int:
+    return int(current_app.config.get("INFERENCE_NUM_THREADS", 0) or 0)
+
+
+def apply_torch_threads() -> None:
+    # torch's intra-op pool is process wide; 0 keeps torch's own default.
+    threads = num_threads()
+    if torch is not None and threads > 0 and torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+
+
+def quantize_int8(model, device: str):
+    """Dynamic int8 quantization of every Linear layer (CPU only)."""
+    if torch is None:  # pragma: no cover
+        raise RuntimeError("torch is required for int8 inference.")
+    if str(device) != "cpu":
+        raise RuntimeError(f"int8 dynamic quantization only runs on cpu, not {device}.")
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def _onnx_session_options():
+    try:
+        import onnxruntime
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError("onnxruntime is required for the onnx backend (pip install optimum[onnxruntime]).") from e
+
+    options = onnxruntime.SessionOptions()
+    threads = num_threads()
+    if threads > 0:
+        options.intra_op_num_threads = threads
+    return options
+
+
+def _onnx_export_dir(model_name: str) -> str | None:
+    base = current_app.config.get("ONNX_MODEL_DIR")
+    if not base:
+        return None
+    return os.path.join(base, re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name))
+
+
+def load_onnx(model_cls_name: str, model_name: str):
+    """
+    Load an optimum ORTModel, exporting it from the PyTorch checkpoint on
+    first use. Exports are kept under ONNX_MODEL_DIR so later starts skip
+    the (slow) conversion.
+    """
+    try:
+        import optimum.onnxruntime as ort
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError("optimum is required for the onnx backend (pip install optimum[onnxruntime]).") from e
+
+    model_cls = getattr(ort, model_cls_name)
+    options = _onnx_session_options()
+    export_dir = _onnx_export_dir(model_name)
+    if export_dir and os.path.exists(os.path.join(export_dir, "model.onnx")):
+        return model_cls.from_pretrained(export_dir, provider="CPUExecutionProvider", session_options=options)
+
+    model = model_cls.from_pretrained(
+        model_name,
+        export=True,
+        provider="CPUExecutionProvider",
+        session_options=options,
+    )
+    if export_dir:
+        os.makedirs(export_dir, exist_ok=True)
+        model.save_pretrained(export_dir)
+    return model
+
+
+class OnnxSentenceEncoder:
+    """
+    ONNX Runtime stand-in for SentenceTransformer.encode() on BGE models:
+    CLS pooling followed by L2 normalization, like the bge-m3 dense head.
+    """
+
+    def __init__(self, model_name: str, max_length: int = 8192):
+        from transformers import AutoTokenizer
+
+        self.model = load_onnx("ORTModelForFeatureExtraction", model_name)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.max_length = max_length
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.model.config.hidden_size)
+
+    def encode(self, inputs, normalize_embeddings=True, convert_to_numpy=True, batch_size=32, show_progress_bar=False):
+        out = []
+        for i in range(0, len(inputs), batch_size):
+            encoded = self.tokenizer(
+                list(inputs[i:i + batch_size]),
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            hidden = self.model(**encoded).last_hidden_state
+            out.append(np.asarray(hidden)[:, 0])
+        embeddings = np.concatenate(out, axis=0) if out else np.zeros((0, self.get_sentence_embedding_dimension()))
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings
@@ -0,0 +1,141 @@
+import bisect
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent single-item calls into one batched call.
+
+    Callers block in submit() while a worker thread takes the first queued
+    item, waits up to max_wait_ms (or until max_batch items are queued) for
+    more, runs batch_fn once over all of them and hands each caller its
+    own result. The worker runs inside the app context of the first caller
+    and is restarted after a fork.
+    """
+
+    BATCH_BUCKETS = [1, 2, 4, 8, 16, 32, 64]
+
+    def __init__(self, name: str, batch_fn, *, max_batch: int, max_wait_ms: float):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._metrics = self._empty_metrics()
+
+    def _empty_metrics(self) -> dict:
+        return {
+            "batches": 0,
+            "items": 0,
+            "errors": 0,
+            "max_batch": 0,
+            "queue_wait_ms": 0.0,
+            "max_queue_wait_ms": 0.0,
+            "forward_ms": 0.0,
+            "histogram": [0] * (len(self.BATCH_BUCKETS) + 1),
+        }
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid != pid:
+                # Queued items and the worker belong to the parent process.
+                self._queue = queue.Queue()
+                self._metrics = self._empty_metrics()
+            app = current_app._get_current_object()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(app,),
+                name=f"micro-batcher-{self.name}",
+                daemon=True,
+            )
+            self._thread.start()
+            self._pid = pid
+
+    def submit(self, item):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, app):
+        with app.app_context():
+            while True:
+                batch = self._collect()
+                started = time.perf_counter()
+                waits = [(started - queued_at) * 1000 for _, _, queued_at in batch]
+                ok = True
+                try:
+                    results = list(self.batch_fn([item for item, _, _ in batch]))
+                    if len(results) != len(batch):
+                        # Results cannot be matched to callers; fail them rather than hang.
+                        raise RuntimeError(
+                            f"{self.name} batch returned {len(results)} results for {len(batch)} items"
+                        )
+                    for (_, future, _), result in zip(batch, results):
+                        future.set_result(result)
+                except Exception as e:
+                    ok = False
+                    for _, future, _ in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                self._record(len(batch), waits, (time.perf_counter() - started) * 1000, ok)
+
+    def _record(self, size: int, waits: list[float], forward_ms: float, ok: bool):
+        with self._lock:
+            m = self._metrics
+            m["batches"] += 1
+            m["items"] += size
+            if not ok:
+                m["errors"] += 1
+            m["max_batch"] = max(m["max_batch"], size)
+            m["queue_wait_ms"] += sum(waits)
+            m["max_queue_wait_ms"] = max(m["max_queue_wait_ms"], max(waits))
+            m["forward_ms"] += forward_ms
+            m["histogram"][bisect.bisect_left(self.BATCH_BUCKETS, size)] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            m = dict(self._metrics)
+            histogram = list(m["histogram"])
+        batches = m["batches"] or 1
+        items = m["items"] or 1
+        labels = [f"<={b}" for b in self.BATCH_BUCKETS] + [f">{self.BATCH_BUCKETS[-1]}"]
+        return {
+            "maxBatch": self.max_batch,
+            "maxWaitMs": round(self.max_wait * 1000, 1),
+            "batches": m["batches"],
+            "items": m["items"],
+            "errors": m["errors"],
+            "avgBatchSize": round(m["items"] / batches, 2),
+            "largestBatch": m["max_batch"],
+            "batchSizes": dict(zip(labels, histogram)),
+            "avgQueueWaitMs": round(m["queue_wait_ms"] / items, 2),
+            "maxQueueWaitMs": round(m["max_queue_wait_ms"], 2),
+            "avgForwardMs": round(m["forward_ms"] / batches, 1),
+            "queued": self._queue.qsize(),
+        }
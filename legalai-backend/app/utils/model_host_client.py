@@ -0,0 +1,96 @@
+import json
+import os
+import socket
+import struct
+import threading
+
+from flask import current_app
+
+_HEADER = struct.Struct(">I")
+_local = threading.local()
+
+
+def enabled() -> bool:
+    """True when embeddings and reranking should be sent to the model host."""
+    return bool(current_app.config.get("MODEL_HOST_SOCKET"))
+
+
+def send_message(sock: socket.socket, obj) -> None:
+    data = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes | None:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def recv_message(sock: socket.socket):
+    """Next length-prefixed JSON message, or None when the peer closed."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    body = _recv_exact(sock, _HEADER.unpack(header)[0])
+    if body is None:
+        return None
+    return json.loads(body)
+
+
+def _drop_socket() -> None:
+    sock = getattr(_local, "sock", None)
+    _local.sock = None
+    if sock is not None:
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+
+def _get_socket(path: str, timeout: float) -> socket.socket:
+    # One connection per thread; never reuse one inherited across a fork.
+    if getattr(_local, "sock", None) is not None and getattr(_local, "pid", None) == os.getpid():
+        return _local.sock
+    _local.sock = None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(path)
+    _local.sock = sock
+    _local.pid = os.getpid()
+    return sock
+
+
+def call(op: str, **payload):
+    """
+    Run op on the model host and return its result.
+
+    A stale connection (host restarted) is retried once on a fresh socket.
+    Timeouts are not retried so a slow batch is not submitted twice.
+    Raises RuntimeError when the host is unreachable or the op failed.
+    """
+    path = current_app.config["MODEL_HOST_SOCKET"]
+    timeout = float(current_app.config.get("MODEL_HOST_TIMEOUT_SEC", 60))
+
+    for attempt in range(2):
+        try:
+            sock = _get_socket(path, timeout)
+            send_message(sock, {"op": op, **payload})
+            resp = recv_message(sock)
+            if resp is None:
+                raise ConnectionError("model host closed the connection")
+        except socket.timeout as e:
+            _drop_socket()
+            raise RuntimeError(f"Model host timed out after {timeout:.0f}s ({op})") from e
+        except (OSError, ConnectionError) as e:
+            _drop_socket()
+            if attempt:
+                raise RuntimeError(f"Model host unavailable at {path}: {e}") from e
+            continue
+
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error") or f"Model host {op} failed")
+        return resp.get("result")
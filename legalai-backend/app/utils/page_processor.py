@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+
+try:
+    import fitz  # PyMuPDF
+except Exception:  # pragma: no cover
+    fitz = None
+
+try:
+    from pypdf import PdfReader
+except Exception:  # pragma: no cover
+    PdfReader = None
+
+
+class PageProcessor:
+    """
+    Runs per-page PDF work (rendering, text extraction, OCR) over a
+    document's pages split into ranges of PDF_PAGE_RANGE_SIZE, on a
+    process pool of PDF_PAGE_WORKERS so large scanned documents use every
+    core. Page functions take (path, start, stop, *args) and return one
+    dict per page with "page_number" and "ms".
+
+    Workers are forked once per process and reused; they only run
+    PyMuPDF / pypdf / Pillow / tesseract code. With one worker, or when a
+    pool cannot be started (e.g. inside a daemonic process), ranges run
+    inline with the same functions.
+    """
+
+    _pool = None
+    _pool_pid = None
+    _disabled = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def workers() -> int:
+        return max(1, int(current_app.config.get("PDF_PAGE_WORKERS", 4)))
+
+    @staticmethod
+    def page_count(path: str) -> int:
+        if fitz is not None:
+            with fitz.open(path) as doc:
+                return doc.page_count
+        if PdfReader is not None:
+            return len(PdfReader(path).pages)
+        return 0
+
+    @staticmethod
+    def _executor():
+        workers = PageProcessor.workers()
+        if workers <= 1 or PageProcessor._disabled:
+            return None
+        pid = os.getpid()
+        if PageProcessor._pool is not None and PageProcessor._pool_pid == pid:
+            return PageProcessor._pool
+        with PageProcessor._lock:
+            if PageProcessor._pool is None or PageProcessor._pool_pid != pid:
+                # A pool inherited through fork belongs to the parent.
+                method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+                try:
+                    PageProcessor._pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context(method),
+                    )
+                    PageProcessor._pool_pid = pid
+                except Exception as e:
+                    current_app.logger.warning("PDF page pool unavailable, processing inline: %s", str(e))
+                    PageProcessor._disabled = True
+                    return None
+        return PageProcessor._pool
+
+    @staticmethod
+    def _reset_pool():
+        with PageProcessor._lock:
+            pool, PageProcessor._pool = PageProcessor._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _ranges(page_total: int) -> list[tuple[int, int]]:
+        size = max(1, int(current_app.config.get("PDF_PAGE_RANGE_SIZE", 4)))
+        return [(start, min(start + size, page_total)) for start in range(0, page_total, size)]
+
+    @staticmethod
+    def map_pages(fn, path: str, page_total: int, *args, label: str):
+        """
+        Yield fn's page dicts for pages [0, page_total) as their ranges
+        finish (not necessarily in page order) and log per-page timings.
+        """
+        ranges = PageProcessor._ranges(page_total)
+        started = time.perf_counter()
+        timings = []
+        pending = list(ranges)
+        workers = 1
+        try:
+            executor = PageProcessor._executor() if len(ranges) > 1 else None
+            if executor is not None:
+                workers = PageProcessor.workers()
+                try:
+                    futures = {executor.submit(fn, path, start, stop, *args): (start, stop) for start, stop in ranges}
+                    for future in as_completed(futures):
+                        pages = future.result()
+                        pending.remove(futures[future])
+                        timings.extend(p["ms"] for p in pages)
+                        yield from pages
+                except (BrokenProcessPool, AssertionError, OSError) as e:
+                    current_app.logger.warning("PDF page pool failed during %s, finishing inline: %s", label, str(e))
+                    PageProcessor._reset_pool()
+                    PageProcessor._disabled = isinstance(e, AssertionError)
+                    workers = 1
+
+            for start, stop in list(pending):
+                pages = fn(path, start, stop, *args)
+                pending.remove((start, stop))
+                timings.extend(p["ms"] for p in pages)
+                yield from pages
+        finally:
+            if timings:
+                current_app.logger.info(
+                    "PDF %s pages=%s workers=%s wall_ms=%.0f page_ms avg=%.1f max=%.1f",
+                    label,
+                    len(timings),
+                    workers,
+                    (time.perf_counter() - started) * 1000,
+                    sum(timings) / len(timings),
+                    max(timings),
+                )
@@ -1,8 +1,11 @@
 import os
-from typing import List
+import time
+from typing import Iterator, List
 
 from flask import current_app
 
+from .page_processor import PageProcessor
+
 try:
     import fitz  # PyMuPDF
 except Exception:  # pragma: no cover
@@ -13,69 +16,153 @@ try:
 except Exception:  # pragma: no cover
     Image = None
 
+try:
+    import pytesseract
+except Exception:  # pragma: no cover
+    pytesseract = None
+
 
 def render_source_pages(source_id: int, source_type: str, source_path: str) -> List[dict]:
     """
     Render PDF pages or normalize images into page PNGs.
     Returns list of page dicts with {page_number, path, width, height}.
     """
-    pages: List[dict] = []
+    return list(iter_source_pages(source_id, source_type, source_path))
+
+
+def iter_source_pages(source_id: int, source_type: str, source_path: str) -> Iterator[dict]:
+    """Like render_source_pages, but yields each page as soon as its PNG is written."""
     if not source_path:
-        return pages
+        return
 
     base = current_app.config["STORAGE_BASE"]
     out_dir = os.path.join(base, "knowledge_pages", f"source_{source_id}")
     os.makedirs(out_dir, exist_ok=True)
 
-    max_pages = int(current_app.config.get("MAX_PAGES_PER_DOC", 80))
     max_side = int(current_app.config.get("MAX_PAGE_IMAGE_SIDE", 1600))
-    dpi = int(current_app.config.get("PDF_RENDER_DPI", 150))
 
     if source_type == "pdf":
         if fitz is None:
             current_app.logger.warning("PyMuPDF missing; skipping PDF page rendering.")
-            return pages
+            return
 
-        with fitz.open(source_path) as doc:
-            for i, page in enumerate(doc):
-                if i >= max_pages:
-                    break
-                mat = fitz.Matrix(dpi / 72.0, dpi / 72.0)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                try:
-                    img = _resize_image(img, max_side)
-                    out_path = os.path.join(out_dir, f"page_{i + 1}.png")
-                    img.save(out_path, format="PNG", optimize=True)
-                    pages.append({
-                        "page_number": i + 1,
-                        "path": out_path,
-                        "width": img.width,
-                        "height": img.height,
-                    })
-                finally:
-                    img.close()
-        return pages
+        for page in iter_pdf_pages(source_id, source_path, text=False):
+            page.pop("text", None)
+            page.pop("ocr", None)
+            yield page
+        return
 
     if source_type in {"png", "jpg", "jpeg"}:
         if Image is None:
             current_app.logger.warning("Pillow missing; skipping image rendering.")
-            return pages
+            return
         with Image.open(source_path) as raw:
             img = raw.convert("RGB")
             try:
                 img = _resize_image(img, max_side)
                 out_path = os.path.join(out_dir, "page_1.png")
                 img.save(out_path, format="PNG", optimize=True)
-                pages.append({
+                page = {
                     "page_number": 1,
                     "path": out_path,
                     "width": img.width,
                     "height": img.height,
-                })
+                }
             finally:
                 img.close()
+        yield page
+
+
+def pdf_pass_available() -> bool:
+    return fitz is not None and Image is not None
+
+
+def iter_pdf_pages(source_id: int, source_path: str, *, render: bool = True, text: bool = True) -> Iterator[dict]:
+    """
+    Single pass over a PDF: each page range is opened once with PyMuPDF
+    and every page yields its text layer, OCR text when the page has no
+    text layer (ENABLE_OCR), and - for the first MAX_PAGES_PER_DOC pages
+    when `render` - its PNG {path, width, height}. A page is rasterized at
+    most once, for the PNG and OCR together. Pages arrive as their ranges
+    finish, not in page order.
+    """
+    if not source_path or not pdf_pass_available():
+        return
+
+    max_pages = int(current_app.config.get("MAX_PAGES_PER_DOC", 80))
+    page_total = PageProcessor.page_count(source_path)
+    if not text:
+        page_total = min(page_total, max_pages)
+
+    out_dir = None
+    if render:
+        out_dir = os.path.join(current_app.config["STORAGE_BASE"], "knowledge_pages", f"source_{source_id}")
+        os.makedirs(out_dir, exist_ok=True)
+
+    opts = {
+        "out_dir": out_dir,
+        "render_pages": min(page_total, max_pages) if render else 0,
+        "dpi": int(current_app.config.get("PDF_RENDER_DPI", 150)),
+        "max_side": int(current_app.config.get("MAX_PAGE_IMAGE_SIDE", 1600)),
+        "text": text,
+        "ocr": text and pytesseract is not None and bool(current_app.config.get("ENABLE_OCR", False)),
+        "min_text_chars": int(current_app.config.get("PDF_OCR_MIN_TEXT_CHARS", 20)),
+    }
+    ocr_pages = 0
+    for page in PageProcessor.map_pages(process_pdf_range, source_path, page_total, opts, label=f"pdf source={source_id}"):
+        ocr_pages += int(page.get("ocr", False))
+        error = page.pop("ocr_error", None)
+        if error:
+            current_app.logger.warning(
+                "PDF OCR failed source=%s page=%s, keeping text layer: %s", source_id, page["page_number"], error
+            )
+        yield page
+    if ocr_pages:
+        current_app.logger.info("PDF source=%s ocr_pages=%s of %s", source_id, ocr_pages, page_total)
+
+
+def process_pdf_range(source_path: str, start: int, stop: int, opts: dict) -> List[dict]:
+    """Text, per-page OCR and PNG for pages [start, stop); runs in a PageProcessor worker."""
+    pages = []
+    mat = fitz.Matrix(opts["dpi"] / 72.0, opts["dpi"] / 72.0)
+    with fitz.open(source_path) as doc:
+        for i in range(start, min(stop, doc.page_count)):
+            t0 = time.perf_counter()
+            page = doc[i]
+            entry = {"page_number": i + 1, "text": "", "ocr": False}
+            if opts["text"]:
+                entry["text"] = page.get_text("text") or ""
+            needs_ocr = opts["ocr"] and len(entry["text"].strip()) < opts["min_text_chars"]
+            render = i < opts["render_pages"]
+
+            if render or needs_ocr:
+                pix = page.get_pixmap(matrix=mat, alpha=False)
+                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                try:
+                    if needs_ocr:
+                        try:
+                            ocr_text = pytesseract.image_to_string(img)
+                        except Exception as e:
+                            # Keep the text layer; the caller logs the error.
+                            ocr_text = ""
+                            entry["ocr_error"] = str(e)
+                        if ocr_text.strip():
+                            entry["text"] = ocr_text
+                            entry["ocr"] = True
+                    if render:
+                        resized = _resize_image(img, opts["max_side"])
+                        try:
+                            out_path = os.path.join(opts["out_dir"], f"page_{i + 1}.png")
+                            resized.save(out_path, format="PNG", optimize=True)
+                            entry.update(path=out_path, width=resized.width, height=resized.height)
+                        finally:
+                            if resized is not img:
+                                resized.close()
+                finally:
+                    img.close()
 
+            entry["ms"] = (time.perf_counter() - t0) * 1000
+            pages.append(entry)
     return pages
 
 
@@ -0,0 +1,44 @@
+import threading
+
+from flask import current_app
+
+try:
+    import redis
+except Exception:  # pragma: no cover - optional dependency
+    redis = None
+
+_client = None
+_client_url = None
+_lock = threading.Lock()
+
+
+def get_redis():
+    """
+    Return a shared Redis client for REDIS_URL, or None when Redis is not
+    configured or the client library is missing.
+
+    Callers must treat Redis as best-effort and keep a local fallback.
+    """
+    global _client, _client_url
+    if redis is None:
+        return None
+    try:
+        url = current_app.config.get("REDIS_URL")
+    except Exception:
+        return None
+    if not url:
+        return None
+
+    if _client is not None and _client_url == url:
+        return _client
+
+    with _lock:
+        if _client is None or _client_url != url:
+            _client = redis.Redis.from_url(
+                url,
+                socket_timeout=1.0,
+                socket_connect_timeout=1.0,
+                health_check_interval=30,
+            )
+            _client_url = url
+    return _client
@@ -0,0 +1,218 @@
+import queue
+import threading
+import time
+
+from flask import current_app
+
+_DONE = object()
+
+
+class PipelineAborted(RuntimeError):
+    pass
+
+
+class _Channel:
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.queue = queue.Queue(maxsize=max(1, int(maxsize)))
+        self.producers = 0
+
+
+class StagePipeline:
+    """
+    Stages on their own threads, joined by bounded queues.
+
+    A stage blocks when its outbox is full, so a slow stage backs up the
+    ones feeding it instead of the whole document piling up in memory,
+    and a fast one keeps working while slower neighbours do I/O. Stage
+    threads run in an app context of their own (and so their own DB
+    session); the consumer given to run() stays on the calling thread so
+    it can write through the caller's session. The first error aborts all
+    stages and is re-raised from run().
+    """
+
+    POLL_SEC = 0.2
+
+    def __init__(self, name: str, *, queue_size: int):
+        self.name = name
+        self.queue_size = queue_size
+        self._channels: dict[str, _Channel] = {}
+        self._stages = []
+        self._metrics: dict[str, dict] = {}
+        self._abort = threading.Event()
+        self._error = None
+        self._lock = threading.Lock()
+        self._started = None
+        self._wall = None
+
+    def _channel(self, name: str) -> _Channel:
+        if name not in self._channels:
+            self._channels[name] = _Channel(name, self.queue_size)
+        return self._channels[name]
+
+    def _stage_metrics(self, name: str) -> dict:
+        self._metrics[name] = {"items": 0, "batches": 0, "busy": 0.0, "wait_in": 0.0, "wait_out": 0.0}
+        return self._metrics[name]
+
+    def source(self, name: str, produce, *, outbox: str | tuple, count=len):
+        """
+        produce() returns an iterable whose items are sent to outbox. With a
+        tuple of outboxes it yields (outbox, item) pairs instead.
+        """
+        if isinstance(outbox, str):
+            out = self._channel(outbox)
+            out.producers += 1
+        else:
+            out = {n: self._channel(n) for n in outbox}
+            for channel in out.values():
+                channel.producers += 1
+        self._stages.append((name, produce, None, out, count))
+
+    def stage(self, name: str, fn, *, inbox: str, outbox: str | None = None, count=len):
+        """fn(item) runs per inbox item; a non-None result is sent to outbox."""
+        out = None
+        if outbox is not None:
+            out = self._channel(outbox)
+            out.producers += 1
+        self._stages.append((name, fn, self._channel(inbox), out, count))
+
+    def _fail(self, error: Exception):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._abort.set()
+
+    def _get(self, channel: _Channel, metrics: dict):
+        t0 = time.perf_counter()
+        try:
+            while True:
+                if self._abort.is_set():
+                    raise PipelineAborted(self.name)
+                try:
+                    return channel.queue.get(timeout=self.POLL_SEC)
+                except queue.Empty:
+                    continue
+        finally:
+            metrics["wait_in"] += time.perf_counter() - t0
+
+    def _put(self, channel: _Channel, item, metrics: dict):
+        t0 = time.perf_counter()
+        try:
+            while True:
+                if self._abort.is_set():
+                    raise PipelineAborted(self.name)
+                try:
+                    channel.queue.put(item, timeout=self.POLL_SEC)
+                    return
+                except queue.Full:
+                    continue
+        finally:
+            metrics["wait_out"] += time.perf_counter() - t0
+
+    def _record(self, metrics: dict, item, count, started: float):
+        metrics["busy"] += time.perf_counter() - started
+        metrics["batches"] += 1
+        metrics["items"] += count(item)
+
+    def _produce(self, produce, out, count, metrics: dict):
+        iterator = iter(produce())
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                metrics["busy"] += time.perf_counter() - t0
+                break
+            channel = out
+            if isinstance(out, dict):
+                name, item = item
+                channel = out[name]
+            self._record(metrics, item, count, t0)
+            self._put(channel, item, metrics)
+
+    def _consume(self, fn, inbox: _Channel, out: _Channel | None, count, metrics: dict):
+        finished = 0
+        while finished < inbox.producers:
+            item = self._get(inbox, metrics)
+            if item is _DONE:
+                finished += 1
+                continue
+            t0 = time.perf_counter()
+            result = fn(item)
+            self._record(metrics, item, count, t0)
+            if out is not None and result is not None:
+                self._put(out, result, metrics)
+
+    def _run_stage(self, spec, metrics: dict):
+        name, fn, inbox, out, count = spec
+        if inbox is None:
+            self._produce(fn, out, count, metrics)
+        else:
+            self._consume(fn, inbox, out, count, metrics)
+        if isinstance(out, dict):
+            outs = list(out.values())
+        else:
+            outs = [] if out is None else [out]
+        for channel in outs:
+            self._put(channel, _DONE, metrics)
+
+    def _thread_main(self, app, spec, metrics: dict):
+        with app.app_context():
+            try:
+                self._run_stage(spec, metrics)
+            except PipelineAborted:
+                pass
+            except Exception as e:
+                current_app.logger.warning("Pipeline %s stage %s failed: %s", self.name, spec[0], str(e))
+                self._fail(e)
+
+    def run(self, name: str, fn, *, inbox: str, outbox: str | None = None, count=len):
+        """
+        Start every stage, run the consumer `name` on this thread until its
+        inbox is drained, then wait for the remaining stages.
+        """
+        self.stage(name, fn, inbox=inbox, outbox=outbox, count=count)
+        consumer = self._stages.pop()
+        app = current_app._get_current_object()
+        self._started = time.perf_counter()
+
+        threads = []
+        for spec in self._stages:
+            thread = threading.Thread(
+                target=self._thread_main,
+                args=(app, spec, self._stage_metrics(spec[0])),
+                name=f"{self.name}-{spec[0]}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+        try:
+            self._run_stage(consumer, self._stage_metrics(name))
+        except PipelineAborted:
+            pass
+        except Exception as e:
+            self._fail(e)
+        finally:
+            for thread in threads:
+                thread.join()
+        self._wall = time.perf_counter() - self._started
+        if self._error is not None:
+            raise self._error
+
+    def snapshot(self) -> dict:
+        wall = self._wall
+        if wall is None and self._started is not None:
+            wall = time.perf_counter() - self._started
+        stages = {}
+        for name, m in self._metrics.items():
+            stages[name] = {
+                "items": m["items"],
+                "batches": m["batches"],
+                "busyMs": round(m["busy"] * 1000, 1),
+                "waitInMs": round(m["wait_in"] * 1000, 1),
+                "waitOutMs": round(m["wait_out"] * 1000, 1),
+                "itemsPerSec": round(m["items"] / m["busy"], 2) if m["busy"] > 0 else None,
+                "utilization": round(m["busy"] / wall, 3) if wall else None,
+            }
+        return {"wallMs": round((wall or 0) * 1000, 1), "stages": stages}
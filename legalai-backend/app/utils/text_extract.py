@@ -1,9 +1,12 @@
-import os, re, requests, json as jsonlib, csv as csvlib
+import hashlib, os, re, time, requests, json as jsonlib, csv as csvlib
 from bs4 import BeautifulSoup
 from pypdf import PdfReader
 from docx import Document
 from flask import current_app
 
+from .page_processor import PageProcessor
+from .page_render import iter_pdf_pages, pdf_pass_available
+
 try:
     from openpyxl import load_workbook
 except Exception:
@@ -19,10 +22,6 @@ try:
 except Exception:
     pytesseract = None
 
-try:
-    import fitz  # PyMuPDF
-except Exception:
-    fitz = None
 
 
 def extract_text_from_source(src):
@@ -39,40 +38,16 @@ def extract_text_from_source(src):
         path = src.file_path
 
         if src.source_type == "pdf":
-            text = ""
             try:
-                reader = PdfReader(path)
-                text = "\n".join(page.extract_text() or "" for page in reader.pages).strip()
+                if pdf_pass_available():
+                    # Text layer per page, OCR only for pages without one.
+                    return join_pdf_text(iter_pdf_pages(src.id, path, render=False))
+                page_total = len(PdfReader(path).pages)
+                return join_pdf_text(
+                    PageProcessor.map_pages(pdf_text_range, path, page_total, label=f"text source={src.id}")
+                )
             except Exception:
-                text = ""
-
-            if text:
-                return text
-
-            if fitz is not None:
-                try:
-                    with fitz.open(path) as doc:
-                        text = "\n".join(page.get_text("text") or "" for page in doc).strip()
-                        if text:
-                            return text
-
-                        if _ocr_enabled() and pytesseract is not None and Image is not None:
-                            try:
-                                ocr_lines = []
-                                for page in doc:
-                                    pix = page.get_pixmap(alpha=False)
-                                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                                    try:
-                                        ocr_lines.append(pytesseract.image_to_string(img))
-                                    finally:
-                                        img.close()
-                                text = "\n".join(ocr_lines).strip()
-                                return text
-                            except Exception:
-                                return ""
-                except Exception:
-                    text = ""
-            return ""
+                return ""
 
         if src.source_type in {"docx", "doc"}:
             doc = Document(path)
@@ -157,6 +132,23 @@ def extract_text_from_source(src):
     return ""
 
 
+def join_pdf_text(pages) -> str:
+    """Page texts in page order, whatever order the pages were produced in."""
+    pages = sorted(pages, key=lambda p: p["page_number"])
+    return "\n".join(p["text"] for p in pages).strip()
+
+
+def pdf_text_range(path: str, start: int, stop: int) -> list:
+    """Text layer of pages [start, stop) via pypdf, for when PyMuPDF is missing."""
+    reader = PdfReader(path)
+    pages = []
+    for i in range(start, min(stop, len(reader.pages))):
+        t0 = time.perf_counter()
+        text = reader.pages[i].extract_text() or ""
+        pages.append({"page_number": i + 1, "text": text, "ms": (time.perf_counter() - t0) * 1000})
+    return pages
+
+
 def _ocr_enabled() -> bool:
     try:
         return bool(current_app.config.get("ENABLE_OCR", False))
@@ -179,21 +171,66 @@ def ocr_images_to_text(paths, force: bool = False) -> str:
     return "\n".join(texts).strip()
 
 
+# Sentence ends, including the Urdu full stop and question mark.
+SENTENCE_END = re.compile(r"(?<=[.!?\u061f\u06d4])\s+")
+
+
+def _is_anchor(sentence: str) -> bool:
+    return int(hashlib.md5(sentence.encode("utf-8")).hexdigest()[:8], 16) % 3 == 0
+
+
+def _overlap_tail(units: list, overlap: int, max_chars: int) -> list:
+    tail, size = [], 0
+    for unit in reversed(units):
+        if size + len(unit) > overlap:
+            break
+        tail.insert(0, unit)
+        size += len(unit) + 1
+    if not tail and units and len(units[-1]) < max_chars // 4:
+        tail = [units[-1]]
+    return tail
+
+
 def chunk_text(text: str, max_chars=900, overlap=120):
+    """
+    Pack whole sentences into chunks of at most max_chars, carrying the
+    trailing sentences that fit in `overlap` chars into the next chunk.
+
+    Cut points depend on content, not offsets: once a chunk is past 2/3
+    of max_chars it ends after an "anchor" sentence (chosen by a hash of
+    the sentence). After an edit the cuts fall back in step within a chunk
+    or two, so the rest of the document keeps the same chunks and content
+    hashes and incremental re-ingestion skips them.
+    """
     text = re.sub(r"\s+", " ", text).strip()
     if not text:
         return []
 
+    units = []
+    for sentence in SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        # Tables and run-on clauses without sentence ends.
+        while len(sentence) > max_chars:
+            units.append(sentence[:max_chars])
+            sentence = sentence[max_chars - overlap:]
+        if sentence:
+            units.append(sentence)
+
     chunks = []
-    i = 0
-    while i < len(text):
-        end = min(len(text), i + max_chars)
-        chunk = text[i:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        i = end - overlap
-        if i < 0:
-            i = 0
-        if end == len(text):
-            break
+    current, fresh = [], 0
+    for unit in units:
+        size = sum(len(u) + 1 for u in current)
+        if current and size + len(unit) > max_chars:
+            if fresh:
+                chunks.append(" ".join(current))
+            current, fresh = _overlap_tail(current, overlap, max_chars), 0
+            if sum(len(u) + 1 for u in current) + len(unit) > max_chars:
+                current = []
+        current.append(unit)
+        fresh += 1
+        if sum(len(u) + 1 for u in current) > max_chars * 2 // 3 and _is_anchor(unit):
+            chunks.append(" ".join(current))
+            current, fresh = _overlap_tail(current, overlap, max_chars), 0
+    if fresh:
+        chunks.append(" ".join(current))
     return chunks
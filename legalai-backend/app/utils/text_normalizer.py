@@ -1,5 +1,10 @@
 import re
 
+# Bump whenever normalize_rag_context output changes; chunks normalized at
+# ingest with an older version are re-normalized at query time until
+# the backfill task has caught up.
+NORMALIZER_VERSION = 1
+
 _HEADER_LINE_RE = re.compile(
     r'^(step|issue|category|section|clause|rule|article|part|item)\s*[:\-–]?\s*$',
     re.IGNORECASE,
@@ -0,0 +1,44 @@
+"""add cache_status to rag_evaluation_logs
+
+Revision ID: 4c8e2f1a9b7d
+Revises: fde32b4b0240
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e2f1a9b7d'
+down_revision = 'fde32b4b0240'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("rag_evaluation_logs")}
+
+    if "cache_status" not in columns:
+        op.add_column(
+            "rag_evaluation_logs",
+            sa.Column("cache_status", sa.String(length=20), nullable=True),
+        )
+    if "cache_similarity" not in columns:
+        op.add_column(
+            "rag_evaluation_logs",
+            sa.Column("cache_similarity", sa.Float(), nullable=True),
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("rag_evaluation_logs")}
+
+    if "cache_similarity" in columns:
+        op.drop_column("rag_evaluation_logs", "cache_similarity")
+    if "cache_status" in columns:
+        op.drop_column("rag_evaluation_logs", "cache_status")
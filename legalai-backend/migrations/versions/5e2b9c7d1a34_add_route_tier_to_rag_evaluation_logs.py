@@ -0,0 +1,37 @@
+"""add route_tier to rag_evaluation_logs
+
+Revision ID: 5e2b9c7d1a34
+Revises: 7a1d3e5c9f20
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2b9c7d1a34'
+down_revision = '7a1d3e5c9f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("rag_evaluation_logs")}
+
+    if "route_tier" not in columns:
+        op.add_column(
+            "rag_evaluation_logs",
+            sa.Column("route_tier", sa.String(length=20), nullable=True),
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("rag_evaluation_logs")}
+
+    if "route_tier" in columns:
+        op.drop_column("rag_evaluation_logs", "route_tier")
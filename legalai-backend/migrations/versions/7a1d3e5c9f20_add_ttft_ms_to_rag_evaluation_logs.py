@@ -0,0 +1,37 @@
+"""add ttft_ms to rag_evaluation_logs
+
+Revision ID: 7a1d3e5c9f20
+Revises: 4c8e2f1a9b7d
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a1d3e5c9f20'
+down_revision = '4c8e2f1a9b7d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("rag_evaluation_logs")}
+
+    if "ttft_ms" not in columns:
+        op.add_column(
+            "rag_evaluation_logs",
+            sa.Column("ttft_ms", sa.Integer(), nullable=True),
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("rag_evaluation_logs")}
+
+    if "ttft_ms" in columns:
+        op.drop_column("rag_evaluation_logs", "ttft_ms")
@@ -0,0 +1,37 @@
+"""add speculative_status to rag_evaluation_logs
+
+Revision ID: 9c4f6a2e8b13
+Revises: 5e2b9c7d1a34
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4f6a2e8b13'
+down_revision = '5e2b9c7d1a34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("rag_evaluation_logs")}
+
+    if "speculative_status" not in columns:
+        op.add_column(
+            "rag_evaluation_logs",
+            sa.Column("speculative_status", sa.String(length=20), nullable=True),
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("rag_evaluation_logs")}
+
+    if "speculative_status" in columns:
+        op.drop_column("rag_evaluation_logs", "speculative_status")
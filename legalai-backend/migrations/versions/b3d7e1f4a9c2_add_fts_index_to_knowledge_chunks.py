@@ -0,0 +1,31 @@
+"""add full-text search index to knowledge_chunks
+
+Revision ID: b3d7e1f4a9c2
+Revises: 9c4f6a2e8b13
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d7e1f4a9c2'
+down_revision = '9c4f6a2e8b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Expression index used by LexicalSearchService; Postgres only.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_knowledge_chunks_fts "
+        "ON knowledge_chunks USING GIN (to_tsvector('simple', chunk_text))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_knowledge_chunks_fts")
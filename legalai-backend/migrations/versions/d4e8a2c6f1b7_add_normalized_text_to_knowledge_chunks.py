@@ -0,0 +1,39 @@
+"""add normalized_text and normalizer_version to knowledge_chunks
+
+Revision ID: d4e8a2c6f1b7
+Revises: b3d7e1f4a9c2
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8a2c6f1b7'
+down_revision = 'b3d7e1f4a9c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("knowledge_chunks")}
+
+    # Existing rows stay NULL until backfill_normalized_chunks runs.
+    if "normalized_text" not in columns:
+        op.add_column("knowledge_chunks", sa.Column("normalized_text", sa.Text(), nullable=True))
+    if "normalizer_version" not in columns:
+        op.add_column("knowledge_chunks", sa.Column("normalizer_version", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("knowledge_chunks")}
+
+    if "normalizer_version" in columns:
+        op.drop_column("knowledge_chunks", "normalizer_version")
+    if "normalized_text" in columns:
+        op.drop_column("knowledge_chunks", "normalized_text")
@@ -0,0 +1,51 @@
+"""add chunk content_hash and source ingested_hash for incremental re-ingest
+
+Revision ID: e5b1c9d3a7f2
+Revises: d4e8a2c6f1b7
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b1c9d3a7f2'
+down_revision = 'd4e8a2c6f1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    chunk_columns = {c["name"] for c in inspector.get_columns("knowledge_chunks")}
+    chunk_indexes = {i["name"] for i in inspector.get_indexes("knowledge_chunks")}
+    source_columns = {c["name"] for c in inspector.get_columns("knowledge_sources")}
+
+    # Existing chunks stay NULL; ingestion hashes their text on the next re-ingest.
+    if "content_hash" not in chunk_columns:
+        op.add_column("knowledge_chunks", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    if "ix_knowledge_chunks_source_content_hash" not in chunk_indexes:
+        op.create_index(
+            "ix_knowledge_chunks_source_content_hash",
+            "knowledge_chunks",
+            ["source_id", "content_hash"],
+        )
+    if "ingested_hash" not in source_columns:
+        op.add_column("knowledge_sources", sa.Column("ingested_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    chunk_columns = {c["name"] for c in inspector.get_columns("knowledge_chunks")}
+    chunk_indexes = {i["name"] for i in inspector.get_indexes("knowledge_chunks")}
+    source_columns = {c["name"] for c in inspector.get_columns("knowledge_sources")}
+
+    if "ingested_hash" in source_columns:
+        op.drop_column("knowledge_sources", "ingested_hash")
+    if "ix_knowledge_chunks_source_content_hash" in chunk_indexes:
+        op.drop_index("ix_knowledge_chunks_source_content_hash", table_name="knowledge_chunks")
+    if "content_hash" in chunk_columns:
+        op.drop_column("knowledge_chunks", "content_hash")
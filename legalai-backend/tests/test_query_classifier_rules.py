@@ -0,0 +1,55 @@
+import pytest
+
+from app.services.query_classifier_service import QueryClassifierService
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "What is the first thing to cook for dinner?",
+        "fire safety tips",
+        "Explain the law of averages",
+        "Write a Python class with a property decorator",
+        "Tell me a joke about marriage",
+        "Which food court has the best biryani?",
+        "How often does my car need maintenance?",
+        "Don't judge me, but I love pineapple pizza",
+    ],
+)
+def test_rules_leave_non_legal_questions_to_later_tiers(question):
+    assert QueryClassifierService._rules(question) is None
+
+
+@pytest.mark.parametrize(
+    "question, topic",
+    [
+        ("How can I get khula from my husband?", "divorce"),
+        ("My boss keeps harassing me at work", "harassment"),
+        ("How do I file an FIR?", "other"),
+        ("Can my in-laws take my dowry?", "dowry_mehr"),
+        ("Who gets custody of the children?", "custody"),
+        ("خلع کا طریقہ کیا ہے؟", "divorce"),
+    ],
+)
+def test_rules_route_decisive_terms(question, topic):
+    route = QueryClassifierService._rules(question)
+    assert route == {"category": "IN_DOMAIN_LEGAL", "confidence": 0.9, "topic": topic}
+
+
+@pytest.mark.parametrize(
+    "question, topic",
+    [
+        ("What are my rights to my father's property?", "property"),
+        ("Is court marriage legal?", "marriage"),
+        ("How do I file a police complaint?", "other"),
+        ("My husband does not pay maintenance", "maintenance"),
+    ],
+)
+def test_rules_route_supporting_terms_with_context(question, topic):
+    route = QueryClassifierService._rules(question)
+    assert route == {"category": "IN_DOMAIN_LEGAL", "confidence": 0.8, "topic": topic}
+
+
+def test_rules_keep_emergency_and_greeting_first():
+    assert QueryClassifierService._rules("He will kill me, which law protects me?")["category"] == "EMERGENCY"
+    assert QueryClassifierService._rules("Hello!")["category"] == "GREETING_OR_APP_HELP"